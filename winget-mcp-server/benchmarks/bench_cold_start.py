@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark server cold start over stdio
+
+Starts the server as an MCP host would, speaks newline-delimited JSON-RPC
+on its stdin/stdout, and measures from process start to the initialize
+response, the first tools/list response, and the first tools/call
+response (winget_search against a fake winget, catalog disabled).
+
+Usage:
+    python benchmarks/bench_cold_start.py [--runs 10] [--entry main.py]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'tests'))
+
+from fake_winget import install_fake_winget
+
+
+class StdioClient:
+    """Minimal JSON-RPC client for a server started on stdio"""
+
+    def __init__(self, command, env):
+        self.process = subprocess.Popen(
+            command, cwd=ROOT, env=env,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._next_id = 0
+
+    def send(self, method, params=None, notify=False):
+        message = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        if not notify:
+            self._next_id += 1
+            message["id"] = self._next_id
+        self.process.stdin.write((json.dumps(message) + '\n').encode())
+        self.process.stdin.flush()
+        if notify:
+            return None
+        while True:
+            reply = json.loads(self.process.stdout.readline())
+            if reply.get("id") == self._next_id:
+                return reply
+
+    def close(self):
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def cold_start(command, env):
+    """Seconds from spawn to initialize, tools/list and first tools/call"""
+    start = time.perf_counter()
+    client = StdioClient(command, env)
+    try:
+        client.send("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench-cold-start", "version": "0"},
+        })
+        initialized = time.perf_counter() - start
+        client.send("notifications/initialized", notify=True)
+        tools = client.send("tools/list", {})
+        listed = time.perf_counter() - start
+        assert tools["result"]["tools"], tools
+        reply = client.send("tools/call", {"name": "winget_search", "arguments": {"query": "python", "count": 3}})
+        called = time.perf_counter() - start
+        assert json.loads(reply["result"]["content"][0]["text"])["success"], reply
+        return initialized, listed, called
+    finally:
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--entry', default='main.py', help="server script, relative to the project root")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        install_fake_winget(tmp)
+        env = dict(os.environ)
+        env['PATH'] = tmp + os.pathsep + env.get('PATH', '')
+        env['WINGET_MCP_CATALOG'] = ''
+        command = [sys.executable, args.entry]
+
+        cold_start(command, env)  # warm the OS file cache and .pyc files
+        samples = [cold_start(command, env) for _ in range(args.runs)]
+
+    print(f"{args.entry}, {args.runs} runs (ms)")
+    print(f"{'':<18}{'median':>8}{'min':>8}{'max':>8}")
+    for index, label in enumerate(("initialize", "tools/list", "first tools/call")):
+        values = [sample[index] * 1000 for sample in samples]
+        print(f"{label:<18}{statistics.median(values):>8.0f}{min(values):>8.0f}{max(values):>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
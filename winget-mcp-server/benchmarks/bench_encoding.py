@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Benchmark response size and encode time per encoder configuration
+
+The payloads are a winget_list result with --rows packages and a
+winget_info result parsed from the show fixture. "indent=2" is the
+previous json.dumps(result, indent=2) output.
+
+Usage:
+    python benchmarks/bench_encoding.py [--rows 100] [--repeat 2000]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_table_parser import synthetic_list_output
+from src.tools.info_tool import parse_info_output
+from src.tools.list_tool import parse_list_output
+from src.utils import encoding
+from src.utils.encoding import ResponseEncoder
+
+FIXTURES = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures')
+
+
+def payloads(rows):
+    packages = parse_list_output(synthetic_list_output(rows))
+    with open(os.path.join(FIXTURES, 'show.txt'), encoding='utf-8') as f:
+        info = parse_info_output(f.read())
+    return {
+        f"list ({rows} rows)": {
+            "success": True,
+            "count_requested": rows,
+            "count_returned": len(packages),
+            "total_installed": len(packages),
+            "packages": packages,
+        },
+        "info": {"success": True, "package_id": "Python.Python.3.12", "info": info},
+    }
+
+
+def encoders():
+    yield "indent=2", lambda value: json.dumps(value, indent=2)
+    for layout in ("records", "table"):
+        for backend in ("json", "orjson"):
+            if backend == "orjson" and encoding.orjson is None:
+                continue
+            yield f"{layout} {backend}", ResponseEncoder(layout, backend=backend).encode
+
+
+def bench(encode, value, repeat):
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            encode(value)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    if encoding.orjson is None:
+        print("orjson is not installed; skipping its rows")
+    for name, value in payloads(args.rows).items():
+        print(f"\n{name}, best of 5 x {args.repeat}")
+        print(f"{'encoder':<18}{'bytes':>10}{'vs indent':>11}{'us/encode':>12}")
+        baseline = None
+        for label, encode in encoders():
+            size = len(encode(value).encode('utf-8'))
+            baseline = baseline or size
+            seconds = bench(encode, value, args.repeat)
+            print(f"{label:<18}{size:>10}{size / baseline:>10.0%}{seconds * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Benchmark the single-pass winget show parser against the legacy one
+
+Two inputs: the recorded show fixture, and the same output with
+--notes lines of release notes and --extra unknown fields, where the
+legacy parser's per-key pattern scan shows.
+
+Usage:
+    python benchmarks/bench_info_parser.py [--notes 2000] [--extra 200] [--repeat 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legacy_parsers import legacy_parse_info_output
+from src.tools.info_tool import parse_info_output
+
+FIXTURE = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'show_full.txt')
+
+
+def large_show_output(base: str, notes: int, extra: int) -> str:
+    """Append long release notes and many extra fields to a show output"""
+    lines = [base.rstrip('\n'), "Release Notes:"]
+    lines += [f"  - Change {i}: fixed issue #{i} in component {i % 17}" for i in range(notes)]
+    lines += [f"Custom Field {i}: value {i}" for i in range(extra)]
+    return '\n'.join(lines) + '\n'
+
+
+def bench(fn, output: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(output)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--notes', type=int, default=2000)
+    parser.add_argument('--extra', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    with open(FIXTURE, encoding='utf-8', newline='') as f:
+        base = f.read()
+    inputs = (
+        ("fixture", base),
+        (f"{args.notes} note lines, {args.extra} fields", large_show_output(base, args.notes, args.extra)),
+    )
+    for label, output in inputs:
+        print(f"\n{label}: {len(output.splitlines())} lines, best of 5 x {args.repeat}")
+        print(f"{'parser':<28}{'us/parse':>12}{'fields':>8}")
+        for name, fn in (
+            ("legacy parse_info_output", legacy_parse_info_output),
+            ("parse_info_output", parse_info_output),
+        ):
+            seconds = bench(fn, output, args.repeat)
+            print(f"{name:<28}{seconds * 1e6:>12.1f}{len(fn(output)):>8}")
+
+
+if __name__ == '__main__':
+    main()
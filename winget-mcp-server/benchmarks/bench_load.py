@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""Load and latency benchmark for the MCP server on the fake winget backend
+
+Drives a mix of winget_search, winget_list, winget_info and winget_install
+calls through the server with a fixed number of concurrent clients, either
+in-process through FastMCP.call_tool or over stdio JSON-RPC against a
+server process, and reports per-tool p50/p95/p99 latency, throughput,
+winget processes spawned and resident memory. An install call lasts until
+its job finished (winget_install, then winget_job_status waiting on it).
+
+winget is replaced by the recorded fake executor (tests/fixtures), so the
+numbers measure the server, not WinGet. The catalog index is disabled;
+--cold also disables the result cache so every call reaches the executor.
+
+Results are written as JSON with --output; --compare prints the change
+against an earlier results file, e.g. one saved on the previous commit.
+
+Usage:
+    python benchmarks/bench_load.py [--transport both] [--calls 400]
+        [--concurrency 8] [--mix search=4,list=2,info=3,install=1]
+        [--latency 0.05] [--cold] [--output results.json] [--compare old.json]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+FIXTURES = os.path.join(ROOT, 'tests', 'fixtures')
+sys.path.insert(0, ROOT)
+
+QUERIES = ["python", "git", "browser", "editor", "zip", "terminal"]
+PACKAGE_IDS = ["Python.Python.3.12", "Git.Git", "Mozilla.Firefox", "7zip.7zip",
+               "Microsoft.VisualStudioCode", "Notepad++.Notepad++"]
+TOOLS = ("search", "list", "info", "install")
+
+
+def parse_mix(text):
+    """Parse "search=4,list=2" into {"search": 4, "list": 2}"""
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in TOOLS:
+            raise argparse.ArgumentTypeError(f"unknown tool in mix: {name}")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def plan_calls(mix, calls, seed):
+    """The tool and arguments of every call, drawn deterministically from mix"""
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = []
+    for _ in range(calls):
+        tool = rng.choices(names, weights)[0]
+        if tool == "search":
+            arguments = {"query": rng.choice(QUERIES), "count": 5}
+        elif tool == "list":
+            arguments = {"count": 20}
+        else:
+            arguments = {"package_id": rng.choice(PACKAGE_IDS)}
+        plan.append((tool, arguments))
+    return plan
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of sorted values"""
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+def summarize(latencies):
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+
+
+def rss_mb(pid=None):
+    """Current and peak resident set size of a process in MiB, where readable"""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return {"rss_mb": round(int(fields["VmRSS"].split()[0]) / 1024, 1),
+                "peak_rss_mb": round(int(fields["VmHWM"].split()[0]) / 1024, 1)}
+    except (OSError, KeyError, ValueError):
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return {"rss_mb": None, "peak_rss_mb": None}
+    info = psutil.Process(pid).memory_info()
+    return {"rss_mb": round(info.rss / 2**20, 1),
+            "peak_rss_mb": round(getattr(info, 'peak_wset', info.rss) / 2**20, 1)}
+
+
+def failed(text):
+    """Whether a tool response reports an error"""
+    try:
+        reply = json.loads(text)
+    except ValueError:
+        return True
+    return "error" in reply or reply.get("success") is False
+
+
+async def drive(call, plan, concurrency):
+    """
+    Run the planned calls with concurrency workers
+
+    Args:
+        call: async (tool name, arguments) -> response text
+        plan: Output of plan_calls
+        concurrency: Calls in flight at once
+
+    Returns:
+        (latencies by tool, error count, wall seconds)
+    """
+    latencies = {tool: [] for tool in TOOLS}
+    errors = 0
+    calls = iter(plan)
+
+    async def one(tool, arguments):
+        if tool != "install":
+            return failed(await call(f"winget_{tool}", arguments))
+        reply = json.loads(await call("winget_install", arguments))
+        if "job_id" not in reply:
+            return True
+        status = json.loads(await call("winget_job_status",
+                                       {"job_id": reply["job_id"], "wait_seconds": 60}))
+        return status.get("status") != "succeeded"
+
+    async def worker():
+        nonlocal errors
+        for tool, arguments in calls:
+            start = time.perf_counter()
+            errors += await one(tool, arguments)
+            latencies[tool].append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+def report(latencies, errors, wall, spawns, memory):
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "calls": len(everything),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_per_second": round(len(everything) / wall, 1),
+        "latency": dict({tool: summarize(values) for tool, values in latencies.items() if values},
+                        all=summarize(everything)),
+        "spawns": spawns,
+        **memory,
+    }
+
+
+async def run_in_process(args, plan):
+    from src.config import Config
+    from src.server import mcp
+    from src.winget_manager import FakeExecutor, set_executor
+
+    Config.CATALOG_PATH = ''
+    if args.cold:
+        Config.CACHE_TTL = dict.fromkeys(Config.CACHE_TTL, 0.0)
+    executor = FakeExecutor(FIXTURES, latency=args.latency, line_latency=args.line_latency)
+    set_executor(executor)
+
+    async def call(tool, arguments):
+        content = await mcp.call_tool(tool, arguments)
+        return content[0].text
+
+    await drive(call, plan[:args.warmup], args.concurrency)
+    spawned = executor.spawns
+    latencies, errors, wall = await drive(call, plan, args.concurrency)
+    return report(latencies, errors, wall, executor.spawns - spawned, rss_mb())
+
+
+class StdioServer:
+    """JSON-RPC client for a server on stdio that keeps many requests in flight"""
+
+    async def start(self, command, env):
+        self.process = await asyncio.create_subprocess_exec(
+            *command, cwd=ROOT, env=env, limit=2**24,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._next_id = 0
+        self._pending = {}
+        self._reader = asyncio.create_task(self._read())
+        await self.request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {"name": "bench-load", "version": "0"},
+        })
+        self._write({"jsonrpc": "2.0", "method": "notifications/initialized"})
+
+    def _write(self, message):
+        self.process.stdin.write((json.dumps(message) + '\n').encode())
+
+    async def _read(self):
+        while line := await self.process.stdout.readline():
+            message = json.loads(line)
+            future = self._pending.pop(message.get("id"), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+
+    async def request(self, method, params):
+        self._next_id += 1
+        future = self._pending[self._next_id] = asyncio.get_running_loop().create_future()
+        self._write({"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params})
+        await self.process.stdin.drain()
+        reply = await future
+        if "error" in reply:
+            raise RuntimeError(reply["error"])
+        return reply["result"]
+
+    async def call(self, tool, arguments):
+        result = await self.request("tools/call", {"name": tool, "arguments": arguments})
+        return result["content"][0]["text"]
+
+    async def resource(self, uri):
+        result = await self.request("resources/read", {"uri": uri})
+        return json.loads(result["contents"][0]["text"])
+
+    async def close(self):
+        self.process.stdin.close()
+        try:
+            await asyncio.wait_for(self.process.wait(), 5)
+        except asyncio.TimeoutError:
+            self.process.kill()
+            await self.process.wait()
+        self._reader.cancel()
+
+
+async def run_stdio(args, plan):
+    env = dict(os.environ,
+               WINGET_MCP_EXECUTOR='fake',
+               WINGET_MCP_FAKE_FIXTURES=FIXTURES,
+               WINGET_MCP_FAKE_LATENCY=str(args.latency),
+               WINGET_MCP_FAKE_LINE_LATENCY=str(args.line_latency),
+               WINGET_MCP_CATALOG='')
+    if args.cold:
+        env.update(WINGET_MCP_SEARCH_TTL='0', WINGET_MCP_INFO_TTL='0', WINGET_MCP_LIST_TTL='0')
+    server = StdioServer()
+    await server.start([sys.executable, args.entry], env)
+    try:
+        await drive(server.call, plan[:args.warmup], args.concurrency)
+        spawned = (await server.resource("winget://executor/stats"))["spawns"]
+        latencies, errors, wall = await drive(server.call, plan, args.concurrency)
+        spawns = (await server.resource("winget://executor/stats"))["spawns"] - spawned
+        memory = rss_mb(server.process.pid)
+    finally:
+        await server.close()
+    return report(latencies, errors, wall, spawns, memory)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    for transport, result in results.items():
+        print(f"\n{transport}: {result['calls']} calls, {result['errors']} errors, "
+              f"{result['throughput_per_second']} calls/s, {result['spawns']} spawns, "
+              f"RSS {result['rss_mb']} MiB (peak {result['peak_rss_mb']})")
+        print(f"{'':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for tool, stats in result["latency"].items():
+            print(f"{tool:<10}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                  f"{stats['p99_ms']:>10.2f}{stats['max_ms']:>10.2f}")
+
+
+def print_comparison(results, baseline):
+    print(f"\nChange against {baseline.get('commit') or 'baseline'} (negative latency is faster)")
+    for transport, result in results.items():
+        before = baseline["results"].get(transport)
+        if before is None:
+            continue
+        change = lambda new, old: f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{transport}: throughput {change(result['throughput_per_second'], before['throughput_per_second'])}, "
+              f"spawns {result['spawns'] - before['spawns']:+d}")
+        for tool, stats in result["latency"].items():
+            old = before["latency"].get(tool)
+            if old:
+                print(f"  {tool:<10}" + "".join(
+                    f"{key[:3]} {change(stats[key], old[key]):>8}  " for key in ("p50_ms", "p95_ms", "p99_ms")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--transport', choices=('in-process', 'stdio', 'both'), default='both')
+    parser.add_argument('--calls', type=int, default=400)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix("search=4,list=2,info=3,install=1"))
+    parser.add_argument('--latency', type=float, default=0.05, help="fake winget seconds per call")
+    parser.add_argument('--line-latency', type=float, default=0.0, help="fake winget seconds per line")
+    parser.add_argument('--cold', action='store_true', help="disable the result cache")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--entry', default='main.py', help="server script for stdio, relative to the project root")
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--compare', help="results JSON of an earlier run to compare with")
+    args = parser.parse_args()
+
+    plan = plan_calls(args.mix, args.calls, args.seed)
+    results = {}
+    if args.transport in ('stdio', 'both'):
+        results["stdio"] = asyncio.run(run_stdio(args, plan))
+    if args.transport in ('in-process', 'both'):
+        results["in-process"] = asyncio.run(run_in_process(args, plan))
+
+    document = {
+        "commit": git_commit(),
+        "timestamp": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {key: value for key, value in vars(args).items() if key not in ('output', 'compare')},
+        "results": results,
+    }
+    print_results(results)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(results, json.load(f))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Benchmark buffered communicate() parsing against streaming line parsing
+
+A fake winget replays a synthetic `winget list` table, so the numbers
+cover the real pipe and subprocess path. Peak memory is the parent's
+Python allocations as seen by tracemalloc.
+
+Usage:
+    python benchmarks/bench_streaming.py [--rows 20000] [--count 20]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_table_parser import synthetic_list_output
+from fake_winget import install_fake_winget
+from src.tools.list_tool import LIST_FIELDS, parse_list_output
+from src.utils.process import run_winget, stream_winget
+from src.utils.table import aiter_table_cells
+
+CMD = ['list', '--accept-source-agreements']
+
+
+async def buffered(count):
+    """The old path: wait for the whole output, then parse it"""
+    start = time.perf_counter()
+    completed = await run_winget(CMD)
+    packages = parse_list_output(completed.stdout)
+    return time.perf_counter() - start, len(packages[:count])
+
+
+async def streamed(count, stop):
+    """Parse rows as lines arrive, optionally stopping at count"""
+    start = time.perf_counter()
+    first = None
+    rows = 0
+    async with stream_winget(CMD) as stream:
+        async for cells in aiter_table_cells(stream, LIST_FIELDS):
+            if first is None:
+                first = time.perf_counter() - start
+            rows += 1
+            if stop and rows >= count:
+                await stream.stop()
+                break
+        await stream.wait()
+    return first, min(rows, count)
+
+
+def measure(label, make, repeat):
+    best = float('inf')
+    first_row = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        first, _ = asyncio.run(make())
+        best = min(best, time.perf_counter() - start)
+        first_row = min(first_row, first)
+
+    tracemalloc.start()
+    asyncio.run(make())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<26}{best:>10.3f}{first_row:>14.3f}{peak / 1e6:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--count', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        install_fake_winget(tmp)
+        output = synthetic_list_output(args.rows)
+        with open(os.path.join(tmp, 'list.txt'), 'w', encoding='utf-8') as f:
+            f.write(output)
+        os.environ['PATH'] = tmp + os.pathsep + os.environ.get('PATH', '')
+        os.environ['FAKE_WINGET_FIXTURES'] = tmp
+
+        print(f"{args.rows} rows, {len(output) / 1e6:.1f} MB, count={args.count}, best of {args.repeat}")
+        print(f"{'mode':<26}{'total s':>10}{'first row s':>14}{'peak MB':>12}")
+        measure("communicate + parse", lambda: buffered(args.count), args.repeat)
+        measure("stream, read all", lambda: streamed(args.count, False), args.repeat)
+        measure("stream, stop at count", lambda: streamed(args.count, True), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
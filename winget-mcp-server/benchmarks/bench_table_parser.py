@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Benchmark the unified table parser against the legacy search/list parsers
+
+Usage:
+    python benchmarks/bench_table_parser.py [--rows 50000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from legacy_parsers import legacy_parse_list_output, legacy_parse_search_output
+from src.tools.list_tool import parse_list_output
+from src.tools.search_tool import parse_search_output
+
+WIDTHS = (40, 40, 18, 18, 8)
+
+
+def synthetic_list_output(rows: int, seed: int = 1) -> str:
+    """Build a `winget list`-shaped table with a mix of empty Available cells"""
+    rng = random.Random(seed)
+    line = lambda cells: ''.join(c.ljust(w) for c, w in zip(cells, WIDTHS)).rstrip()
+    out = [line(("Name", "Id", "Version", "Available", "Source")), '-' * sum(WIDTHS)]
+    for i in range(rows):
+        version = f"{rng.randint(1, 30)}.{rng.randint(0, 99)}.{rng.randint(0, 9999)}"
+        available = f"{rng.randint(1, 30)}.{rng.randint(0, 99)}" if rng.random() < 0.3 else ""
+        out.append(line((f"Package {i} Suite", f"Vendor{i % 97}.Package{i}", version, available, "winget")))
+    return '\n'.join(out) + '\n'
+
+
+def bench(fn, output: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(output)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    output = synthetic_list_output(args.rows)
+    print(f"{args.rows} rows, {len(output) / 1e6:.1f} MB, best of {args.repeat}")
+    print(f"{'parser':<28}{'seconds':>10}{'rows/s':>14}")
+    for name, fn in (
+        ("legacy parse_search_output", legacy_parse_search_output),
+        ("legacy parse_list_output", legacy_parse_list_output),
+        ("parse_search_output", parse_search_output),
+        ("parse_list_output", parse_list_output),
+        ("parse_list_output limit=20", lambda text: parse_list_output(text, 20)),
+    ):
+        seconds = bench(fn, output, args.repeat)
+        print(f"{name:<28}{seconds:>10.3f}{args.rows / seconds:>14,.0f}")
+
+
+if __name__ == '__main__':
+    main()
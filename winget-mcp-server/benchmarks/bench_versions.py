@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Benchmark version parsing, sorting and range matching over synthetic winget versions
+
+Compares a plain per-call comparator (no memo, parsed on every comparison)
+with the memoized keys of utils.versions, cold and warm.
+
+Usage:
+    python benchmarks/bench_versions.py [--versions 100000] [--distinct 20000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from functools import cmp_to_key
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import versions
+from src.utils.versions import latest_matching, sort_versions, version_key
+
+_PART = re.compile(r'\s*(\d*)(.*?)\s*$')
+
+
+def synthetic_versions(count: int, distinct: int, seed: int = 1):
+    """
+    count versions drawn from distinct ones: a mix of 3-part, 4-part,
+    semver pre-release, date-style and git-style versions
+    """
+    rng = random.Random(seed)
+    out = []
+    for _ in range(distinct):
+        kind = rng.random()
+        if kind < 0.4:
+            out.append(f"{rng.randint(0, 30)}.{rng.randint(0, 99)}.{rng.randint(0, 999)}")
+        elif kind < 0.6:
+            out.append(f"{rng.randint(1, 20)}.{rng.randint(0, 9)}.{rng.randint(0, 99999)}.{rng.randint(0, 9)}")
+        elif kind < 0.75:
+            out.append(f"{rng.randint(0, 5)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}-"
+                       f"{rng.choice(['alpha', 'beta', 'rc'])}.{rng.randint(1, 9)}")
+        elif kind < 0.9:
+            out.append(f"{rng.randint(2015, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        else:
+            out.append(f"2.{rng.randint(30, 47)}.{rng.randint(0, 3)}.windows.{rng.randint(1, 3)}")
+    return [rng.choice(out) for _ in range(count)]
+
+
+def naive_compare(a: str, b: str) -> int:
+    """Parse both versions on every comparison, the way a string-only caller would"""
+    def parts(version):
+        return [(int(d) if d else 0, o.lower()) for d, o in
+                (_PART.match(piece).groups() for piece in version.lstrip('v').split('.'))]
+    left, right = parts(a), parts(b)
+    width = max(len(left), len(right))
+    left += [(0, '')] * (width - len(left))
+    right += [(0, '')] * (width - len(right))
+    for (na, oa), (nb, ob) in zip(left, right):
+        if na != nb:
+            return -1 if na < nb else 1
+        if oa != ob:
+            if not oa or not ob:
+                return 1 if not oa else -1
+            return -1 if oa < ob else 1
+    return 0
+
+
+def best_of(repeat: int, setup, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--versions', type=int, default=100000)
+    parser.add_argument('--distinct', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    sample = synthetic_versions(args.versions, args.distinct)
+    nothing = lambda: None
+    print(f"{args.versions} versions, {len(set(sample))} distinct, best of {args.repeat}")
+    print(f"{'case':<34}{'seconds':>10}{'versions/s':>14}")
+    for name, setup, fn in (
+        ("naive sort (cmp_to_key)", nothing, lambda: sorted(sample, key=cmp_to_key(naive_compare))),
+        ("version_key cold", versions.clear_memo, lambda: [version_key(v) for v in sample]),
+        ("version_key warm (memo)", nothing, lambda: [version_key(v) for v in sample]),
+        ("sort_versions cold", versions.clear_memo, lambda: sort_versions(sample)),
+        ("sort_versions warm", nothing, lambda: sort_versions(sample)),
+        ("latest_matching 3.12.*", nothing, lambda: latest_matching(sample, "3.12.*")),
+        ("latest_matching >=2.40, <2.45", nothing, lambda: latest_matching(sample, ">=2.40, <2.45")),
+    ):
+        seconds = best_of(args.repeat, setup, fn)
+        print(f"{name:<34}{seconds:>10.3f}{args.versions / seconds:>14,.0f}")
+    print(f"memo: {versions.memo_stats()}")
+
+
+if __name__ == '__main__':
+    main()
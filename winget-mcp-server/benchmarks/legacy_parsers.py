@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Superseded winget output parsers, kept verbatim as benchmark baselines"""
+
+import re
+from typing import List, Dict
+
+def legacy_parse_search_output(output: str) -> List[Dict[str, str]]:
+    """
+    Parse WinGet search output into structured data
+    
+    Args:
+        output: Raw WinGet search output
+        
+    Returns:
+        List of package dictionaries
+    """
+    packages = []
+    
+    # Clean up the output - remove carriage returns and extra whitespace/control chars
+    cleaned_output = output.replace('\r', '').strip()
+    
+    # Split into lines and clean them up
+    lines = []
+    for line in cleaned_output.split('\n'):
+        line = line.strip()
+        if line:  # Only keep non-empty lines
+            lines.append(line)
+    
+    # Find the header line (contains "Name", "Id", "Version", "Source")
+    header_line_idx = -1
+    for i, line in enumerate(lines):
+        if 'Name' in line and 'Id' in line and 'Version' in line:
+            header_line_idx = i
+            break
+    
+    if header_line_idx == -1:
+        return packages
+    
+    # Find separator line (dashes) - it's usually the next line after header
+    separator_idx = -1
+    for i in range(header_line_idx + 1, len(lines)):
+        if lines[i].startswith('-'):
+            separator_idx = i
+            break
+    
+    if separator_idx == -1:
+        # If no separator found, assume data starts right after header
+        separator_idx = header_line_idx
+    
+    # Get column positions from the header line
+    header_line = lines[header_line_idx]
+    name_start = header_line.find('Name')
+    id_start = header_line.find('Id')
+    version_start = header_line.find('Version')
+    source_start = header_line.find('Source')
+    
+    # Parse package lines using fixed positions
+    for line in lines[separator_idx + 1:]:
+        line = line.strip()
+        
+        # Skip empty lines, separator lines, or lines with special content
+        if not line or line.startswith('-') or line.startswith('<') or 'truncated' in line.lower():
+            continue
+        
+        # Extract columns based on positions
+        try:
+            name = line[name_start:id_start].strip() if id_start > name_start else line[:id_start].strip()
+            id_val = line[id_start:version_start].strip() if version_start > id_start else line[id_start:source_start].strip()
+            version = line[version_start:source_start].strip() if source_start > version_start else "Unknown"
+            source = line[source_start:].strip() if source_start < len(line) else "winget"
+            
+            if name and id_val and len(name) > 0 and len(id_val) > 0:
+                package = {
+                    "name": name,
+                    "id": id_val,
+                    "version": version if version else "Unknown",
+                    "source": source if source else "winget"
+                }
+                packages.append(package)
+        except Exception as e:
+            # Skip lines that can't be parsed properly
+            continue
+    
+    return packages
+
+def legacy_parse_list_output(output: str) -> List[Dict[str, str]]:
+    """
+    Parse WinGet list output into structured data
+    
+    Args:
+        output: Raw WinGet list output
+        
+    Returns:
+        List of installed package dictionaries
+    """
+    packages = []
+    lines = output.strip().split('\n')
+    
+    # Find the header line (contains "Name", "Id", "Version", etc.)
+    header_line_idx = -1
+    for i, line in enumerate(lines):
+        if 'Name' in line and 'Id' in line and 'Version' in line:
+            header_line_idx = i
+            break
+    
+    if header_line_idx == -1:
+        return packages
+    
+    # Find separator line (dashes)
+    separator_idx = -1
+    for i in range(header_line_idx + 1, len(lines)):
+        if lines[i].strip().startswith('-'):
+            separator_idx = i
+            break
+    
+    if separator_idx == -1:
+        return packages
+    
+    # Parse package lines
+    for line in lines[separator_idx + 1:]:
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Split by multiple spaces to separate columns
+        parts = re.split(r'\s{2,}', line)
+        
+        if len(parts) >= 2:
+            package = {
+                "name": parts[0].strip(),
+                "id": parts[1].strip() if len(parts) > 1 else "Unknown",
+                "version": parts[2].strip() if len(parts) > 2 else "Unknown",
+                "available": parts[3].strip() if len(parts) > 3 else None,
+                "source": parts[4].strip() if len(parts) > 4 else "Unknown"
+            }
+            packages.append(package)
+    
+    return packages
+
+def legacy_parse_info_output(output: str) -> Dict[str, str]:
+    """
+    Parse WinGet show output into structured data
+    
+    Args:
+        output: Raw WinGet show output
+        
+    Returns:
+        Dictionary of package information
+    """
+    info = {}
+    lines = output.strip().split('\n')
+    
+    current_section = None
+    
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+            
+        # Check if this is a section header (no colon, usually title case)
+        if ':' not in line and line.replace(' ', '').isalnum():
+            current_section = line
+            continue
+        
+        # Parse key-value pairs
+        if ':' in line:
+            parts = line.split(':', 1)
+            if len(parts) == 2:
+                key = parts[0].strip()
+                value = parts[1].strip()
+                
+                # Add section prefix if we're in a section
+                if current_section and current_section.lower() not in key.lower():
+                    full_key = f"{current_section}_{key}".replace(' ', '_').lower()
+                else:
+                    full_key = key.replace(' ', '_').lower()
+                
+                info[full_key] = value
+    
+    # Clean up and standardize some common fields
+    standardized_info = {}
+    
+    # Map common fields to standard names
+    field_mapping = {
+        'found': 'name',
+        'version': 'version',
+        'publisher': 'publisher',
+        'description': 'description',
+        'homepage': 'homepage',
+        'license': 'license',
+        'download_url': 'download_url',
+        'installer_type': 'installer_type',
+        'installer_url': 'installer_url'
+    }
+    
+    for key, value in info.items():
+        # Try to map to standard field names
+        mapped_key = None
+        for pattern, standard_name in field_mapping.items():
+            if pattern in key.lower():
+                mapped_key = standard_name
+                break
+        
+        if mapped_key:
+            standardized_info[mapped_key] = value
+        else:
+            standardized_info[key] = value
+    
+    return standardized_info
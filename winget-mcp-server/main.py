@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Entry point for WinGet MCP Server"""
 
+from src.server import main
+
 if __name__ == "__main__":
-    from src.server import mcp
-    mcp.run()
+    main()
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""Persistent local package catalog with offline full-text search"""
+
+import asyncio
+import difflib
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .config import Config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    name TEXT NOT NULL,
+    version TEXT,
+    source TEXT,
+    publisher TEXT,
+    tags TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS packages_fts USING fts5(
+    id, name, publisher, tags,
+    content='packages', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS packages_ai AFTER INSERT ON packages BEGIN
+    INSERT INTO packages_fts(rowid, id, name, publisher, tags)
+    VALUES (new.rowid, new.id, new.name, new.publisher, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_ad AFTER DELETE ON packages BEGIN
+    INSERT INTO packages_fts(packages_fts, rowid, id, name, publisher, tags)
+    VALUES ('delete', old.rowid, old.id, old.name, old.publisher, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_au AFTER UPDATE ON packages BEGIN
+    INSERT INTO packages_fts(packages_fts, rowid, id, name, publisher, tags)
+    VALUES ('delete', old.rowid, old.id, old.name, old.publisher, old.tags);
+    INSERT INTO packages_fts(rowid, id, name, publisher, tags)
+    VALUES (new.rowid, new.id, new.name, new.publisher, new.tags);
+END;
+CREATE TABLE IF NOT EXISTS queries (
+    query TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    complete INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Only rows whose catalog fields actually changed are rewritten, which keeps
+# the FTS index untouched for unchanged packages. Missing fields never
+# overwrite known ones, and a name equal to the id counts as missing.
+UPSERT = """
+INSERT INTO packages (id, name, version, source, publisher, tags, updated_at)
+VALUES (:id, :name, :version, :source, :publisher, :tags, :updated_at)
+ON CONFLICT(id) DO UPDATE SET
+    name = CASE WHEN excluded.name = excluded.id THEN packages.name ELSE excluded.name END,
+    version = COALESCE(excluded.version, packages.version),
+    source = COALESCE(excluded.source, packages.source),
+    publisher = COALESCE(excluded.publisher, packages.publisher),
+    tags = COALESCE(excluded.tags, packages.tags),
+    updated_at = excluded.updated_at
+WHERE (excluded.name IS NOT excluded.id AND packages.name IS NOT excluded.name)
+    OR (excluded.version IS NOT NULL AND packages.version IS NOT excluded.version)
+    OR (excluded.source IS NOT NULL AND packages.source IS NOT excluded.source)
+    OR (excluded.publisher IS NOT NULL AND packages.publisher IS NOT excluded.publisher)
+    OR (excluded.tags IS NOT NULL AND packages.tags IS NOT excluded.tags)
+"""
+
+# bm25 column weights: id, name, publisher, tags
+SEARCH = """
+SELECT p.id, p.name, p.version, p.source, p.publisher, p.tags,
+       (lower(p.id) = :exact OR lower(p.name) = :exact) AS exact_match
+FROM packages_fts
+JOIN packages p ON p.rowid = packages_fts.rowid
+WHERE packages_fts MATCH :match
+ORDER BY exact_match DESC, bm25(packages_fts, 10.0, 5.0, 1.0, 2.0)
+LIMIT :limit
+"""
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Ids bound per IN (...) query, below SQLite's host parameter limit
+_IN_CHUNK = 500
+
+
+def _locked(method):
+    """Run method holding the index lock; tools call the index from worker threads"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+class CatalogIndex:
+    """
+    SQLite FTS5 index of package metadata
+
+    The index is fed incrementally from parsed ``winget search`` and
+    ``winget show`` output and from exported catalog files. Queries that
+    were answered by winget are remembered, so a repeated query can be
+    answered from the index without spawning winget again.
+
+    Every method blocks on SQLite, so the tools call them through
+    asyncio.to_thread; a lock keeps one thread in the index at a time.
+    """
+
+    def __init__(self, path: str, max_age: float = 86400.0):
+        self.path = path
+        self.max_age = max_age
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._names: Optional[List[str]] = None
+        self._by_name: Dict[str, List[str]] = {}
+
+    @_locked
+    def close(self) -> None:
+        self._conn.close()
+
+    @_locked
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM packages").fetchone()[0]
+
+    @_locked
+    def search(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[Dict[str, Any]]:
+        """
+        Search the index with prefix matching and bm25 ranking
+
+        Every query token is matched as a prefix against id, name, publisher
+        and tags. When that yields fewer than limit rows and fuzzy is set,
+        close matches on name and id fill the remainder, so typos still
+        find packages.
+
+        Args:
+            query: Search term or package name
+            limit: Maximum number of results to return
+            fuzzy: Fill up with approximate name/id matches
+
+        Returns:
+            List of package dictionaries, best match first
+        """
+        packages = self._matches(query, limit)
+        if fuzzy:
+            self._fill(query, limit, packages)
+        return packages
+
+    def _matches(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """FTS prefix matches for every query token, best first"""
+        tokens = _TOKEN_RE.findall(query.lower())
+        if not tokens:
+            return []
+        match = ' AND '.join(f'"{token}"*' for token in tokens)
+        rows = self._conn.execute(
+            SEARCH, {"match": match, "exact": query.strip().lower(), "limit": limit}
+        ).fetchall()
+        return [_row_to_package(row) for row in rows]
+
+    def _fill(self, query: str, limit: int, packages: List[Dict[str, Any]]) -> None:
+        """Append approximate name/id matches to packages, up to limit"""
+        if len(packages) < limit:
+            seen = {package["id"].lower() for package in packages}
+            for row in self._fuzzy(query, limit - len(packages), seen):
+                packages.append(_row_to_package(row))
+
+    @_locked
+    def lookup(self, query: str, count: int, limit: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Answer a search from the index, or return None on a miss
+
+        A query is a hit when winget already answered the same query with
+        at least as many results (or all of them) within max_age, or when
+        the index alone holds at least count prefix matches. Approximate
+        matches never make a hit on their own, so a typo is still sent to
+        winget; on a hit they fill the result up to limit, as in search().
+
+        Args:
+            query: Search term or package name
+            count: Number of results needed for a hit
+            limit: Maximum number of results to return (default count)
+
+        Returns:
+            List of package dictionaries, or None when winget must be asked
+        """
+        limit = max(count, limit or count)
+        packages = self._matches(query, limit)
+        if len(packages) < count and not self._covered(query, count):
+            return None
+        self._fill(query, limit, packages)
+        return packages
+
+    @_locked
+    def add_search_results(self, query: str, count: int, packages: Iterable[Dict[str, Any]]) -> int:
+        """
+        Record parsed winget search results and the query they answer
+
+        Args:
+            query: Query that was sent to winget
+            count: --count that was sent to winget
+            packages: Parsed search rows
+
+        Returns:
+            Number of rows inserted or changed
+        """
+        packages = list(packages)
+        changed = self.upsert(packages, commit=False)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO queries (query, count, complete, fetched_at) VALUES (?, ?, ?, ?)",
+            (_normalize(query), count, int(len(packages) < count), time.time()),
+        )
+        self._conn.commit()
+        return changed
+
+    @_locked
+    def add_info(self, package_id: str, info: Dict[str, Any]) -> int:
+        """
+        Record parsed winget show output for one package
+
+        Args:
+            package_id: Package ID that was shown
+            info: Parsed info dictionary
+
+        Returns:
+            Number of rows inserted or changed
+        """
+        tags = info.get("tags")
+        if isinstance(tags, list):
+            tags = ' '.join(tags)
+        return self.upsert([{
+            "id": package_id,
+            "name": info.get("name") or package_id,
+            "version": info.get("version"),
+            "publisher": info.get("publisher"),
+            "tags": tags,
+        }])
+
+    @_locked
+    def names(self, package_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up display names for package ids
+
+        Args:
+            package_ids: Package identifiers
+
+        Returns:
+            Names by lowercased id, for ids whose name is known
+        """
+        names = {}
+        for package_id in package_ids:
+            row = self._conn.execute("SELECT name FROM packages WHERE id = ?", (package_id,)).fetchone()
+            if row is not None and row["name"].lower() != package_id.lower():
+                names[package_id.lower()] = row["name"]
+        return names
+
+    @_locked
+    def versions(self, package_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Look up the latest version the index has seen for package ids
+
+        Args:
+            package_ids: Package identifiers
+
+        Returns:
+            Versions by lowercased id, for ids whose version is known
+        """
+        ids = list(package_ids)
+        versions = {}
+        for start in range(0, len(ids), _IN_CHUNK):
+            chunk = ids[start:start + _IN_CHUNK]
+            rows = self._conn.execute(
+                f"SELECT id, version FROM packages WHERE version IS NOT NULL "
+                f"AND id IN ({','.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                versions[row["id"].lower()] = row["version"]
+        return versions
+
+    @_locked
+    def import_file(self, path: str) -> Dict[str, Any]:
+        """
+        Import an exported catalog file, skipping it when unchanged
+
+        Accepts either a JSON list of package objects (id, name, version,
+        source, publisher, tags) or a ``winget export`` document.
+
+        Args:
+            path: Path of the JSON file
+
+        Returns:
+            Dictionary with the number of rows read and changed
+        """
+        stat = os.stat(path)
+        stamp = f"{stat.st_mtime_ns}:{stat.st_size}"
+        meta_key = f"import:{os.path.abspath(path)}"
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (meta_key,)).fetchone()
+        if row is not None and row["value"] == stamp:
+            return {"path": path, "read": 0, "changed": 0, "skipped": True}
+
+        with open(path, 'r', encoding='utf-8') as f:
+            packages = list(_packages_from_document(json.load(f)))
+
+        changed = self.upsert(packages, commit=False)
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (meta_key, stamp))
+        self._conn.commit()
+        return {"path": path, "read": len(packages), "changed": changed, "skipped": False}
+
+    @_locked
+    def upsert(self, packages: Iterable[Dict[str, Any]], commit: bool = True) -> int:
+        """
+        Insert new packages and update changed ones
+
+        Args:
+            packages: Package dictionaries with at least id and name
+            commit: Commit the transaction when done
+
+        Returns:
+            Number of rows inserted or changed
+        """
+        now = time.time()
+        cursor = self._conn.executemany(UPSERT, (
+            {
+                "id": package["id"],
+                "name": package.get("name") or package["id"],
+                "version": _known(package.get("version")),
+                "source": _known(package.get("source")),
+                "publisher": package.get("publisher"),
+                "tags": package.get("tags"),
+                "updated_at": now,
+            }
+            for package in packages if package.get("id")
+        ))
+        changed = max(cursor.rowcount, 0)
+        if changed:
+            self._names = None
+        if commit:
+            self._conn.commit()
+        return changed
+
+    def _covered(self, query: str, count: int) -> bool:
+        row = self._conn.execute(
+            "SELECT count, complete, fetched_at FROM queries WHERE query = ?", (_normalize(query),)
+        ).fetchone()
+        if row is None or time.time() - row["fetched_at"] > self.max_age:
+            return False
+        return bool(row["complete"]) or row["count"] >= count
+
+    def _fuzzy(self, query: str, limit: int, exclude: set) -> List[sqlite3.Row]:
+        if limit <= 0:
+            return []
+        if self._names is None:
+            # Fuzzy keys are whole names and ids plus their individual words
+            self._by_name = {}
+            for row in self._conn.execute("SELECT id, name FROM packages"):
+                name, package_id = row["name"].lower(), row["id"].lower()
+                keys = {name, package_id, *_TOKEN_RE.findall(name), *_TOKEN_RE.findall(package_id)}
+                for key in keys:
+                    if len(key) >= 3:
+                        self._by_name.setdefault(key, []).append(row["id"])
+            self._names = list(self._by_name)
+
+        ids: List[str] = []
+        for key in difflib.get_close_matches(query.strip().lower(), self._names, n=limit * 2, cutoff=0.75):
+            for package_id in self._by_name[key]:
+                if package_id.lower() not in exclude and package_id not in ids:
+                    ids.append(package_id)
+        rows = []
+        for package_id in ids[:limit]:
+            rows.append(self._conn.execute(
+                "SELECT id, name, version, source, publisher, tags FROM packages WHERE id = ?", (package_id,)
+            ).fetchone())
+        return rows
+
+
+def _normalize(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def _known(value: Optional[str]) -> Optional[str]:
+    """Treat parser placeholders as missing so they never overwrite real data"""
+    return None if value in (None, "", "Unknown") else value
+
+
+def _row_to_package(row: sqlite3.Row) -> Dict[str, Any]:
+    package = {
+        "name": row["name"],
+        "id": row["id"],
+        "version": row["version"] or "Unknown",
+        "source": row["source"] or "winget",
+    }
+    if row["publisher"]:
+        package["publisher"] = row["publisher"]
+    return package
+
+
+def _packages_from_document(document: Any) -> Iterable[Dict[str, Any]]:
+    """Yield package dictionaries from a catalog list or a winget export document"""
+    if isinstance(document, list):
+        for item in document:
+            tags = item.get("tags")
+            yield {
+                "id": item.get("id"),
+                "name": item.get("name"),
+                "version": item.get("version"),
+                "source": item.get("source"),
+                "publisher": item.get("publisher"),
+                "tags": ' '.join(tags) if isinstance(tags, list) else tags,
+            }
+        return
+
+    # An export lists installed versions, not the latest available, so
+    # only ids and sources are recorded from it
+    for source in document.get("Sources", []):
+        source_name = source.get("SourceDetails", {}).get("Name")
+        for item in source.get("Packages", []):
+            yield {
+                "id": item.get("PackageIdentifier"),
+                "name": item.get("PackageIdentifier"),
+                "version": None,
+                "source": source_name,
+            }
+
+
+_catalog: Optional[CatalogIndex] = None
+_unavailable: Optional[str] = None
+_opening = threading.Lock()
+
+
+def get_catalog() -> Optional[CatalogIndex]:
+    """
+    Return the process-wide catalog index, or None when it is disabled
+
+    The index is opened on first use at Config.CATALOG_PATH, and the file
+    at Config.CATALOG_SOURCE (if any) is imported incrementally. That can
+    take a while, so async callers use open_catalog() instead.
+    """
+    global _catalog, _unavailable
+    path = Config.CATALOG_PATH
+    if not path or path == _unavailable:
+        return None
+    if _catalog is not None and _catalog.path == path:
+        return _catalog
+
+    with _opening:
+        if _catalog is not None and _catalog.path == path:
+            return _catalog
+        try:
+            _catalog = CatalogIndex(path, max_age=Config.CATALOG_MAX_AGE)
+            if Config.CATALOG_SOURCE and os.path.exists(Config.CATALOG_SOURCE):
+                _catalog.import_file(Config.CATALOG_SOURCE)
+        except sqlite3.Error:
+            # SQLite without FTS5, or an unwritable location: run without an index
+            _catalog = None
+            _unavailable = path
+        return _catalog
+
+
+async def open_catalog() -> Optional[CatalogIndex]:
+    """get_catalog() for async callers, opening the index on a worker thread"""
+    catalog = _catalog
+    if catalog is not None and catalog.path == Config.CATALOG_PATH:
+        return catalog
+    return await asyncio.to_thread(get_catalog)
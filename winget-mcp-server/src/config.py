@@ -1 +1,185 @@
-class Config: pass
+#!/usr/bin/env python3
+"""WinGet MCP Server configuration"""
+
+import os
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back to default"""
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read an on/off setting from the environment, falling back to default"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back to default"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Config:
+    """Server settings, overridable through WINGET_MCP_* environment variables"""
+
+    # Result cache: seconds a result is fresh, per tool
+    CACHE_TTL = {
+        "search": _env_float("WINGET_MCP_SEARCH_TTL", 300.0),
+        "info": _env_float("WINGET_MCP_INFO_TTL", 900.0),
+        "list": _env_float("WINGET_MCP_LIST_TTL", 60.0),
+    }
+
+    # Result cache: extra seconds a stale result may be served while it is
+    # refreshed in the background
+    CACHE_STALE_TTL = _env_float("WINGET_MCP_CACHE_STALE_TTL", 600.0)
+
+    # Result cache: upper bounds on entries and approximate payload bytes
+    CACHE_MAX_ENTRIES = _env_int("WINGET_MCP_CACHE_MAX_ENTRIES", 512)
+    CACHE_MAX_BYTES = _env_int("WINGET_MCP_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+
+    # Process scheduler: global cap on concurrent winget processes
+    MAX_CONCURRENT_PROCESSES = _env_int("WINGET_MCP_MAX_PROCESSES", 4)
+
+    # Process scheduler: per-lane caps; lanes default to the winget subcommand
+    OPERATION_LIMITS = {
+        "search": _env_int("WINGET_MCP_MAX_SEARCH", 4),
+        "show": _env_int("WINGET_MCP_MAX_SHOW", 4),
+        "list": _env_int("WINGET_MCP_MAX_LIST", 2),
+        "install": 1,
+    }
+
+    # Process scheduler: installers must never overlap, so every operation
+    # that runs one shares the serialized "install" lane; export reads the
+    # installed packages like list does and shares its lane
+    OPERATION_LANES = {
+        "upgrade": "install",
+        "uninstall": "install",
+        "export": "list",
+    }
+
+    # Process scheduler: lower values are served first, so queued reads are
+    # admitted ahead of queued installs
+    OPERATION_PRIORITY = {
+        "install": 10,
+    }
+
+    # Catalog index: SQLite file backing offline search; empty disables it
+    CATALOG_PATH = os.environ.get(
+        "WINGET_MCP_CATALOG",
+        os.path.join(
+            os.environ.get("LOCALAPPDATA") or os.path.expanduser("~/.cache"),
+            "winget-mcp-server", "catalog.db",
+        ),
+    )
+
+    # Catalog index: optional exported catalog file imported on startup
+    CATALOG_SOURCE = os.environ.get("WINGET_MCP_CATALOG_SOURCE", "")
+
+    # Catalog index: seconds a query answered by winget is trusted
+    CATALOG_MAX_AGE = _env_float("WINGET_MCP_CATALOG_MAX_AGE", 86400.0)
+
+    # Streaming: stop `winget list` once `count` rows are parsed instead of
+    # draining the rest in the background to count installed packages
+    LIST_STOP_AT_COUNT = _env_bool("WINGET_MCP_LIST_STOP_AT_COUNT", False)
+
+    # Pagination: matches `winget search` reads and keeps for cursor pages
+    SEARCH_RESULT_LIMIT = _env_int("WINGET_MCP_SEARCH_RESULT_LIMIT", 200)
+
+    # Search enrichment: seconds to wait for `winget show` details before
+    # returning the rest as pending
+    ENRICH_BUDGET = _env_float("WINGET_MCP_ENRICH_BUDGET", 2.0)
+
+    # Structured output: read installed packages from `winget export` JSON
+    # when this winget supports it; the `winget list` table is then only read
+    # when available versions are needed, e.g. for upgrade checks
+    STRUCTURED_OUTPUT = _env_bool("WINGET_MCP_STRUCTURED_OUTPUT", True)
+
+    # Installed snapshot: seconds before a background refresh of the
+    # installed packages
+    SNAPSHOT_MAX_AGE = _env_float("WINGET_MCP_SNAPSHOT_MAX_AGE", 60.0)
+
+    # Installed snapshot: versions of change history kept for deltas
+    SNAPSHOT_HISTORY = _env_int("WINGET_MCP_SNAPSHOT_HISTORY", 64)
+
+    # Batch installs: concurrent `winget show` resolves ahead of the installs
+    BATCH_PARALLELISM = _env_int("WINGET_MCP_BATCH_PARALLELISM", 4)
+
+    # Installs: seconds an installer may run before it is killed; 0 disables
+    INSTALL_TIMEOUT = _env_float("WINGET_MCP_INSTALL_TIMEOUT", 1800.0)
+
+    # Jobs: install job records kept; the oldest finished ones are evicted
+    MAX_JOBS = _env_int("WINGET_MCP_MAX_JOBS", 100)
+
+    # Installs: meaningful output lines kept per install or job; progress
+    # frames are dropped and older lines fall out
+    OUTPUT_TAIL_LINES = _env_int("WINGET_MCP_OUTPUT_TAIL_LINES", 50)
+
+    # Responses: "records" (a list of objects) or "table" (package lists as
+    # column names plus rows of values)
+    RESPONSE_LAYOUT = os.environ.get("WINGET_MCP_RESPONSE_LAYOUT", "records").strip().lower()
+
+    # Responses: JSON indent; 0 writes compact JSON
+    RESPONSE_INDENT = _env_int("WINGET_MCP_RESPONSE_INDENT", 0)
+
+    # Responses: "auto" uses orjson when installed, "json" the standard library
+    JSON_BACKEND = os.environ.get("WINGET_MCP_JSON_BACKEND", "auto").strip().lower()
+
+    # Executor: "subprocess" runs winget; "fake" replays recorded output so
+    # tests and benchmarks run without Windows
+    EXECUTOR = os.environ.get("WINGET_MCP_EXECUTOR", "subprocess").strip().lower()
+
+    # Fake executor: directory of <subcommand>.txt recordings and export.json
+    FAKE_FIXTURES = os.environ.get("WINGET_MCP_FAKE_FIXTURES", "")
+
+    # Fake executor: seconds before each reply, and after each output line
+    FAKE_LATENCY = _env_float("WINGET_MCP_FAKE_LATENCY", 0.0)
+    FAKE_LINE_LATENCY = _env_float("WINGET_MCP_FAKE_LINE_LATENCY", 0.0)
+
+    # Fake executor: share of calls that fail, drawn from a seeded generator
+    FAKE_FAILURE_RATE = _env_float("WINGET_MCP_FAKE_FAILURE_RATE", 0.0)
+    FAKE_SEED = _env_int("WINGET_MCP_FAKE_SEED", 0)
+
+    # Metrics: per-tool, per-phase latency histograms (winget_metrics)
+    METRICS = _env_bool("WINGET_MCP_METRICS", True)
+
+    # Metrics: also record them through opentelemetry-api when it is installed
+    OTEL_METRICS = _env_bool("WINGET_MCP_OTEL_METRICS", False)
+
+    # Admission control: requests a lane may queue for a process slot before
+    # new ones are rejected at once; 0 queues without limit. Installs queue
+    # up to the number of job records kept.
+    MAX_QUEUED = _env_int("WINGET_MCP_MAX_QUEUED", 32)
+    QUEUE_LIMITS = {
+        "install": MAX_JOBS,
+    }
+
+    # Timeouts: seconds a winget process may run once started, per
+    # subcommand, before its process tree is killed; 0 disables
+    OPERATION_TIMEOUTS = {
+        "search": _env_float("WINGET_MCP_SEARCH_TIMEOUT", 60.0),
+        "show": _env_float("WINGET_MCP_SHOW_TIMEOUT", 60.0),
+        "list": _env_float("WINGET_MCP_LIST_TIMEOUT", 120.0),
+        "export": _env_float("WINGET_MCP_LIST_TIMEOUT", 120.0),
+        "install": INSTALL_TIMEOUT,
+        "upgrade": INSTALL_TIMEOUT,
+        "uninstall": INSTALL_TIMEOUT,
+    }
+
+    # Timeouts: for subcommands without their own entry
+    COMMAND_TIMEOUT = _env_float("WINGET_MCP_COMMAND_TIMEOUT", 300.0)
+
+    # Output caps: stdout bytes kept from one winget process; the rest is
+    # dropped and a truncation marker appended
+    MAX_OUTPUT_BYTES = _env_int("WINGET_MCP_MAX_OUTPUT_BYTES", 8 * 1024 * 1024)
+
+    # Output caps: stderr bytes kept from one winget process
+    MAX_STDERR_BYTES = _env_int("WINGET_MCP_MAX_STDERR_BYTES", 64 * 1024)
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Background winget jobs with status, incremental output and cancellation"""
+
+import asyncio
+import codecs
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .config import Config
+from .utils.condense import OutputCondenser
+from .utils.process import TRUNCATED_MARKER, kill_and_reap, read_capped, spawn_winget_group
+from .utils.scheduler import get_scheduler
+
+# Job states; everything except queued and running is final
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+TIMED_OUT = "timed_out"
+
+ACTIVE = (QUEUED, RUNNING)
+
+
+class Job:
+    """
+    One background winget invocation and the tail of what it printed
+
+    stdout goes through an OutputCondenser, so progress frames are dropped
+    and only the last Config.OUTPUT_TAIL_LINES lines are kept.
+    """
+
+    def __init__(self, kind: str, args: List[str], details: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.args = args
+        self.details = details
+        self.status = QUEUED
+        self.return_code: Optional[int] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stderr = ''
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.task: Optional[asyncio.Task] = None
+        self.condenser = OutputCondenser(Config.OUTPUT_TAIL_LINES)
+
+    @property
+    def done(self) -> bool:
+        return self.status not in ACTIVE
+
+    def append(self, text: str) -> None:
+        """Record a chunk of stdout"""
+        self.condenser.feed(text)
+
+    def output(self, offset: int = 0) -> str:
+        """Condensed stdout from character offset onwards, as far as it is still kept"""
+        return self.condenser.text(offset)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Status summary without the output"""
+        result = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "done": self.done,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "return_code": self.return_code,
+            "output_length": self.condenser.length,
+            "facts": dict(self.condenser.facts),
+        }
+        result.update(self.details)
+        if self.error:
+            result["error"] = self.error
+        return result
+
+
+class JobStore:
+    """
+    Runs winget jobs in the background and keeps a bounded record of them
+
+    Jobs wait for a scheduler slot like any other winget call, then run in
+    their own process group so cancellation and timeouts kill installer
+    child processes too. Once more than max_jobs records exist, the oldest
+    finished ones are evicted; active jobs are never evicted.
+    """
+
+    def __init__(self, max_jobs: int = 100):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.evictions = 0
+
+    def submit(self, kind: str, args: List[str], details: Optional[Dict[str, Any]] = None,
+               timeout: Optional[float] = None,
+               on_success: Optional[Callable[[], None]] = None,
+               prepare: Optional[Callable[[Job], Awaitable[None]]] = None) -> Job:
+        """
+        Start a winget job in the background
+
+        Args:
+            kind: Job type reported to clients, e.g. "install"
+            args: winget arguments, starting with the subcommand
+            details: Extra fields reported with the status, e.g. package_id
+            timeout: Seconds the process may run before it is killed
+            on_success: Called when winget exits with code 0
+            prepare: Awaited before the job queues for a slot; may rewrite
+                     job.args and job.details, and fails the job by raising
+
+        Returns:
+            The queued job
+        """
+        job = Job(kind, args, details or {})
+        self._jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, timeout, on_success, prepare))
+        self._evict()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return the job with this id, or None when unknown or evicted"""
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        """All recorded jobs, oldest first"""
+        return list(self._jobs.values())
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """
+        Wait until a job is finished or timeout passes
+
+        Args:
+            job_id: Job identifier
+            timeout: Seconds to wait at most; None waits until it is done
+
+        Returns:
+            The job in whatever state it reached, or None when unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job.task is None:
+            return job
+        await asyncio.wait([job.task], timeout=timeout)
+        return job
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job, killing its process tree if it is running
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            The job, or None when unknown
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done or job.task is None:
+            return job
+        job.task.cancel()
+        await asyncio.wait([job.task])
+        return job
+
+    def stats(self) -> Dict[str, Any]:
+        """Count jobs by status"""
+        counts: Dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"jobs": len(self._jobs), "by_status": counts,
+                "max_jobs": self.max_jobs, "evictions": self.evictions}
+
+    async def _run(self, job: Job, timeout: Optional[float],
+                   on_success: Optional[Callable[[], None]],
+                   prepare: Optional[Callable[[Job], Awaitable[None]]] = None) -> None:
+        try:
+            if prepare is not None:
+                await prepare(job)
+            async with get_scheduler().slot(job.args[0]):
+                job.status = RUNNING
+                job.started_at = time.time()
+                job.process = await spawn_winget_group(job.args)
+                try:
+                    await asyncio.wait_for(self._pump(job), timeout)
+                except BaseException:
+                    # Bounded by KILL_GRACE, in case a grandchild holds the pipes
+                    await kill_and_reap(job.process)
+                    raise
+            job.return_code = job.process.returncode
+            if job.return_code == 0:
+                job.status = SUCCEEDED
+                if on_success is not None:
+                    on_success()
+            else:
+                job.status = FAILED
+                job.error = job.stderr.strip() or f"winget exited with code {job.return_code}"
+        except asyncio.TimeoutError:
+            job.status = TIMED_OUT
+            job.error = f"Timed out after {timeout:g}s"
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            if job.process is not None:
+                job.return_code = job.process.returncode
+            job.condenser.close(job.return_code)
+            job.finished_at = time.time()
+            self._evict()
+
+    async def _pump(self, job: Job) -> None:
+        """Copy stdout into the job as it arrives and wait for exit"""
+        process = job.process
+        stderr = asyncio.ensure_future(read_capped(process.stderr, Config.MAX_STDERR_BYTES))
+        # Incremental so a multi-byte character split across reads survives
+        decode = codecs.getincrementaldecoder('utf-8')(errors='ignore').decode
+        try:
+            read = process.stdout.read
+            while True:
+                chunk = await read(4096)
+                if not chunk:
+                    break
+                job.append(decode(chunk))
+            await process.wait()
+            data, dropped = await stderr
+            job.stderr = data.decode('utf-8', errors='ignore')
+            if dropped:
+                job.stderr += TRUNCATED_MARKER.format(dropped=dropped)
+        finally:
+            stderr.cancel()
+
+    def _evict(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        if excess <= 0:
+            return
+        for job_id in [job.id for job in self._jobs.values() if job.done][:excess]:
+            del self._jobs[job_id]
+            self.evictions += 1
+
+
+_store: Optional[JobStore] = None
+
+
+def get_job_store() -> JobStore:
+    """Return the process-wide job store"""
+    global _store
+    if _store is None:
+        _store = JobStore(Config.MAX_JOBS)
+    return _store
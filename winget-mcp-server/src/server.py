@@ -1,70 +1,242 @@
 #!/usr/bin/env python3
 """WinGet MCP Server - Main server implementation using FastMCP"""
 
-import asyncio
+import importlib
+import inspect
 import json
-import sys
-import os
-from typing import Annotated, Optional
-from pydantic import Field
-from mcp.server.fastmcp import FastMCP
-
-# Add src directory to Python path to ensure tools can be imported
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from typing import Annotated, Any, Callable, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+from mcp.server.fastmcp import Context, FastMCP
 
 # Create the FastMCP server instance
 mcp = FastMCP("winget-mcp-server")
 
-@mcp.tool()
+# Tool or resource name -> "module:function" implementing it, relative to
+# this package. A module is imported the first time one of its tools is
+# called and the function is kept, so start-up only pays for FastMCP and
+# each later call is a dict lookup.
+IMPLEMENTATIONS = {
+    "winget_search": "tools.search_tool:search_packages",
+    "winget_list": "tools.list_tool:list_installed",
+    "winget_info": "tools.info_tool:get_package_info",
+    "winget_install": "tools.install_tool:start_install",
+    "winget_job_status": "tools.job_tool:get_job_status",
+    "winget_job_output": "tools.job_tool:get_job_output",
+    "winget_job_cancel": "tools.job_tool:cancel_job",
+    "winget_install_batch": "tools.install_tool:install_batch",
+    "winget_list_changes": "tools.changes_tool:list_changes",
+    "winget_info_batch": "tools.info_tool:get_package_info_batch",
+    "winget_upgrades": "tools.upgrade_tool:find_upgrades",
+    "winget_upgrade_batch": "tools.upgrade_tool:upgrade_batch",
+    "cache_stats": "utils.cache:get_result_cache",
+    "job_stats": "jobs:get_job_store",
+    "scheduler_stats": "utils.scheduler:get_scheduler",
+    "executor_stats": "winget_manager:get_executor",
+    "winget_metrics": "tools.metrics_tool:get_server_metrics",
+    "metrics_text": "tools.metrics_tool:prometheus_text",
+    "encode": "utils.encoding:get_encoder",
+    "metrics": "utils.metrics:get_metrics",
+}
+
+_resolved: Dict[str, Callable[..., Any]] = {}
+
+def _implementation(name: str) -> Callable[..., Any]:
+    """Return the function implementing a tool or resource, importing its module once"""
+    function = _resolved.get(name)
+    if function is None:
+        module, _, attribute = IMPLEMENTATIONS[name].partition(':')
+        function = _resolved[name] = getattr(importlib.import_module(f'.{module}', __package__), attribute)
+    return function
+
+def _encode(result: Any) -> str:
+    """Serialize a result with the configured response encoder"""
+    return _implementation("encode")().encode(result)
+
+def _failed(result: Any) -> bool:
+    """Whether a tool result reports an error"""
+    return isinstance(result, dict) and (result.get("success") is False or "error" in result)
+
+async def _call(tool: str, action: str, *args: Any) -> str:
+    """Run a tool implementation and serialize its result or error, timing the call"""
+    try:
+        metrics = _implementation("metrics")()
+    except Exception as e:
+        # Nothing else can be imported either, so not even the encoder
+        return json.dumps({"error": f"{action} failed: {str(e)}"})
+    with metrics.call(tool) as call:
+        try:
+            result = _implementation(tool)(*args)
+            if inspect.isawaitable(result):
+                result = await result
+            call.failed = _failed(result)
+            with metrics.phase("encode"):
+                return _encode(result)
+        except Exception as e:
+            call.failed = True
+            return _encode({"error": f"{action} failed: {str(e)}"})
+
 async def winget_search(
-    query: Annotated[str, Field(description="Search term or package name to find in WinGet repositories")], 
-    count: Annotated[int, Field(description="Maximum number of search results to return", ge=1, le=50)] = 10
+    query: Annotated[str, Field(description="Search term or package name to find in WinGet repositories")],
+    count: Annotated[int, Field(description="Maximum number of search results to return", ge=1, le=50)] = 10,
+    cursor: Annotated[Optional[str], Field(description="next_cursor from a previous page to continue the same search")] = None,
+    enrich: Annotated[int, Field(description="Add publisher, description, homepage, license and tags to this many leading results", ge=0, le=20)] = 0,
+    enrich_budget_seconds: Annotated[Optional[float], Field(description="Seconds to wait for enrichment before marking the rest pending", gt=0, le=30)] = None,
+    sort: Annotated[Literal["relevance", "version"], Field(description="Order results by relevance, or by version with the newest first")] = "relevance"
 ) -> str:
     """Search for packages in WinGet repositories"""
-    try:
-        from tools.search_tool import search_packages
-        result = await search_packages(query, count)
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Search failed: {str(e)}"}, indent=2)
+    return await _call("winget_search", "Search", query, count, cursor, enrich, enrich_budget_seconds, sort)
 
-@mcp.tool()
 async def winget_list(
-    count: Annotated[int, Field(description="Maximum number of installed packages to return", ge=1, le=100)] = 20
+    count: Annotated[int, Field(description="Maximum number of installed packages to return", ge=1, le=100)] = 20,
+    include_total: Annotated[bool, Field(description="Wait for the total number of installed packages (slower on large systems)")] = False,
+    cursor: Annotated[Optional[str], Field(description="next_cursor from a previous page to continue the same listing")] = None
 ) -> str:
     """List installed packages"""
-    try:
-        from tools.list_tool import list_installed
-        result = await list_installed(count)
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"List failed: {str(e)}"}, indent=2)
+    return await _call("winget_list", "List", count, include_total, cursor)
 
-@mcp.tool()
 async def winget_info(
     package_id: Annotated[str, Field(description="Package identifier (ID) to get detailed information about")]
 ) -> str:
     """Get detailed information about a package"""
-    try:
-        from tools.info_tool import get_package_info
-        result = await get_package_info(package_id)
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Info failed: {str(e)}"}, indent=2)
+    return await _call("winget_info", "Info", package_id)
 
-@mcp.tool()
 async def winget_install(
     package_id: Annotated[str, Field(description="Package identifier (ID) to install")],
-    version: Annotated[Optional[str], Field(description="Specific version to install (optional, uses latest if not specified)")] = None,
+    version: Annotated[Optional[str], Field(description="Specific version, or a range such as 3.12.* or >=1.2,<2 resolved to the newest match (optional, uses latest if not specified)")] = None,
     silent: Annotated[bool, Field(description="Install silently without user interaction")] = True
 ) -> str:
-    """Install a package using WinGet"""
-    try:
-        from tools.install_tool import install_package
-        result = await install_package(package_id, version, silent)
-        return json.dumps(result, indent=2)
-    except Exception as e:
-        return json.dumps({"error": f"Install failed: {str(e)}"}, indent=2)
+    """Start installing a package using WinGet; returns a job ID to poll with winget_job_status"""
+    return await _call("winget_install", "Install", package_id, version, silent)
 
-if __name__ == "__main__":
+async def winget_job_status(
+    job_id: Annotated[str, Field(description="Job ID returned by winget_install")],
+    wait_seconds: Annotated[float, Field(description="Wait up to this many seconds for the job to finish", ge=0, le=60)] = 0
+) -> str:
+    """Get the status of a background install job"""
+    return await _call("winget_job_status", "Job status", job_id, wait_seconds)
+
+async def winget_job_output(
+    job_id: Annotated[str, Field(description="Job ID returned by winget_install")],
+    offset: Annotated[int, Field(description="Continue from this offset (next_offset of the previous call)", ge=0)] = 0
+) -> str:
+    """Get the output a background install job printed since an offset"""
+    return await _call("winget_job_output", "Job output", job_id, offset)
+
+async def winget_job_cancel(
+    job_id: Annotated[str, Field(description="Job ID returned by winget_install")]
+) -> str:
+    """Cancel a background install job, killing the installer"""
+    return await _call("winget_job_cancel", "Job cancel", job_id)
+
+class BatchInstallItem(BaseModel):
+    """One package of a batch install"""
+    package_id: str = Field(description="Package identifier (ID) to install")
+    version: Optional[str] = Field(default=None, description="Specific version or version range to install (optional)")
+
+async def winget_install_batch(
+    packages: Annotated[List[BatchInstallItem], Field(description="Packages to install, applied in this order", min_length=1, max_length=100)],
+    silent: Annotated[bool, Field(description="Install silently without user interaction")] = True,
+    parallelism: Annotated[Optional[int], Field(description="Packages resolved concurrently ahead of the serialized installs", ge=1, le=16)] = None,
+    timeout_seconds: Annotated[Optional[float], Field(description="Seconds each install may run before it is killed", gt=0)] = None,
+    ctx: Context = None
+) -> str:
+    """Install several packages, reporting progress after each one"""
+    async def progress(done: int, total: int, message: str) -> None:
+        if ctx is not None:
+            await ctx.report_progress(done, total, message)
+
+    return await _call("winget_install_batch", "Batch install",
+                       [item.model_dump() for item in packages], silent,
+                       parallelism, timeout_seconds, progress)
+
+async def winget_list_changes(
+    since: Annotated[Optional[str], Field(description="Version token from a previous call; omit to get every installed package")] = None
+) -> str:
+    """Report packages added, removed or upgraded since a snapshot version"""
+    return await _call("winget_list_changes", "Changes", since)
+
+async def winget_info_batch(
+    package_ids: Annotated[List[str], Field(description="Package identifiers (IDs) to get detailed information about", min_length=1, max_length=50)],
+    parallelism: Annotated[Optional[int], Field(description="Packages fetched concurrently", ge=1, le=16)] = None,
+    timeout_seconds: Annotated[Optional[float], Field(description="Return after this many seconds, marking unfinished packages as pending", gt=0)] = None,
+    ctx: Context = None
+) -> str:
+    """Get detailed information about several packages, reporting progress as each completes"""
+    async def progress(done: int, total: int, message: str) -> None:
+        if ctx is not None:
+            await ctx.report_progress(done, total, message)
+
+    return await _call("winget_info_batch", "Batch info", package_ids, parallelism,
+                       timeout_seconds, progress)
+
+async def winget_upgrades(
+    include_unknown: Annotated[bool, Field(description="Also report packages whose installed version is unknown")] = False
+) -> str:
+    """List installed packages with a newer version available, without running winget upgrade"""
+    return await _call("winget_upgrades", "Upgrades", include_unknown)
+
+async def winget_upgrade_batch(
+    package_ids: Annotated[Optional[List[str]], Field(description="Installed packages to upgrade, in this order; omit to upgrade everything winget_upgrades reports", min_length=1, max_length=100)] = None,
+    silent: Annotated[bool, Field(description="Upgrade silently without user interaction")] = True,
+    timeout_seconds: Annotated[Optional[float], Field(description="Seconds each upgrade may run before it is killed", gt=0)] = None
+) -> str:
+    """Start upgrading packages as background jobs; returns a job ID per package to poll with winget_job_status"""
+    return await _call("winget_upgrade_batch", "Batch upgrade", package_ids, silent, timeout_seconds)
+
+async def winget_metrics(
+    reset: Annotated[bool, Field(description="Clear the latency histograms and call counters after reading them")] = False
+) -> str:
+    """Report per-tool, per-phase latency percentiles, error rates, and cache and process stats"""
+    return await _call("winget_metrics", "Metrics", reset)
+
+# Registration table; handler names are the tool names in IMPLEMENTATIONS
+TOOLS = (
+    winget_search,
+    winget_list,
+    winget_info,
+    winget_install,
+    winget_job_status,
+    winget_job_output,
+    winget_job_cancel,
+    winget_install_batch,
+    winget_list_changes,
+    winget_info_batch,
+    winget_upgrades,
+    winget_upgrade_batch,
+    winget_metrics,
+)
+
+for _handler in TOOLS:
+    mcp.add_tool(_handler)
+
+@mcp.resource("winget://cache/stats")
+def cache_stats() -> str:
+    """Result cache hit/miss counters and occupancy"""
+    return _encode(_implementation("cache_stats")().stats())
+
+@mcp.resource("winget://jobs/stats")
+def job_stats() -> str:
+    """Background job counts by status"""
+    return _encode(_implementation("job_stats")().stats())
+
+@mcp.resource("winget://scheduler/stats")
+def scheduler_stats() -> str:
+    """Process scheduler queue depth and wait-time metrics"""
+    return _encode(_implementation("scheduler_stats")().stats())
+
+@mcp.resource("winget://executor/stats")
+def executor_stats() -> str:
+    """winget executor backend and the number of processes it started"""
+    return _encode(_implementation("executor_stats")().stats())
+
+@mcp.resource("winget://metrics", mime_type="text/plain")
+def metrics_text() -> str:
+    """Tool latency histograms, call and error counters, cache and process stats in Prometheus text format"""
+    return _implementation("metrics_text")()
+
+def main() -> None:
+    """Run the server over stdio"""
     mcp.run()
+
+if __name__ == "__main__":
+    main()
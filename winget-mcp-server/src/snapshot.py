@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""In-memory snapshot of installed packages with versioned change tracking"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import Config
+from .tools.list_tool import read_installed
+from .utils.cache import get_result_cache
+from .utils.singleflight import coalesce
+
+Package = Dict[str, Optional[str]]
+
+# Per lowercased id: the package before and after a refresh, None if absent
+Change = Tuple[Optional[Package], Optional[Package]]
+
+
+class InstalledSnapshot:
+    """
+    Installed packages indexed by id, versioned by refresh
+
+    Every refresh diffs the new `winget list` against the snapshot. When
+    anything changed the version is bumped and the per-id changes are kept
+    in a bounded history, so changes_since() can answer with the net delta
+    since any recent version. Version tokens carry a per-process tag:
+    tokens from before a restart, or older than the history, get a full
+    listing instead of a delta.
+    """
+
+    def __init__(self, history: int = 64, max_age: float = 60.0):
+        self.max_age = max_age
+        self.version = 0
+        self.refreshes = 0
+        self.refreshed_at: Optional[float] = None
+        self._instance = uuid.uuid4().hex[:8]
+        self._packages: Dict[str, Package] = {}
+        self._history: Deque[Tuple[int, Dict[str, Change]]] = deque(maxlen=history)
+        self._loaded_at: Optional[float] = None
+        self._table_at: Optional[float] = None
+        self._invalid = True
+        self._tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._packages)
+
+    @property
+    def token(self) -> str:
+        """Opaque version token for the current snapshot"""
+        return f"{self._instance}.{self.version}"
+
+    def get(self, package_id: str) -> Optional[Package]:
+        """
+        Look up an installed package
+
+        Args:
+            package_id: Package identifier, case-insensitive
+
+        Returns:
+            The installed package, or None when it is not installed
+        """
+        return self._packages.get(package_id.lower())
+
+    def installed_version(self, package_id: str) -> Optional[str]:
+        """Installed version of package_id, or None when it is not installed"""
+        package = self._packages.get(package_id.lower())
+        return package["version"] if package is not None else None
+
+    def packages(self) -> List[Package]:
+        """All installed packages, in `winget list` order"""
+        return list(self._packages.values())
+
+    def apply(self, packages: Iterable[Package], table: bool = True) -> Dict[str, Change]:
+        """
+        Replace the snapshot with a fresh listing
+
+        Args:
+            packages: Parsed `winget list` rows
+            table: Whether they were read from the table, available
+                   versions included, rather than from an export
+
+        Returns:
+            Changes by lowercased id; empty when nothing changed
+        """
+        current = {package["id"].lower(): package for package in packages}
+        previous = self._packages
+        changes: Dict[str, Change] = {}
+        for key, package in current.items():
+            before = previous.get(key)
+            if before != package:
+                changes[key] = (before, package)
+        for key, before in previous.items():
+            if key not in current:
+                changes[key] = (before, None)
+
+        self._packages = current
+        self._loaded_at = time.monotonic()
+        if table:
+            self._table_at = self._loaded_at
+        self.refreshed_at = time.time()
+        self._invalid = False
+        if changes:
+            self.version += 1
+            self._history.append((self.version, changes))
+        return changes
+
+    def changes_since(self, token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Describe what changed since the snapshot identified by token
+
+        Args:
+            token: Version token from an earlier call, or None
+
+        Returns:
+            Dictionary with the current token and the added, removed,
+            upgraded and changed packages. "full" is true when the token
+            could not be resolved and "added" lists every package.
+        """
+        since = self._parse_token(token)
+        oldest = self._history[0][0] - 1 if self._history else self.version
+        if since is None or since < oldest:
+            return self._delta({key: (None, package) for key, package in self._packages.items()}, True)
+
+        merged: Dict[str, Change] = {}
+        for version, changes in self._history:
+            if version <= since:
+                continue
+            for key, (before, after) in changes.items():
+                if key in merged:
+                    before = merged[key][0]
+                merged[key] = (before, after)
+        return self._delta(merged, False)
+
+    def _parse_token(self, token: Optional[str]) -> Optional[int]:
+        """Version number in token, or None when it is not ours"""
+        if not token:
+            return None
+        instance, _, version = token.partition('.')
+        if instance != self._instance or not version.isdigit():
+            return None
+        version = int(version)
+        return version if version <= self.version else None
+
+    def _delta(self, changes: Dict[str, Change], full: bool) -> Dict[str, Any]:
+        added, removed, upgraded, changed = [], [], [], []
+        for before, after in changes.values():
+            if before is None and after is not None:
+                added.append(after)
+            elif after is None and before is not None:
+                removed.append(before)
+            elif before is None or before == after:
+                # Added and removed again, or changed back, within the window
+                continue
+            elif before["version"] != after["version"]:
+                upgraded.append({
+                    "id": after["id"],
+                    "name": after["name"],
+                    "from_version": before["version"],
+                    "to_version": after["version"],
+                })
+            else:
+                changed.append(after)
+        return {
+            "version": self.token,
+            "full": full,
+            "total_installed": len(self._packages),
+            "added": added,
+            "removed": removed,
+            "upgraded": upgraded,
+            "changed": changed,
+        }
+
+    def is_loaded(self) -> bool:
+        """Whether at least one refresh has succeeded"""
+        return self._loaded_at is not None
+
+    def is_stale(self) -> bool:
+        """Whether the snapshot is older than max_age or was invalidated"""
+        return (self._invalid or self._loaded_at is None
+                or time.monotonic() - self._loaded_at >= self.max_age)
+
+    def invalidate(self) -> None:
+        """Mark the snapshot out of date, e.g. after an install"""
+        self._invalid = True
+        self._table_at = None
+
+    async def refresh(self, include_available: bool = False) -> Dict[str, Any]:
+        """
+        Re-read the installed packages and apply them; concurrent calls share one run
+
+        Args:
+            include_available: Read the `winget list` table for available
+                               versions even when `winget export` would do
+
+        Returns:
+            The read_installed() result, with success and any error
+        """
+        return await coalesce(("snapshot", include_available),
+                              lambda: self._refresh(include_available))
+
+    async def _refresh(self, include_available: bool) -> Dict[str, Any]:
+        result = await read_installed(include_available)
+        if result["success"]:
+            self.refreshes += 1
+            packages = result["packages"]
+            table = result.get("available", True)
+            if not table:
+                packages = self._carry_over(packages)
+            if result.get("structured"):
+                packages = self._keep_names(packages)
+            self.apply(packages, table)
+        return result
+
+    def _carry_over(self, packages: List[Package]) -> List[Package]:
+        """
+        Complete an export-only listing from the last table read
+
+        A package keeps its available version while its installed version
+        is unchanged, and packages without a source, which the export
+        leaves out, are kept until the next table read.
+        """
+        seen = set()
+        for package in packages:
+            key = package["id"].lower()
+            seen.add(key)
+            before = self._packages.get(key)
+            if before is not None and before["version"] == package["version"]:
+                package["available"] = before["available"]
+        return packages + [before for key, before in self._packages.items()
+                           if key not in seen and before["source"] == "Unknown"]
+
+    def _keep_names(self, packages: List[Package]) -> List[Package]:
+        """Reuse known display names for exported packages, which the table may word differently"""
+        for package in packages:
+            before = self._packages.get(package["id"].lower())
+            if before is not None and before["name"] != before["id"]:
+                package["name"] = before["name"]
+        return packages
+
+    async def ensure_fresh(self, include_available: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Bring the snapshot up to date before answering
+
+        A snapshot that was never loaded or was invalidated is refreshed
+        before returning; one that merely aged past max_age is refreshed
+        in the background while the current data is served.
+
+        Args:
+            include_available: The caller needs available versions, so the
+                               `winget list` table must have been read too,
+                               under the same rules
+
+        Returns:
+            The refresh result when one was awaited, otherwise None
+        """
+        table_missing = include_available and self._table_at is None
+        if self._invalid or self._loaded_at is None or table_missing:
+            return await self.refresh(include_available)
+        table_stale = include_available and time.monotonic() - self._table_at >= self.max_age
+        if self.is_stale() or table_stale:
+            task = asyncio.create_task(self.refresh(include_available))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return None
+
+
+_snapshot: Optional[InstalledSnapshot] = None
+
+
+def get_snapshot() -> InstalledSnapshot:
+    """Return the process-wide installed-packages snapshot"""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = InstalledSnapshot(Config.SNAPSHOT_HISTORY, Config.SNAPSHOT_MAX_AGE)
+    return _snapshot
+
+
+def installed_set_changed() -> None:
+    """The installed set changed, so cached listings and the snapshot are out of date"""
+    get_result_cache().invalidate("list")
+    get_snapshot().invalidate()
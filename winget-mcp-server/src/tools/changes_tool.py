@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""WinGet installed-package changes tool implementation"""
+
+from typing import Dict, Any, Optional
+
+from ..snapshot import get_snapshot
+
+async def list_changes(since: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Report installed-package changes since a snapshot version
+    
+    Answers from the in-memory snapshot of installed packages, which is
+    refreshed first when it was never loaded or an install invalidated it,
+    and in the background once it is older than its max age.
+    
+    Args:
+        since: Version token returned by an earlier call; omit (or pass an
+               expired token) to receive every installed package as added
+        
+    Returns:
+        Dictionary with the new version token and the added, removed,
+        upgraded and changed packages
+    """
+    try:
+        snapshot = get_snapshot()
+        refreshed = await snapshot.ensure_fresh()
+        if refreshed is not None and not refreshed["success"] and not snapshot.is_loaded():
+            return {
+                "success": False,
+                "error": refreshed["error"]
+            }
+        
+        result = {"success": True}
+        result.update(snapshot.changes_since(since))
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Changes error: {str(e)}"
+        }
@@ -1,40 +1,153 @@
 #!/usr/bin/env python3
 """WinGet info tool implementation"""
 
-import subprocess
 import asyncio
 import json
 import re
-from typing import Dict, Any
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..catalog import open_catalog
+from ..config import Config
+from ..utils.cache import get_result_cache
+from ..utils.metrics import CATALOG, PARSE, get_metrics
+from ..utils.process import run_winget, strip_truncation
+from ..utils.progress import ProgressCallback, report_progress
+from ..utils.singleflight import coalesce
+from ..utils.versions import sort_versions
+
+# Batch fetches still running after their batch returned them as pending
+_background: Set[asyncio.Future] = set()
 
 async def get_package_info(package_id: str) -> Dict[str, Any]:
     """
     Get detailed information about a package using WinGet
     
+    Results are served from the shared result cache when a fresh entry
+    exists for the same package ID.
+    Concurrent identical calls share a single winget process.
+    
     Args:
         package_id: Package ID to get information for
         
     Returns:
         Dictionary containing package information
     """
+    key = ("info", package_id.strip().lower())
+    return await get_result_cache().get_or_fetch(
+        key,
+        lambda: coalesce(key, lambda: _run_show(package_id)),
+        Config.CACHE_TTL["info"],
+    )
+
+async def get_package_info_batch(package_ids: List[str], parallelism: Optional[int] = None,
+                                 timeout: Optional[float] = None,
+                                 progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Get information about several packages in one call
+    
+    Cached packages are answered at once; the rest are fetched through
+    get_package_info, at most parallelism at a time. A failure only
+    affects its own entry. Packages still being fetched when timeout
+    runs out are reported as pending and keep loading into the cache,
+    so asking again later returns them.
+    
+    Args:
+        package_ids: Package IDs; case-insensitive duplicates are dropped
+        parallelism: Concurrent fetches (default Config.BATCH_PARALLELISM)
+        timeout: Seconds to wait for the whole batch; None waits for all
+        progress: Called after each package completes
+        
+    Returns:
+        Dictionary with per-package results in request order and a
+        status summary
+    """
+    parallelism = max(1, parallelism or Config.BATCH_PARALLELISM)
+    limit = asyncio.Semaphore(parallelism)
+    cache = get_result_cache()
+    start = time.monotonic()
+    
+    async def fetch(package_id: str) -> Dict[str, Any]:
+        async with limit:
+            return await get_package_info(package_id)
+    
+    ids: List[str] = []
+    seen: Set[str] = set()
+    for package_id in package_ids:
+        package_id = package_id.strip()
+        if package_id and package_id.lower() not in seen:
+            seen.add(package_id.lower())
+            ids.append(package_id)
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    tasks: Dict[asyncio.Future, str] = {}
+    for package_id in ids:
+        cached = cache.peek(("info", package_id.lower()))
+        if cached is not None:
+            results[package_id] = _batch_entry(package_id, cached, True)
+        else:
+            tasks[asyncio.ensure_future(fetch(package_id))] = package_id
+    
+    done_count = len(results)
+    if done_count:
+        await report_progress(progress, done_count, len(ids), f"{done_count} cached")
+    
+    deadline = None if timeout is None else start + timeout
+    pending = set(tasks)
+    try:
+        while pending:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining,
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                package_id = tasks[task]
+                results[package_id] = _batch_entry(package_id, task.result(), False)
+                await report_progress(progress, len(results), len(ids),
+                                      f"{package_id}: {results[package_id]['status']}")
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+    
+    for task in pending:
+        # Left running so the result lands in the cache for the next call
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+        results[tasks[task]] = {"package_id": tasks[task], "status": "pending"}
+    
+    ordered = [results[package_id] for package_id in ids]
+    summary: Dict[str, int] = {}
+    for entry in ordered:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return {
+        "success": True,
+        "total": len(ids),
+        "summary": summary,
+        "duration_seconds": round(time.monotonic() - start, 3),
+        "results": ordered
+    }
+
+def _batch_entry(package_id: str, result: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    """Batch result entry for one get_package_info result"""
+    if result.get("success"):
+        return {"package_id": package_id, "status": "found", "cached": cached, "info": result["info"]}
+    return {"package_id": package_id, "status": "failed", "cached": cached,
+            "error": result.get("error", "Unknown error")}
+
+async def _run_show(package_id: str) -> Dict[str, Any]:
+    """Run winget show and parse its output, bypassing the cache"""
     try:
         # Build WinGet show command
-        cmd = ['winget', 'show', package_id, '--accept-source-agreements']
+        cmd = ['show', package_id, '--accept-source-agreements']
         
         # Execute the command
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout_bytes, stderr_bytes = await process.communicate()
+        completed = await run_winget(cmd)
+        stdout, stderr = completed.stdout, completed.stderr
         
-        # Decode bytes to string
-        stdout = stdout_bytes.decode('utf-8', errors='ignore')
-        stderr = stderr_bytes.decode('utf-8', errors='ignore')
-        
-        if process.returncode != 0:
+        if completed.returncode != 0:
             return {
                 "success": False,
                 "error": f"WinGet show failed: {stderr}",
@@ -43,13 +156,23 @@ async def get_package_info(package_id: str) -> Dict[str, Any]:
             }
         
         # Parse the output
-        info = parse_info_output(stdout)
+        metrics = get_metrics()
+        with metrics.phase(PARSE):
+            info = parse_info_output(strip_truncation(stdout) if completed.truncated else stdout)
         
-        return {
+        catalog = await open_catalog()
+        if catalog is not None:
+            with metrics.phase(CATALOG):
+                await asyncio.to_thread(catalog.add_info, package_id, info)
+        
+        result = {
             "success": True,
             "package_id": package_id,
             "info": info
         }
+        if completed.truncated:
+            result["truncated"] = True
+        return result
         
     except Exception as e:
         return {
@@ -59,73 +182,211 @@ async def get_package_info(package_id: str) -> Dict[str, Any]:
             "info": {}
         }
 
-def parse_info_output(output: str) -> Dict[str, str]:
+async def get_package_versions(package_id: str) -> Dict[str, Any]:
+    """
+    List the versions winget offers for a package, newest first
+
+    Results are cached like package info and concurrent identical calls
+    share a single winget process.
+
+    Args:
+        package_id: Package ID to list versions of
+
+    Returns:
+        Dictionary with the package ID and its versions
+    """
+    key = ("versions", package_id.strip().lower())
+    return await get_result_cache().get_or_fetch(
+        key,
+        lambda: coalesce(key, lambda: _run_show_versions(package_id)),
+        Config.CACHE_TTL["info"],
+    )
+
+async def _run_show_versions(package_id: str) -> Dict[str, Any]:
+    """Run winget show --versions and parse its output, bypassing the cache"""
+    try:
+        cmd = ['show', '--id', package_id, '--exact', '--versions', '--accept-source-agreements']
+        completed = await run_winget(cmd)
+
+        if completed.returncode != 0:
+            detail = (completed.stderr or completed.stdout).strip() or f"exit code {completed.returncode}"
+            return {
+                "success": False,
+                "error": f"WinGet show failed: {detail}",
+                "package_id": package_id,
+                "versions": []
+            }
+
+        with get_metrics().phase(PARSE):
+            versions = sort_versions(parse_versions_output(completed.stdout), newest_first=True)
+        return {
+            "success": True,
+            "package_id": package_id,
+            "versions": versions
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Versions error: {str(e)}",
+            "package_id": package_id,
+            "versions": []
+        }
+
+def parse_versions_output(output: str) -> List[str]:
+    """
+    Parse `winget show --versions` output: one version per line under a dashed rule
+
+    Args:
+        output: Raw WinGet output
+
+    Returns:
+        Versions in the order winget printed them
+    """
+    lines = output.splitlines()
+    for index, line in enumerate(lines):
+        if line.startswith('---'):
+            return [line.strip() for line in lines[index + 1:] if line.strip()]
+    return []
+
+# Kinds of `winget show` fields. Text values may continue on indented
+# lines, lists have one indented item per line, and sections hold
+# indented "Key: value" entries of their own.
+TEXT = "text"
+LIST = "list"
+SECTION = "section"
+
+# Exact-match table from lowercased field label to output key and kind.
+# Labels not listed here are snake_cased and typed by their first line.
+INFO_FIELDS = {
+    "version": ("version", TEXT),
+    "publisher": ("publisher", TEXT),
+    "publisher url": ("publisher_url", TEXT),
+    "publisher support url": ("publisher_support_url", TEXT),
+    "author": ("author", TEXT),
+    "moniker": ("moniker", TEXT),
+    "description": ("description", TEXT),
+    "homepage": ("homepage", TEXT),
+    "license": ("license", TEXT),
+    "license url": ("license_url", TEXT),
+    "privacy url": ("privacy_url", TEXT),
+    "copyright": ("copyright", TEXT),
+    "copyright url": ("copyright_url", TEXT),
+    "release notes": ("release_notes", TEXT),
+    "release notes url": ("release_notes_url", TEXT),
+    "purchase url": ("purchase_url", TEXT),
+    "tags": ("tags", LIST),
+    "documentation": ("documentation", SECTION),
+    "agreements": ("agreements", SECTION),
+    "installer": ("installer", SECTION),
+}
+
+# Installer entries also reported at the top level
+INSTALLER_ALIASES = ("installer_type", "installer_url")
+
+_FOUND_RE = re.compile(r'^Found (?P<name>.+?) \[(?P<id>[^\]]+)\]$')
+
+
+@lru_cache(maxsize=256)
+def _field(label: str) -> Tuple[str, Optional[str]]:
+    """Output key and kind for a field label; kind is None when unknown"""
+    known = INFO_FIELDS.get(label.lower())
+    if known is not None:
+        return known
+    return '_'.join(label.lower().split()), None
+
+
+def parse_info_output(output: str) -> Dict[str, Any]:
     """
     Parse WinGet show output into structured data
     
+    A single pass over the lines: unindented "Label: value" lines start a
+    field, and indented lines belong to the last one, as continuation
+    text, list items or section entries. Sections such as Installer,
+    Documentation and Agreements become nested dictionaries.
+    
     Args:
         output: Raw WinGet show output
         
     Returns:
         Dictionary of package information
     """
-    info = {}
-    lines = output.strip().split('\n')
-    
-    current_section = None
+    info: Dict[str, Any] = {}
+    key: Optional[str] = None       # field the indented lines belong to
+    kind: Optional[str] = None
+    section: Dict[str, Any] = {}
+    entry_indent = 0                # indent of the current section's entries
+    entry: Optional[str] = None     # section entry continuation lines extend
+    # Text values are collected as lists of lines and joined at the end,
+    # so long release notes are not copied once per line
+    texts: List[Tuple[Dict[str, Any], str]] = []
     
-    for line in lines:
-        line = line.strip()
-        if not line:
+    for line in output.split('\n'):
+        if '\r' in line:
+            # Drop spinner frames printed before the first field
+            line = line.rstrip('\r')
+            line = line[line.rfind('\r') + 1:]
+        text = line.strip()
+        if not text:
             continue
-            
-        # Check if this is a section header (no colon, usually title case)
-        if ':' not in line and line.replace(' ', '').isalnum():
-            current_section = line
+        indent = len(line) - len(line.lstrip())
+        
+        if indent == 0:
+            label, colon, value = text.partition(':')
+            if not colon:
+                found = _FOUND_RE.match(text)
+                if found:
+                    info["name"] = found["name"]
+                    info["id"] = found["id"]
+                key = None
+                continue
+            key, kind = _field(label)
+            value = value.strip()
+            if kind == SECTION and not value:
+                section = info[key] = {}
+                entry_indent = 0
+                entry = None
+                continue
+            info[key] = [value] if value else []
+            if kind != LIST:
+                texts.append((info, key))
+                if value:
+                    # Further indented lines continue the value
+                    kind = TEXT
             continue
         
-        # Parse key-value pairs
-        if ':' in line:
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                key = parts[0].strip()
-                value = parts[1].strip()
-                
-                # Add section prefix if we're in a section
-                if current_section and current_section.lower() not in key.lower():
-                    full_key = f"{current_section}_{key}".replace(' ', '_').lower()
-                else:
-                    full_key = key.replace(' ', '_').lower()
-                
-                info[full_key] = value
-    
-    # Clean up and standardize some common fields
-    standardized_info = {}
-    
-    # Map common fields to standard names
-    field_mapping = {
-        'found': 'name',
-        'version': 'version',
-        'publisher': 'publisher',
-        'description': 'description',
-        'homepage': 'homepage',
-        'license': 'license',
-        'download_url': 'download_url',
-        'installer_type': 'installer_type',
-        'installer_url': 'installer_url'
-    }
-    
-    for key, value in info.items():
-        # Try to map to standard field names
-        mapped_key = None
-        for pattern, standard_name in field_mapping.items():
-            if pattern in key.lower():
-                mapped_key = standard_name
-                break
+        if key is None:
+            continue
+        if kind is None:
+            # Unknown block: entries make it a section, anything else text
+            if ':' in text:
+                kind = SECTION
+                section = info[key] = {}
+                entry_indent = 0
+                entry = None
+            else:
+                kind = TEXT
         
-        if mapped_key:
-            standardized_info[mapped_key] = value
-        else:
-            standardized_info[key] = value
+        if kind != SECTION:
+            info[key].append(text)
+            continue
+        if not entry_indent:
+            entry_indent = indent
+        label, colon, value = text.partition(':')
+        if indent == entry_indent and colon:
+            entry = _field(label)[0]
+            value = value.strip()
+            section[entry] = [value] if value else []
+            texts.append((section, entry))
+        elif entry is not None:
+            section[entry].append(text)
     
-    return standardized_info
+    for container, name in texts:
+        if isinstance(container.get(name), list):
+            container[name] = '\n'.join(container[name])
+    installer = info.get("installer")
+    if isinstance(installer, dict):
+        for alias in INSTALLER_ALIASES:
+            if alias in installer:
+                info.setdefault(alias, installer[alias])
+    return info
@@ -1,68 +1,153 @@
 #!/usr/bin/env python3
 """WinGet install tool implementation"""
 
-import subprocess
 import asyncio
 import json
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 
-async def install_package(package_id: str, version: Optional[str] = None, silent: bool = True) -> Dict[str, Any]:
+from ..config import Config
+from ..jobs import Job, get_job_store
+from ..snapshot import installed_set_changed
+from ..utils.condense import OutputCondenser
+from ..utils.process import CommandResult, WingetTimeout, run_winget, stream_winget
+from ..utils.progress import ProgressCallback, report_progress
+from ..utils.versions import is_range, latest_matching, parse_range
+from .info_tool import get_package_versions
+
+def start_install(package_id: str, version: Optional[str] = None, silent: bool = True,
+                  timeout: Optional[float] = None) -> Dict[str, Any]:
     """
-    Install a package using WinGet
+    Start installing a package as a background job
+    
+    The job queues for the serialized install lane and runs without
+    holding the caller; poll it with the job tools. A version range is
+    resolved by the job before it queues (see install_package).
     
     Args:
         package_id: Package ID to install
-        version: Specific version to install (optional)
+        version: Specific version or version range to install (optional)
         silent: Install silently without user interaction
+        timeout: Seconds the installer may run before it is killed
+                 (default Config.INSTALL_TIMEOUT)
         
     Returns:
-        Dictionary containing installation result
+        Dictionary containing the job ID and its initial status
     """
     try:
-        # Build WinGet install command
-        cmd = ['winget', 'install', package_id, '--accept-source-agreements', '--accept-package-agreements']
-        
-        if version:
-            cmd.extend(['--version', version])
+        if timeout is None:
+            timeout = Config.INSTALL_TIMEOUT or None
+        prepare = None
+        if is_range(version):
+            # A malformed range fails the call rather than the job
+            parse_range(version)
             
-        if silent:
-            cmd.append('--silent')
+            async def prepare(job: Job) -> None:
+                resolved = await _resolve_version(package_id, version)
+                job.args = _install_command(package_id, resolved, silent)
+                job.details["resolved_version"] = resolved
         
-        # Execute the command
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+        job = get_job_store().submit(
+            "install",
+            _install_command(package_id, version, silent),
+            {"package_id": package_id, "version": version, "silent": silent},
+            timeout=timeout,
+            on_success=installed_set_changed,
+            prepare=prepare,
         )
+        result = {"success": True}
+        result.update(job.as_dict())
+        return result
         
-        stdout_bytes, stderr_bytes = await process.communicate()
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Install error: {str(e)}",
+            "package_id": package_id,
+            "version": version,
+            "silent": silent
+        }
+
+async def install_package(package_id: str, version: Optional[str] = None, silent: bool = True,
+                          timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Install a package using WinGet
+    
+    Progress frames are dropped from the output as it streams; the result
+    carries the last meaningful lines and facts such as hash_verified,
+    installer_started and installer_exit_code.
+    
+    A version range such as "3.12.*" or ">=1.2, <2" is resolved to the
+    newest matching version `winget show --versions` lists; the result
+    then reports that version and the range as requested_version.
+    
+    Args:
+        package_id: Package ID to install
+        version: Specific version or version range to install (optional)
+        silent: Install silently without user interaction
+        timeout: Seconds the installer may run before it is killed
+                 (default Config.INSTALL_TIMEOUT)
         
-        # Decode bytes to string
-        stdout = stdout_bytes.decode('utf-8', errors='ignore')
-        stderr = stderr_bytes.decode('utf-8', errors='ignore')
+    Returns:
+        Dictionary containing installation result
+    """
+    requested = version
+    try:
+        version = await _resolve_version(package_id, version)
+    except ValueError as e:
+        return {
+            "success": False,
+            "error": f"Version resolution failed: {str(e)}",
+            "package_id": package_id,
+            "version": requested,
+            "silent": silent
+        }
+    
+    condenser = OutputCondenser(Config.OUTPUT_TAIL_LINES)
+    try:
+        # Execute the command
+        completed = await _run_condensed(_install_command(package_id, version, silent),
+                                         condenser, timeout)
+        stderr = completed.stderr
         
         # Check result
-        success = process.returncode == 0
+        success = completed.returncode == 0
         
         result = {
             "success": success,
             "package_id": package_id,
             "version": version,
             "silent": silent,
-            "return_code": process.returncode,
-            "stdout": stdout.strip(),
+            "return_code": completed.returncode,
             "stderr": stderr.strip() if stderr else None
         }
+        if requested != version:
+            result["requested_version"] = requested
+        result.update(condenser.summary())
         
         if success:
+            installed_set_changed()
             result["message"] = f"Successfully installed {package_id}"
             if version:
                 result["message"] += f" version {version}"
         else:
-            result["error"] = f"Installation failed: {stderr or 'Unknown error'}"
+            result["error"] = f"Installation failed: {_failure(completed, condenser)}"
         
         return result
         
+    except WingetTimeout as e:
+        result = {
+            "success": False,
+            "error": f"Installation timed out after {e.timeout:g}s",
+            "timed_out": True,
+            "package_id": package_id,
+            "version": version,
+            "silent": silent
+        }
+        condenser.close()
+        result.update(condenser.summary())
+        return result
+        
     except Exception as e:
         return {
             "success": False,
@@ -72,6 +157,139 @@ async def install_package(package_id: str, version: Optional[str] = None, silent
             "silent": silent
         }
 
+async def install_batch(packages: List[Dict[str, Any]], silent: bool = True,
+                        parallelism: Optional[int] = None, timeout: Optional[float] = None,
+                        progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """
+    Install several packages: resolve them in parallel, apply them one at a time
+    
+    Every package is first resolved with `winget show` (up to parallelism
+    at once), which rejects unknown ids and versions before any installer
+    runs; version ranges are resolved to the newest matching version the
+    same way install_package does, and a range that does not parse is
+    reported as invalid_version without running winget. Installs then run in list order through the scheduler's
+    serialized install lane as soon as their package has resolved, each
+    with its own timeout.
+    
+    Args:
+        packages: Items with "package_id" and an optional "version"
+        silent: Install silently without user interaction
+        parallelism: Concurrent resolves (default Config.BATCH_PARALLELISM)
+        timeout: Seconds each install may run (default Config.INSTALL_TIMEOUT)
+        progress: Called after each package finishes
+        
+    Returns:
+        Dictionary with per-package results and a status summary
+    """
+    parallelism = max(1, parallelism or Config.BATCH_PARALLELISM)
+    if timeout is None:
+        timeout = Config.INSTALL_TIMEOUT or None
+    limit = asyncio.Semaphore(parallelism)
+    
+    async def resolve(package_id: str,
+                      version: Optional[str]) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """Returns (resolved version, failure status, error)"""
+        if is_range(version):
+            try:
+                parse_range(version)
+            except ValueError as e:
+                return None, "invalid_version", f"Invalid version range: {str(e)}"
+        async with limit:
+            if is_range(version):
+                try:
+                    return await _resolve_version(package_id, version), None, None
+                except ValueError as e:
+                    return None, "not_found", f"Package not found: {str(e)}"
+            error = await _resolve_package(package_id, version)
+            return version, "not_found" if error else None, error
+    
+    start = time.monotonic()
+    resolving = [asyncio.ensure_future(resolve(item["package_id"], item.get("version")))
+                 for item in packages]
+    results = []
+    try:
+        for item, resolved in zip(packages, resolving):
+            package_id, version = item["package_id"], item.get("version")
+            item_start = time.monotonic()
+            resolved_version, failure, error = await resolved
+            if failure is not None:
+                entry = {"package_id": package_id, "version": version,
+                         "status": failure, "error": error}
+            else:
+                result = await install_package(package_id, resolved_version, silent, timeout)
+                if result["success"]:
+                    status = "installed"
+                elif result.get("timed_out"):
+                    status = "timed_out"
+                else:
+                    status = "failed"
+                entry = {"package_id": package_id, "version": version, "status": status,
+                         "return_code": result.get("return_code"), "error": result.get("error")}
+                if resolved_version != version:
+                    entry["resolved_version"] = resolved_version
+            entry["duration_seconds"] = round(time.monotonic() - item_start, 3)
+            results.append(entry)
+            
+            await report_progress(progress, len(results), len(packages),
+                                  f"{package_id}: {entry['status']}")
+    finally:
+        for task in resolving:
+            task.cancel()
+    
+    summary: Dict[str, int] = {}
+    for entry in results:
+        summary[entry["status"]] = summary.get(entry["status"], 0) + 1
+    return {
+        "success": summary.get("installed", 0) == len(packages),
+        "total": len(packages),
+        "summary": summary,
+        "duration_seconds": round(time.monotonic() - start, 3),
+        "results": results
+    }
+
+async def _resolve_version(package_id: str, version: Optional[str]) -> Optional[str]:
+    """
+    Resolve a version range to the newest matching version winget offers
+    
+    Anything that is not a range, including None, is returned unchanged
+    without running winget.
+    
+    Raises:
+        ValueError: When the range is invalid, the versions cannot be
+                    listed or none of them matches
+    """
+    if not is_range(version):
+        return version
+    # Validate before running winget
+    parse_range(version)
+    listed = await get_package_versions(package_id)
+    if not listed["success"]:
+        raise ValueError(listed["error"])
+    resolved = latest_matching(listed["versions"], version)
+    if resolved is None:
+        raise ValueError(f"no version of {package_id} matches {version}")
+    return resolved
+
+async def _resolve_package(package_id: str, version: Optional[str]) -> Optional[str]:
+    """
+    Check that winget knows package_id (at version); return an error or None
+    
+    The check runs under the show deadline, not the per-install timeout.
+    """
+    cmd = ['show', '--id', package_id, '--exact', '--accept-source-agreements']
+    if version:
+        cmd.extend(['--version', version])
+    try:
+        completed = await run_winget(cmd)
+    except WingetTimeout as e:
+        return f"Resolving {package_id} timed out after {e.timeout:g}s"
+    except Exception as e:
+        return f"Resolve error: {str(e)}"
+    if completed.returncode != 0:
+        detail = (completed.stderr or completed.stdout).strip() or f"exit code {completed.returncode}"
+        return f"Package not found: {detail}"
+    return None
+
 async def uninstall_package(package_id: str, silent: bool = True) -> Dict[str, Any]:
     """
     Uninstall a package using WinGet
@@ -85,40 +303,33 @@ async def uninstall_package(package_id: str, silent: bool = True) -> Dict[str, A
     """
     try:
         # Build WinGet uninstall command
-        cmd = ['winget', 'uninstall', package_id, '--accept-source-agreements']
+        cmd = ['uninstall', package_id, '--accept-source-agreements']
         
         if silent:
             cmd.append('--silent')
         
         # Execute the command
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout_bytes, stderr_bytes = await process.communicate()
-        
-        # Decode bytes to string
-        stdout = stdout_bytes.decode('utf-8', errors='ignore')
-        stderr = stderr_bytes.decode('utf-8', errors='ignore')
+        condenser = OutputCondenser(Config.OUTPUT_TAIL_LINES)
+        completed = await _run_condensed(cmd, condenser)
+        stderr = completed.stderr
         
         # Check result
-        success = process.returncode == 0
+        success = completed.returncode == 0
         
         result = {
             "success": success,
             "package_id": package_id,
             "silent": silent,
-            "return_code": process.returncode,
-            "stdout": stdout.strip(),
+            "return_code": completed.returncode,
             "stderr": stderr.strip() if stderr else None
         }
+        result.update(condenser.summary())
         
         if success:
+            installed_set_changed()
             result["message"] = f"Successfully uninstalled {package_id}"
         else:
-            result["error"] = f"Uninstallation failed: {stderr or 'Unknown error'}"
+            result["error"] = f"Uninstallation failed: {_failure(completed, condenser)}"
         
         return result
         
@@ -129,3 +340,28 @@ async def uninstall_package(package_id: str, silent: bool = True) -> Dict[str, A
             "package_id": package_id,
             "silent": silent
         }
+
+async def _run_condensed(cmd: List[str], condenser: OutputCondenser,
+                         timeout: Optional[float] = None) -> CommandResult:
+    """Run winget, feeding its stdout to condenser as it streams"""
+    async with stream_winget(cmd, timeout) as stream:
+        async for text in stream.chunks():
+            condenser.feed(text)
+        completed = await stream.wait()
+    condenser.close(completed.returncode)
+    return completed
+
+def _failure(completed: CommandResult, condenser: OutputCondenser) -> str:
+    """Why winget failed: its stderr, else the last line it printed"""
+    return completed.stderr.strip() or condenser.last_line or 'Unknown error'
+
+def _install_command(package_id: str, version: Optional[str], silent: bool) -> List[str]:
+    """Build the winget install arguments"""
+    cmd = ['install', package_id, '--accept-source-agreements', '--accept-package-agreements']
+    
+    if version:
+        cmd.extend(['--version', version])
+        
+    if silent:
+        cmd.append('--silent')
+    return cmd
\ No newline at end of file
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""WinGet background job tools implementation"""
+
+from typing import Dict, Any
+
+from ..jobs import get_job_store
+
+async def get_job_status(job_id: str, wait_seconds: float = 0) -> Dict[str, Any]:
+    """
+    Get the status of a background job
+    
+    Args:
+        job_id: Job identifier returned when the job was started
+        wait_seconds: Wait up to this long for the job to finish first
+        
+    Returns:
+        Dictionary containing the job status
+    """
+    try:
+        store = get_job_store()
+        job = await store.wait(job_id, wait_seconds) if wait_seconds > 0 else store.get(job_id)
+        if job is None:
+            return _unknown(job_id)
+        
+        result = {"success": True}
+        result.update(job.as_dict())
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Job status error: {str(e)}"
+        }
+
+async def get_job_output(job_id: str, offset: int = 0) -> Dict[str, Any]:
+    """
+    Get the output a background job printed since offset
+    
+    Progress frames are left out, and only the most recent lines are kept;
+    skipped counts characters after offset that were no longer kept.
+    
+    Args:
+        job_id: Job identifier returned when the job was started
+        offset: Character offset to continue from, i.e. the next_offset
+                of the previous call
+        
+    Returns:
+        Dictionary containing the new output and the offset to pass next
+    """
+    try:
+        job = get_job_store().get(job_id)
+        if job is None:
+            return _unknown(job_id)
+        
+        condenser = job.condenser
+        return {
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "done": job.done,
+            "offset": offset,
+            "next_offset": max(offset, condenser.length),
+            "skipped": max(0, condenser.start - offset),
+            "output": job.output(offset)
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Job output error: {str(e)}"
+        }
+
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    Cancel a queued or running job, killing its process tree
+    
+    Args:
+        job_id: Job identifier returned when the job was started
+        
+    Returns:
+        Dictionary containing the job status after cancellation
+    """
+    try:
+        job = await get_job_store().cancel(job_id)
+        if job is None:
+            return _unknown(job_id)
+        
+        result = {"success": True}
+        result.update(job.as_dict())
+        return result
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Job cancel error: {str(e)}"
+        }
+
+def _unknown(job_id: str) -> Dict[str, Any]:
+    return {
+        "success": False,
+        "error": f"Unknown job: {job_id} (it may have been evicted)"
+    }
@@ -1,55 +1,258 @@
 #!/usr/bin/env python3
 """WinGet list tool implementation"""
 
-import subprocess
 import asyncio
 import json
-import re
-from typing import List, Dict, Any
+from contextlib import aclosing
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 
-async def list_installed(count: int = 20) -> Dict[str, Any]:
+from ..catalog import open_catalog
+from ..config import Config
+from ..utils import pagination, structured
+from ..utils.cache import get_result_cache
+from ..utils.metrics import CATALOG, get_metrics
+from ..utils.process import stream_winget
+from ..utils.singleflight import coalesce
+from ..utils.table import aiter_table_cells, iter_table_cells
+
+LIST_FIELDS = ('name', 'id', 'version', 'available', 'source')
+
+# winget ends cells it had to shorten with an ellipsis
+ELLIPSIS = '\u2026'
+
+# The installed-package count lives under its own key in the "list"
+# namespace, so installs invalidate it along with the package pages
+TOTAL_KEY = ("list", "total")
+
+# `winget list` processes still being drained after their caller returned
+_drains: Set[asyncio.Task] = set()
+
+async def list_installed(count: int = 20, include_total: bool = False,
+                         cursor: Optional[str] = None) -> Dict[str, Any]:
     """
     List installed packages using WinGet
     
+    Results are served from the shared result cache until an install
+    invalidates the "list" namespace or the TTL runs out.
+    Concurrent identical calls share a single winget process.
+    
+    The call returns as soon as count packages are parsed. The rest of
+    the output is drained in the background to count all installed
+    packages, and that total is cached separately; total_installed is
+    null until it is known, unless include_total waits for it.
+    
+    The drained rows are also cached as a result set. next_cursor points
+    into it, so later pages are served from memory until the set expires
+    with the cache or an install invalidates it.
+    
     Args:
         count: Maximum number of results to return
+        include_total: Wait for the total number of installed packages
+        cursor: next_cursor of a previous page; continues that listing
         
     Returns:
         Dictionary containing installed packages and metadata
     """
+    if cursor:
+        return await _list_page(cursor, count)
+    
+    key = ("list", count, include_total)
+    fetch = lambda: coalesce(key, lambda: _run_list(count, include_total))
+    cache = get_result_cache()
+    result = await cache.get_or_fetch(key, fetch, Config.CACHE_TTL["list"])
+    if result.get("next_cursor") and not pagination.is_live("list", result["next_cursor"]):
+        # The cached page outlived its result set; read again for a live cursor
+        result = await fetch()
+        cache.put(key, result, Config.CACHE_TTL["list"])
+    return result
+
+async def _list_page(cursor: str, count: int) -> Dict[str, Any]:
+    """Serve a page of a cached result set"""
     try:
-        # Build WinGet list command
-        cmd = ['winget', 'list', '--accept-source-agreements']
-        
-        # Execute the command
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout_bytes, stderr_bytes = await process.communicate()
+        set_id, offset, result_set = await pagination.open_cursor("list", cursor)
+    except pagination.CursorError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "cursor_expired": e.expired,
+            "packages": []
+        }
+    
+    rows = result_set["rows"]
+    packages = [_list_package(cells) for cells in rows[offset:offset + count]]
+    return {
+        "success": True,
+        "count_requested": count,
+        "count_returned": len(packages),
+        "offset": offset,
+        "total_installed": len(rows),
+        "packages": packages,
+        "next_cursor": pagination.next_cursor("list", set_id, offset + count, len(rows))
+    }
+
+async def _run_list(count: int, include_total: bool) -> Dict[str, Any]:
+    """Run winget list and return the first count packages, bypassing the cache"""
+    try:
+        cached = get_result_cache().peek(TOTAL_KEY)
+        total = cached["total_installed"] if cached else None
         
-        # Decode bytes to string
-        stdout = stdout_bytes.decode('utf-8', errors='ignore')
-        stderr = stderr_bytes.decode('utf-8', errors='ignore')
+        set_id = pagination.new_result_set()
+        first_page = asyncio.get_running_loop().create_future()
+        drain = asyncio.create_task(_stream_list(count, first_page, set_id))
+        _drains.add(drain)
+        drain.add_done_callback(_drains.discard)
+        pagination.filling(set_id, drain)
         
-        if process.returncode != 0:
+        packages, completed = await first_page
+        if completed is not None and completed.returncode != 0:
             return {
                 "success": False,
-                "error": f"WinGet list failed: {stderr}",
+                "error": f"WinGet list failed: {completed.stderr}",
                 "packages": []
             }
         
-        # Parse the output
-        packages = parse_list_output(stdout)
+        if include_total and total is None:
+            total = await asyncio.shield(drain)
         
+        # A page cut short at count may have more rows behind it, unless
+        # the child is stopped there and no result set is kept
+        more = completed is None and not Config.LIST_STOP_AT_COUNT
         return {
             "success": True,
             "count_requested": count,
-            "count_returned": len(packages[:count]),
-            "total_installed": len(packages),
-            "packages": packages[:count]  # Return only requested count
+            "count_returned": len(packages),
+            "total_installed": total,
+            "packages": packages,
+            "next_cursor": pagination.next_cursor("list", set_id, count, total) if more else None
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"List error: {str(e)}",
+            "packages": []
+        }
+
+async def _stream_list(count: int, first_page: asyncio.Future, set_id: str) -> Optional[int]:
+    """
+    Stream `winget list`, resolving first_page once count packages are parsed
+    
+    After that the child is stopped (Config.LIST_STOP_AT_COUNT) or the
+    remaining rows are kept as cells without building dicts. The total
+    is cached under TOTAL_KEY and the rows as result set set_id.
+    
+    Args:
+        count: Number of packages the caller is waiting for
+        first_page: Future receiving (packages, CommandResult or None)
+        set_id: Result set id that cursors of this listing point to
+        
+    Returns:
+        Total number of installed packages, or None if it was not counted
+    """
+    cache = get_result_cache()
+    generation = cache.generation
+    cmd = ['list', '--accept-source-agreements']
+    packages: List[Dict[str, Optional[str]]] = []
+    rows: List[Tuple[str, ...]] = []
+    total = 0
+    try:
+        async with stream_winget(cmd) as stream:
+            async with aclosing(aiter_table_cells(stream, LIST_FIELDS)) as table:
+                async for cells in table:
+                    if not (cells[0] and cells[1]):
+                        continue
+                    rows.append(cells)
+                    total += 1
+                    if total > count:
+                        continue
+                    packages.append(_list_package(cells))
+                    if total == count:
+                        if not first_page.done():
+                            first_page.set_result((packages, None))
+                        if Config.LIST_STOP_AT_COUNT:
+                            await stream.stop()
+                            break
+            completed = await stream.wait()
+    except asyncio.CancelledError:
+        first_page.cancel()
+        raise
+    except Exception as e:
+        if not first_page.done():
+            first_page.set_exception(e)
+        return None
+    
+    if not first_page.done():
+        first_page.set_result((packages, completed))
+    if stream.stopped or completed.returncode != 0:
+        return None
+    cache.put(TOTAL_KEY, {"success": True, "total_installed": total},
+              Config.CACHE_TTL["list"], generation)
+    pagination.store("list", set_id, rows, Config.CACHE_TTL["list"], generation)
+    return total
+
+async def read_installed(include_available: bool = False) -> Dict[str, Any]:
+    """
+    Read every installed package
+    
+    When this winget supports `winget export` the export alone answers,
+    with exact ids and versions and names from the catalog index. It
+    carries no available versions and leaves out packages winget cannot
+    match to a source, so with include_available, or when export is not
+    supported, the `winget list` table is read instead and its package
+    count cached under TOTAL_KEY. The export then only runs when the
+    table cut an id or version short, to correct those rows. Names the
+    table truncated are filled in from the catalog index.
+    
+    Args:
+        include_available: Read the table for available versions even
+                           when the export would do
+    
+    Returns:
+        Dictionary with success, the full packages list, "structured"
+        telling whether export data was used and "available" telling
+        whether the table's available versions are included, or an error
+    """
+    try:
+        cache = get_result_cache()
+        generation = cache.generation
+        export = await structured.supports(structured.EXPORT)
+        exported = None
+        if export and not include_available:
+            exported = await structured.export_installed()
+        from_table = exported is None
+        if not from_table:
+            packages = exported
+        else:
+            packages, completed = await _read_table()
+            if completed.returncode != 0:
+                return {
+                    "success": False,
+                    "error": f"WinGet list failed: {completed.stderr}",
+                    "packages": []
+                }
+            cache.put(TOTAL_KEY, {"success": True, "total_installed": len(packages)},
+                      Config.CACHE_TTL["list"], generation)
+            if export and any(_cut_short(package) for package in packages):
+                exported = await structured.export_installed()
+                if exported is not None:
+                    packages = merge_export(packages, exported)
+        
+        # Exported packages only carry their id as name
+        unnamed = [package for package in packages
+                   if package["name"] == package["id"] or package["name"].endswith(ELLIPSIS)]
+        catalog = await open_catalog() if unnamed else None
+        if catalog is not None:
+            with get_metrics().phase(CATALOG):
+                names = await asyncio.to_thread(catalog.names, [package["id"] for package in unnamed])
+            for package in unnamed:
+                package["name"] = names.get(package["id"].lower(), package["name"])
+        
+        return {
+            "success": True,
+            "packages": packages,
+            "structured": exported is not None,
+            "available": from_table
         }
         
     except Exception as e:
@@ -59,56 +262,90 @@ async def list_installed(count: int = 20) -> Dict[str, Any]:
             "packages": []
         }
 
-def parse_list_output(output: str) -> List[Dict[str, str]]:
+def _cut_short(package: Dict[str, Optional[str]]) -> bool:
+    """Whether the table truncated the row's id or version"""
+    return package["id"].endswith(ELLIPSIS) or package["version"].endswith(ELLIPSIS)
+
+async def _read_table() -> Tuple[List[Dict[str, Optional[str]]], Any]:
+    """Run winget list to completion; returns the packages and the CommandResult"""
+    cmd = ['list', '--accept-source-agreements']
+    async with stream_winget(cmd) as stream:
+        async with aclosing(aiter_table_cells(stream, LIST_FIELDS)) as rows:
+            packages = [_list_package(cells) async for cells in rows if cells[0] and cells[1]]
+        completed = await stream.wait()
+    return packages, completed
+
+def merge_export(packages: List[Dict[str, Optional[str]]],
+                 exported: List[Dict[str, Optional[str]]]) -> List[Dict[str, Optional[str]]]:
+    """
+    Correct `winget list` rows with `winget export` data
+    
+    A row whose id equals an exported id, or is a truncated prefix of
+    one, takes the exported id and version; its name, available version
+    and source stay. Rows the export lacks (ARP-only packages) are kept
+    as they are, and exported packages no row matched are appended.
+    
+    Args:
+        packages: Parsed `winget list` rows
+        exported: Packages from structured.export_installed()
+        
+    Returns:
+        The merged packages in table order
+    """
+    by_id = {package["id"].lower(): package for package in exported}
+    merged = []
+    for row in packages:
+        row_id = row["id"].lower()
+        match = by_id.pop(row_id, None)
+        if match is None and row_id.endswith(ELLIPSIS):
+            prefix = row_id[:-len(ELLIPSIS)]
+            candidates = [key for key in by_id if key.startswith(prefix)]
+            if len(candidates) == 1:
+                match = by_id.pop(candidates[0])
+        if match is not None:
+            row = dict(row, id=match["id"], version=match["version"])
+        merged.append(row)
+    merged.extend(by_id.values())
+    return merged
+
+def parse_list_output(output: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
     """
     Parse WinGet list output into structured data
     
     Args:
         output: Raw WinGet list output
+        limit: Stop after this many packages
         
     Returns:
         List of installed package dictionaries
     """
-    packages = []
-    lines = output.strip().split('\n')
-    
-    # Find the header line (contains "Name", "Id", "Version", etc.)
-    header_line_idx = -1
-    for i, line in enumerate(lines):
-        if 'Name' in line and 'Id' in line and 'Version' in line:
-            header_line_idx = i
-            break
-    
-    if header_line_idx == -1:
-        return packages
-    
-    # Find separator line (dashes)
-    separator_idx = -1
-    for i in range(header_line_idx + 1, len(lines)):
-        if lines[i].strip().startswith('-'):
-            separator_idx = i
-            break
-    
-    if separator_idx == -1:
-        return packages
-    
-    # Parse package lines
-    for line in lines[separator_idx + 1:]:
-        line = line.strip()
-        if not line:
-            continue
-            
-        # Split by multiple spaces to separate columns
-        parts = re.split(r'\s{2,}', line)
-        
-        if len(parts) >= 2:
-            package = {
-                "name": parts[0].strip(),
-                "id": parts[1].strip() if len(parts) > 1 else "Unknown",
-                "version": parts[2].strip() if len(parts) > 2 else "Unknown",
-                "available": parts[3].strip() if len(parts) > 3 else None,
-                "source": parts[4].strip() if len(parts) > 4 else "Unknown"
-            }
-            packages.append(package)
+    return list(iter_list_packages(output.split('\n'), limit))
+
+def iter_list_packages(lines: Iterable[str], limit: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Lazily parse WinGet list output lines into package dictionaries
     
-    return packages
+    Args:
+        lines: Output lines
+        limit: Stop after this many packages; the remaining lines are not read
+        
+    Returns:
+        Iterator of installed package dictionaries
+    """
+    packages = (
+        _list_package(cells)
+        for cells in iter_table_cells(lines, LIST_FIELDS)
+        if cells[0] and cells[1]
+    )
+    return islice(packages, limit)
+
+def _list_package(cells: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+    """Build a package dict from (name, id, version, available, source) cells"""
+    name, id_val, version, available, source = cells
+    return {
+        "name": name,
+        "id": id_val,
+        "version": version or "Unknown",
+        "available": available or None,
+        "source": source or "Unknown"
+    }
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""WinGet server metrics tool implementation"""
+
+from typing import Dict, Any
+
+from ..utils.cache import get_result_cache
+from ..utils.metrics import get_metrics
+from ..utils.scheduler import get_scheduler
+from ..winget_manager import get_executor
+
+def get_server_metrics(reset: bool = False) -> Dict[str, Any]:
+    """
+    Report per-tool, per-phase latencies with cache, scheduler and process stats
+    
+    Args:
+        reset: Clear the latency histograms and call counters after reading
+        
+    Returns:
+        Dictionary with per-tool call counts, error rates and phase latency
+        percentiles, plus the cache, scheduler and executor stats
+    """
+    metrics = get_metrics()
+    result = {"success": True}
+    result.update(metrics.snapshot())
+    result["cache"] = get_result_cache().stats()
+    result["scheduler"] = get_scheduler().stats()
+    result["executor"] = get_executor().stats()
+    if reset:
+        metrics.reset()
+    return result
+
+def prometheus_text() -> str:
+    """
+    Render the metrics in the Prometheus text format
+    
+    Returns:
+        Phase histograms, call and error counters, and the numeric cache
+        and executor stats as gauges
+    """
+    return get_metrics().prometheus({
+        "cache": get_result_cache().stats(),
+        "executor": get_executor().stats(),
+    })
@@ -1,56 +1,196 @@
 #!/usr/bin/env python3
 """WinGet search tool implementation"""
 
-import subprocess
 import asyncio
 import json
-import re
-from typing import List, Dict, Any
+from contextlib import aclosing
+from itertools import islice
+from typing import Iterable, Iterator, List, Dict, Any, Optional, Set, Tuple
 
-async def search_packages(query: str, count: int = 10) -> Dict[str, Any]:
+from ..catalog import open_catalog
+from ..config import Config
+from ..utils import pagination
+from ..utils.cache import get_result_cache
+from ..utils.metrics import CATALOG, get_metrics
+from ..utils.process import stream_winget
+from ..utils.singleflight import coalesce
+from ..utils.table import aiter_table_cells, iter_table_cells
+from ..utils.versions import sort_versions
+from .info_tool import get_package_info_batch
+
+SEARCH_FIELDS = ('name', 'id', 'version', 'source')
+
+# `winget show` fields merged into enriched search results
+ENRICH_FIELDS = ('publisher', 'description', 'homepage', 'license', 'tags')
+
+# Result orders: winget's (or the catalog's) relevance, or newest version first
+RELEVANCE = "relevance"
+VERSION = "version"
+SORT_ORDERS = (RELEVANCE, VERSION)
+
+# `winget search` processes still being read after their caller returned
+_drains: Set[asyncio.Task] = set()
+
+async def search_packages(query: str, count: int = 10, cursor: Optional[str] = None,
+                          enrich: int = 0, enrich_budget: Optional[float] = None,
+                          sort: str = RELEVANCE) -> Dict[str, Any]:
     """
     Search for packages using WinGet
     
+    Results are served from the shared result cache when a fresh entry
+    exists for the same normalized query and count, then from the local
+    catalog index, and only then from a winget process.
+    Concurrent identical calls share a single winget process.
+    
+    Up to Config.SEARCH_RESULT_LIMIT matches are kept as a result set.
+    next_cursor points into it, so later pages are served from memory
+    until the set expires with the cache.
+    
+    With enrich, `winget show` details of the first enrich packages are
+    merged into them (see _enrich).
+    
+    Sorting by version orders the whole result set, newest version first
+    with relevance breaking ties, so the first page waits for winget to
+    finish instead of returning once count packages have streamed in.
+    
     Args:
         query: Search term or package name
         count: Maximum number of results to return
+        cursor: next_cursor of a previous page; continues that search
+        enrich: Number of leading packages to add show details to
+        enrich_budget: Seconds to wait for details
+                       (default Config.ENRICH_BUDGET)
+        sort: "relevance" or "version"; a cursor keeps the order of its
+              first page
         
     Returns:
         Dictionary containing search results and metadata
     """
+    if sort not in SORT_ORDERS:
+        return {
+            "success": False,
+            "error": f"Unknown sort order: {sort}; use one of {', '.join(SORT_ORDERS)}",
+            "packages": []
+        }
+    if cursor:
+        result = await _search_page(cursor, count)
+    else:
+        result = await _first_page(query, count, sort == VERSION)
+    if enrich > 0 and result.get("success"):
+        result = await _enrich(result, enrich, enrich_budget)
+    return result
+
+async def _first_page(query: str, count: int, by_version: bool = False) -> Dict[str, Any]:
+    """Serve the first page from the cache or a new search"""
+    key = ("search", query.strip().lower(), count)
+    if by_version:
+        key += (VERSION,)
+    fetch = lambda: coalesce(key, lambda: _run_search(query, count, by_version))
+    cache = get_result_cache()
+    result = await cache.get_or_fetch(key, fetch, Config.CACHE_TTL["search"])
+    if result.get("next_cursor") and not pagination.is_live("search", result["next_cursor"]):
+        # The cached page outlived its result set; search again for a live cursor
+        result = await fetch()
+        cache.put(key, result, Config.CACHE_TTL["search"])
+    return result
+
+async def _enrich(result: Dict[str, Any], top: int, budget: Optional[float]) -> Dict[str, Any]:
+    """
+    Merge show details into the first top packages of a search result
+    
+    Details come from get_package_info_batch, so cached packages are
+    answered at once and the rest are fetched concurrently. Whatever is
+    ready when the budget runs out is merged; the other packages get
+    "details": "pending" and keep loading into the cache, so the same
+    search with enrich a moment later has them.
+    
+    Returns:
+        A copy of result; the cached result is left untouched
+    """
+    if budget is None:
+        budget = Config.ENRICH_BUDGET
+    packages = [dict(package) for package in result["packages"]]
+    ids = [package["id"] for package in packages[:top]]
+    batch = await get_package_info_batch(ids, timeout=budget) if ids else {"results": []}
+    by_id = {entry["package_id"].lower(): entry for entry in batch["results"]}
+    for package in packages[:top]:
+        entry = by_id.get(package["id"].lower(), {"status": "failed"})
+        if entry["status"] == "found":
+            info = entry["info"]
+            package.update({field: info[field] for field in ENRICH_FIELDS if info.get(field)})
+        package["details"] = entry["status"]
+    return dict(result, packages=packages, enriched=min(top, len(packages)))
+
+async def _search_page(cursor: str, count: int) -> Dict[str, Any]:
+    """Serve a page of a cached result set"""
     try:
-        # Build WinGet search command
-        cmd = ['winget', 'search', query, '--count', str(count), '--accept-source-agreements']
-        
-        # Execute the command
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        
-        stdout_bytes, stderr_bytes = await process.communicate()
+        set_id, offset, result_set = await pagination.open_cursor("search", cursor)
+    except pagination.CursorError as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "cursor_expired": e.expired,
+            "packages": []
+        }
+    
+    rows = result_set["rows"]
+    packages = rows[offset:offset + count]
+    return {
+        "success": True,
+        "query": result_set["query"],
+        "count_requested": count,
+        "count_returned": len(packages),
+        "offset": offset,
+        "packages": packages,
+        "next_cursor": pagination.next_cursor("search", set_id, offset + count, len(rows))
+    }
+
+async def _run_search(query: str, count: int, by_version: bool = False) -> Dict[str, Any]:
+    """Answer from the catalog index or run winget search, bypassing the cache"""
+    try:
+        set_id = pagination.new_result_set()
+        limit = max(count, Config.SEARCH_RESULT_LIMIT)
+        catalog = await open_catalog()
+        matches = None
+        if catalog is not None:
+            with get_metrics().phase(CATALOG):
+                matches = await asyncio.to_thread(catalog.lookup, query, count, limit)
+        if matches is not None:
+            if by_version:
+                matches = sort_versions(matches, key=_version, newest_first=True)
+            pagination.store("search", set_id, matches, Config.CACHE_TTL["search"], query=query)
+            packages = matches[:count]
+            return {
+                "success": True,
+                "query": query,
+                "count_requested": count,
+                "count_returned": len(packages),
+                "packages": packages,
+                "next_cursor": pagination.next_cursor("search", set_id, count, len(matches)),
+                "from_catalog": True
+            }
         
-        # Decode bytes to string
-        stdout = stdout_bytes.decode('utf-8', errors='ignore')
-        stderr = stderr_bytes.decode('utf-8', errors='ignore')
+        first_page = asyncio.get_running_loop().create_future()
+        drain = asyncio.create_task(_stream_search(query, count, limit, first_page, set_id, by_version))
+        _drains.add(drain)
+        drain.add_done_callback(_drains.discard)
+        pagination.filling(set_id, drain)
         
-        if process.returncode != 0:
+        packages, completed = await first_page
+        if completed is not None and completed.returncode != 0:
             return {
                 "success": False,
-                "error": f"WinGet search failed: {stderr}",
+                "error": f"WinGet search failed: {completed.stderr}",
                 "packages": []
             }
         
-        # Parse the output
-        packages = parse_search_output(stdout)
-        
         return {
             "success": True,
             "query": query,
             "count_requested": count,
             "count_returned": len(packages),
-            "packages": packages[:count]  # Ensure we don't exceed requested count
+            "packages": packages,
+            "next_cursor": pagination.encode_cursor("search", set_id, count) if completed is None else None
         }
         
     except Exception as e:
@@ -60,81 +200,100 @@ async def search_packages(query: str, count: int = 10) -> Dict[str, Any]:
             "packages": []
         }
 
-def parse_search_output(output: str) -> List[Dict[str, str]]:
+async def _stream_search(query: str, count: int, limit: int,
+                         first_page: asyncio.Future, set_id: str, by_version: bool = False) -> None:
+    """
+    Stream `winget search`, resolving first_page once a package past count is parsed
+    
+    The remaining matches, up to limit, are read in the background,
+    cached as result set set_id and added to the catalog index. With
+    by_version the matches are sorted newest first and first_page is
+    only resolved once all of them are read.
+    
+    Args:
+        query: Search term
+        count: Number of packages the caller is waiting for
+        limit: --count passed to winget
+        first_page: Future receiving (packages, CommandResult or None)
+        set_id: Result set id that cursors of this search point to
+        by_version: Sort the matches by version, newest first
+    """
+    generation = get_result_cache().generation
+    cmd = ['search', query, '--count', str(limit), '--accept-source-agreements']
+    packages: List[Dict[str, str]] = []
+    try:
+        async with stream_winget(cmd) as stream:
+            async with aclosing(aiter_table_cells(stream, SEARCH_FIELDS)) as rows:
+                async for cells in rows:
+                    if cells[0] and cells[1]:
+                        packages.append(_search_package(cells))
+                        # A row past count proves there is a next page
+                        if len(packages) == count + 1 and not by_version:
+                            first_page.set_result((packages[:count], None))
+            completed = await stream.wait()
+    except asyncio.CancelledError:
+        first_page.cancel()
+        raise
+    except Exception as e:
+        if not first_page.done():
+            first_page.set_exception(e)
+        return
+    
+    if completed.returncode != 0:
+        if not first_page.done():
+            first_page.set_result((packages, completed))
+        return
+    if by_version:
+        packages = sort_versions(packages, key=_version, newest_first=True)
+    if not first_page.done():
+        # More than count only when sorting; later pages come from the result set
+        first_page.set_result((packages[:count], None) if len(packages) > count else (packages, completed))
+    pagination.store("search", set_id, packages, Config.CACHE_TTL["search"], generation, query=query)
+    catalog = await open_catalog()
+    if catalog is not None:
+        with get_metrics().phase(CATALOG):
+            await asyncio.to_thread(catalog.add_search_results, query, limit, packages)
+
+def parse_search_output(output: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
     """
     Parse WinGet search output into structured data
     
     Args:
         output: Raw WinGet search output
+        limit: Stop after this many packages
         
     Returns:
         List of package dictionaries
     """
-    packages = []
-    
-    # Clean up the output - remove carriage returns and extra whitespace/control chars
-    cleaned_output = output.replace('\r', '').strip()
-    
-    # Split into lines and clean them up
-    lines = []
-    for line in cleaned_output.split('\n'):
-        line = line.strip()
-        if line:  # Only keep non-empty lines
-            lines.append(line)
-    
-    # Find the header line (contains "Name", "Id", "Version", "Source")
-    header_line_idx = -1
-    for i, line in enumerate(lines):
-        if 'Name' in line and 'Id' in line and 'Version' in line:
-            header_line_idx = i
-            break
-    
-    if header_line_idx == -1:
-        return packages
-    
-    # Find separator line (dashes) - it's usually the next line after header
-    separator_idx = -1
-    for i in range(header_line_idx + 1, len(lines)):
-        if lines[i].startswith('-'):
-            separator_idx = i
-            break
-    
-    if separator_idx == -1:
-        # If no separator found, assume data starts right after header
-        separator_idx = header_line_idx
-    
-    # Get column positions from the header line
-    header_line = lines[header_line_idx]
-    name_start = header_line.find('Name')
-    id_start = header_line.find('Id')
-    version_start = header_line.find('Version')
-    source_start = header_line.find('Source')
+    return list(iter_search_packages(output.split('\n'), limit))
+
+def iter_search_packages(lines: Iterable[str], limit: Optional[int] = None) -> Iterator[Dict[str, str]]:
+    """
+    Lazily parse WinGet search output lines into package dictionaries
     
-    # Parse package lines using fixed positions
-    for line in lines[separator_idx + 1:]:
-        line = line.strip()
-        
-        # Skip empty lines, separator lines, or lines with special content
-        if not line or line.startswith('-') or line.startswith('<') or 'truncated' in line.lower():
-            continue
+    Args:
+        lines: Output lines
+        limit: Stop after this many packages; the remaining lines are not read
         
-        # Extract columns based on positions
-        try:
-            name = line[name_start:id_start].strip() if id_start > name_start else line[:id_start].strip()
-            id_val = line[id_start:version_start].strip() if version_start > id_start else line[id_start:source_start].strip()
-            version = line[version_start:source_start].strip() if source_start > version_start else "Unknown"
-            source = line[source_start:].strip() if source_start < len(line) else "winget"
-            
-            if name and id_val and len(name) > 0 and len(id_val) > 0:
-                package = {
-                    "name": name,
-                    "id": id_val,
-                    "version": version if version else "Unknown",
-                    "source": source if source else "winget"
-                }
-                packages.append(package)
-        except Exception as e:
-            # Skip lines that can't be parsed properly
-            continue
-    
-    return packages
+    Returns:
+        Iterator of package dictionaries
+    """
+    packages = (
+        _search_package(cells)
+        for cells in iter_table_cells(lines, SEARCH_FIELDS)
+        if cells[0] and cells[1]
+    )
+    return islice(packages, limit)
+
+def _version(package: Dict[str, Any]) -> Optional[str]:
+    return package.get("version")
+
+def _search_package(cells: Tuple[str, ...]) -> Dict[str, str]:
+    """Build a package dict from (name, id, version, source) cells"""
+    name, id_val, version, source = cells
+    return {
+        "name": name,
+        "id": id_val,
+        "version": version or "Unknown",
+        "source": source or "winget"
+    }
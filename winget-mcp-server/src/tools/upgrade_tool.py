@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""WinGet upgrade detection and batch upgrade tool implementation"""
+
+import asyncio
+from typing import Dict, Any, Iterable, List, Optional
+
+from ..catalog import open_catalog
+from ..config import Config
+from ..jobs import get_job_store
+from ..snapshot import get_snapshot, installed_set_changed
+from ..utils.metrics import CATALOG, get_metrics
+from ..utils.versions import UNKNOWN, version_key
+
+def detect_upgrades(packages: Iterable[Dict[str, Optional[str]]],
+                    catalog_versions: Optional[Dict[str, str]] = None,
+                    include_unknown: bool = False) -> List[Dict[str, Any]]:
+    """
+    Find installed packages with a newer version known
+
+    A package's candidates are the Available column of `winget list` and
+    the latest version the catalog index has seen for its id; the newest
+    candidate above the installed version wins.
+
+    Args:
+        packages: Installed packages with "id", "name", "version" and "available"
+        catalog_versions: Latest catalog versions by lowercased id
+        include_unknown: Also report packages whose installed version is unknown
+
+    Returns:
+        Upgradable packages, in the order given
+    """
+    catalog_versions = catalog_versions or {}
+    upgrades = []
+    for package in packages:
+        installed = package.get("version") or UNKNOWN
+        if installed == UNKNOWN and not include_unknown:
+            continue
+        best, origin, best_key = None, None, version_key(installed)
+        for candidate, source in ((package.get("available"), "list"),
+                                  (catalog_versions.get(package["id"].lower()), "catalog")):
+            if candidate:
+                key = version_key(candidate)
+                if key > best_key:
+                    best, origin, best_key = candidate, source, key
+        if best is not None:
+            upgrades.append({
+                "id": package["id"],
+                "name": package.get("name"),
+                "installed_version": installed,
+                "available_version": best,
+                "source_of_version": origin,
+            })
+    return upgrades
+
+async def find_upgrades(include_unknown: bool = False) -> Dict[str, Any]:
+    """
+    List installed packages that can be upgraded
+
+    Answers from the in-memory snapshot of installed packages and the
+    catalog index without running `winget upgrade`. The snapshot is
+    refreshed first when it was never loaded, an install invalidated it
+    or it holds no `winget list` table read, whose Available column
+    supplies the listed versions.
+
+    Args:
+        include_unknown: Also report packages whose installed version is unknown
+
+    Returns:
+        Dictionary with the snapshot version token and the upgradable packages
+    """
+    try:
+        snapshot = get_snapshot()
+        refreshed = await snapshot.ensure_fresh(include_available=True)
+        if refreshed is not None and not refreshed["success"] and not snapshot.is_loaded():
+            return {
+                "success": False,
+                "error": refreshed["error"]
+            }
+
+        packages = snapshot.packages()
+        catalog_versions = None
+        catalog = await open_catalog()
+        if catalog is not None:
+            with get_metrics().phase(CATALOG):
+                catalog_versions = await asyncio.to_thread(
+                    catalog.versions, [package["id"] for package in packages])
+        upgrades = detect_upgrades(packages, catalog_versions, include_unknown)
+        return {
+            "success": True,
+            "version": snapshot.token,
+            "total_installed": len(packages),
+            "count": len(upgrades),
+            "upgrades": upgrades
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Upgrade check error: {str(e)}"
+        }
+
+async def upgrade_batch(package_ids: Optional[List[str]] = None, silent: bool = True,
+                        timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Start upgrading packages as background jobs
+
+    Each package becomes one "upgrade" job; the jobs queue for the
+    serialized install lane and run one at a time in the order given.
+    Poll them with the job tools.
+
+    Args:
+        package_ids: Installed packages to upgrade; omit to upgrade every
+                     package find_upgrades reports
+        silent: Upgrade silently without user interaction
+        timeout: Seconds each upgrade may run before it is killed
+                 (default Config.INSTALL_TIMEOUT)
+
+    Returns:
+        Dictionary with a job per queued package; ids that are not
+        installed, or have no upgrade available, are reported without a job
+    """
+    try:
+        found = await find_upgrades()
+        if not found["success"]:
+            return found
+        available = {upgrade["id"].lower(): upgrade for upgrade in found["upgrades"]}
+        if package_ids is None:
+            package_ids = [upgrade["id"] for upgrade in found["upgrades"]]
+        if timeout is None:
+            timeout = Config.INSTALL_TIMEOUT or None
+
+        snapshot = get_snapshot()
+        store = get_job_store()
+        results = []
+        for package_id in package_ids:
+            installed = snapshot.get(package_id)
+            if installed is None:
+                results.append({"package_id": package_id, "status": "not_installed"})
+                continue
+            upgrade = available.get(package_id.lower())
+            if upgrade is None:
+                results.append({"package_id": installed["id"], "from_version": installed["version"],
+                                 "status": "skipped", "reason": "No upgrade available"})
+                continue
+            details = {
+                "package_id": installed["id"],
+                "from_version": installed["version"],
+                "to_version": upgrade["available_version"],
+            }
+            cmd = ['upgrade', '--id', installed["id"], '--exact',
+                   '--accept-source-agreements', '--accept-package-agreements']
+            if silent:
+                cmd.append('--silent')
+            job = store.submit("upgrade", cmd, details, timeout=timeout,
+                               on_success=installed_set_changed)
+            entry = dict(details)
+            entry.update({"job_id": job.id, "status": job.status})
+            results.append(entry)
+
+        return {
+            "success": True,
+            "version": found["version"],
+            "total": len(results),
+            "queued": sum(1 for entry in results if "job_id" in entry),
+            "results": results
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"Upgrade error: {str(e)}"
+        }
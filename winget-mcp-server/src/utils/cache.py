@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Shared async result cache for WinGet tool results"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from ..config import Config
+
+CacheKey = Tuple[Hashable, ...]
+Fetcher = Callable[[], Awaitable[Any]]
+
+
+class CacheEntry:
+    """A cached value with its freshness window and approximate size"""
+
+    __slots__ = ("value", "size", "fresh_until", "stale_until")
+
+    def __init__(self, value: Any, size: int, fresh_until: float, stale_until: float):
+        self.value = value
+        self.size = size
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+
+
+class ResultCache:
+    """
+    TTL + LRU result cache with stale-while-revalidate refresh
+
+    Keys are tuples whose first element is the tool namespace ("search",
+    "info", "list"), so a whole namespace can be invalidated at once.
+    Only results accepted by the ``cacheable`` predicate are stored, which
+    by default means successful tool results.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 16 * 1024 * 1024,
+                 stale_ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_ttl = stale_ttl
+
+        self._entries: "OrderedDict[CacheKey, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._refreshing: Set[CacheKey] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._generation = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    async def get_or_fetch(self, key: CacheKey, fetch: Fetcher, ttl: float,
+                           cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        Return the cached value for key, fetching it on a miss
+
+        Args:
+            key: Normalized cache key, namespace first
+            fetch: Zero-argument coroutine factory producing a fresh value
+            ttl: Seconds the fetched value stays fresh
+            cacheable: Predicate deciding whether a fetched value is stored
+
+        Returns:
+            The cached or freshly fetched value
+        """
+        cacheable = cacheable or _is_success
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry is not None and now < entry.stale_until:
+            self._entries.move_to_end(key)
+            if now < entry.fresh_until:
+                self.hits += 1
+            else:
+                # Serve the stale value and revalidate in the background
+                self.stale_hits += 1
+                self._schedule_refresh(key, fetch, ttl, cacheable)
+            return entry.value
+
+        self.misses += 1
+        generation = self._generation
+        value = await fetch()
+        if ttl > 0 and cacheable(value) and generation == self._generation:
+            self._store(key, value, ttl)
+        return value
+
+    def peek(self, key: CacheKey) -> Any:
+        """
+        Return the cached value for key without fetching or counting a lookup
+
+        Args:
+            key: Normalized cache key, namespace first
+
+        Returns:
+            The fresh or stale value, or None when nothing usable is cached
+        """
+        entry = self._entries.get(key)
+        if entry is None or time.monotonic() >= entry.stale_until:
+            return None
+        return entry.value
+
+    def put(self, key: CacheKey, value: Any, ttl: float, generation: Optional[int] = None) -> None:
+        """
+        Store a value computed outside get_or_fetch
+
+        Args:
+            key: Normalized cache key, namespace first
+            value: Value to store
+            ttl: Seconds the value stays fresh
+            generation: ``generation`` read when the computation started;
+                        the value is dropped if an invalidation happened since
+        """
+        if ttl > 0 and (generation is None or generation == self._generation):
+            self._store(key, value, ttl)
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every invalidation"""
+        return self._generation
+
+    def invalidate(self, namespace: Optional[str] = None) -> int:
+        """
+        Drop cached entries
+
+        Args:
+            namespace: Tool namespace to drop, or None to drop everything
+
+        Returns:
+            Number of entries removed
+        """
+        self._generation += 1
+        self.invalidations += 1
+        if namespace is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            return removed
+
+        keys = [key for key in self._entries if key[0] == namespace]
+        for key in keys:
+            self._bytes -= self._entries.pop(key).size
+        return len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy"""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+    def _store(self, key: CacheKey, value: Any, ttl: float) -> None:
+        """Insert or replace an entry and enforce the LRU bounds"""
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old.size
+
+        now = time.monotonic()
+        self._entries[key] = CacheEntry(value, size, now + ttl, now + ttl + self.stale_ttl)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _schedule_refresh(self, key: CacheKey, fetch: Fetcher, ttl: float,
+                          cacheable: Callable[[Any], bool]) -> None:
+        """Start one background refresh per key"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.create_task(self._refresh(key, fetch, ttl, cacheable))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, key: CacheKey, fetch: Fetcher, ttl: float,
+                       cacheable: Callable[[Any], bool]) -> None:
+        """Fetch a fresh value for a stale entry"""
+        generation = self._generation
+        try:
+            value = await fetch()
+            self.refreshes += 1
+            if cacheable(value) and generation == self._generation:
+                self._store(key, value, ttl)
+        except Exception:
+            # Keep serving the stale value until it expires
+            pass
+        finally:
+            self._refreshing.discard(key)
+
+
+def _is_success(value: Any) -> bool:
+    """Default cacheable predicate: only successful tool results"""
+    return isinstance(value, dict) and bool(value.get("success"))
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate the memory cost of a value by its JSON length"""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 0
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    """Return the process-wide result cache, creating it on first use"""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            max_entries=Config.CACHE_MAX_ENTRIES,
+            max_bytes=Config.CACHE_MAX_BYTES,
+            stale_ttl=Config.CACHE_STALE_TTL,
+        )
+    return _result_cache
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Condense winget install output into a bounded tail and a few facts"""
+
+import re
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+# Characters kept of one line; progress frames are usually much shorter
+MAX_LINE = 1000
+
+# Characters that redraw the current line: carriage return and backspace
+_REDRAW = re.compile(r'[\r\b]')
+
+# A lone spinner frame, or a progress bar or counter winget redraws in place
+_SPINNER = re.compile(r'^[-\\|/]$')
+_PROGRESS = re.compile(r'[█▒]|^\d+(?:\.\d+)?\s*%$|^[\d.]+\s*[KMGT]?i?B\s*/\s*[\d.]+\s*[KMGT]?i?B$')
+_TRANSFERRED = re.compile(r'([\d.]+\s*[KMGT]?i?B\s*/\s*[\d.]+\s*[KMGT]?i?B)')
+
+
+def _exit_code(value: str) -> Any:
+    """Exit codes as ints (winget prints them in decimal or hex); anything else unchanged"""
+    try:
+        return int(value, 0)
+    except ValueError:
+        return value
+
+
+# (pattern, fact, value): value is stored as the fact, or called with the
+# first group when it is a function; fact None stores the named groups
+_FACTS = (
+    (re.compile(r'^Found (?P<package_name>.+?) \[(?P<package_id>[^\]]+)\](?: Version (?P<package_version>\S+))?'),
+     None, None),
+    (re.compile(r'^Downloading (\S+)'), "download_url", str),
+    (re.compile(r'^Successfully verified installer hash'), "hash_verified", True),
+    (re.compile(r'hash does not match', re.IGNORECASE), "hash_verified", False),
+    (re.compile(r'^Starting package (?:install|uninstall)'), "installer_started", True),
+    (re.compile(r'^Successfully installed'), "installed", True),
+    (re.compile(r'^Successfully uninstalled'), "uninstalled", True),
+    (re.compile(r'(?:Installer|Uninstall) failed with exit code: (\S+)'), "installer_exit_code", _exit_code),
+    (re.compile(r'^Found an existing package already installed'), "already_installed", True),
+    (re.compile(r'^No available upgrade found'), "no_upgrade", True),
+    (re.compile(r'^No (?:package|installed package) found matching'), "not_found", True),
+    (re.compile(r'[Rr]estart .*required'), "restart_required", True),
+)
+
+
+class OutputCondenser:
+    """
+    Reduce streamed winget output to what a client needs
+
+    Text is fed in chunks of any size. Redrawn lines (carriage-return or
+    backspace progress frames, spinners, download bars) collapse to their
+    final frame and are left out of the tail; the last download counter is
+    kept as the "downloaded" fact. The remaining lines go to a ring buffer
+    of tail_lines, and lines winget prints at known milestones become facts
+    such as hash_verified or installer_exit_code. Memory stays bounded
+    however long the process runs.
+
+    Lines are numbered by character offset in the condensed text, so a
+    reader can poll text(offset) and continue from length; offsets that
+    fell out of the ring are reported by start.
+    """
+
+    def __init__(self, tail_lines: int = 50):
+        self.facts: Dict[str, Any] = {}
+        self.lines = 0
+        self.frames = 0
+        self.length = 0
+        self._tail: Deque[Tuple[int, str]] = deque(maxlen=max(1, tail_lines))
+        self._partial = ''
+
+    def feed(self, text: str) -> None:
+        """Add a chunk of output"""
+        *complete, partial = (self._partial + text).split('\n')
+        for line in complete:
+            self._line(self._collapse(line.rstrip('\r')))
+        self._partial = self._collapse(partial)
+
+    def close(self, returncode: Optional[int] = None) -> None:
+        """
+        Flush an unterminated last line and record the exit code
+
+        Args:
+            returncode: winget's exit code, stored as the exit_code fact
+        """
+        if self._partial:
+            self._line(self._collapse(self._partial.rstrip('\r')))
+            self._partial = ''
+        if returncode is not None:
+            self.facts["exit_code"] = returncode
+
+    @property
+    def start(self) -> int:
+        """Offset of the oldest line still in the tail"""
+        return self._tail[0][0] if self._tail else self.length
+
+    @property
+    def omitted(self) -> int:
+        """Meaningful lines that fell out of the tail"""
+        return self.lines - len(self._tail)
+
+    def text(self, offset: int = 0) -> str:
+        """Tail lines from character offset onwards"""
+        parts = []
+        for start, line in self._tail:
+            if start + len(line) > offset:
+                parts.append(line[max(0, offset - start):])
+        return ''.join(parts)
+
+    @property
+    def last_line(self) -> str:
+        """The most recent meaningful line, e.g. winget's error message"""
+        return self._tail[-1][1].strip() if self._tail else ''
+
+    def summary(self) -> Dict[str, Any]:
+        """Tail text, facts and counters for a tool result"""
+        return {
+            "stdout": self.text().rstrip('\n'),
+            "facts": dict(self.facts),
+            "omitted_lines": self.omitted,
+            "progress_frames": self.frames,
+        }
+
+    def _collapse(self, line: str) -> str:
+        """Keep only the last frame of a redrawn line, and at most MAX_LINE characters"""
+        # A trailing redraw is kept so a frame split across chunks survives
+        body, trailing = (line[:-1], line[-1]) if line[-1:] in ('\r', '\b') else (line, '')
+        frames = _REDRAW.split(body)
+        if len(frames) > 1:
+            self.frames += len(frames) - 1
+            self._progress(frames[-2])
+            body = frames[-1]
+        return body[:MAX_LINE] + trailing
+
+    def _progress(self, frame: str) -> None:
+        match = _TRANSFERRED.search(frame)
+        if match:
+            self.facts["downloaded"] = ' '.join(match.group(1).split())
+
+    def _line(self, line: str) -> None:
+        stripped = line.strip()
+        if not stripped:
+            return
+        if _SPINNER.match(stripped) or _PROGRESS.search(stripped):
+            self.frames += 1
+            self._progress(stripped)
+            return
+        for pattern, fact, value in _FACTS:
+            match = pattern.search(stripped)
+            if match is None:
+                continue
+            if fact is None:
+                self.facts.update({k: v for k, v in match.groupdict().items() if v is not None})
+            else:
+                self.facts[fact] = value(match.group(1)) if callable(value) else value
+        text = line.rstrip() + '\n'
+        self._tail.append((self.length, text))
+        self.length += len(text)
+        self.lines += 1
+
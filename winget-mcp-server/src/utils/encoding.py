@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Serialization of tool results into the text returned to MCP clients"""
+
+import json
+from operator import itemgetter
+from typing import Any, Callable, Optional
+
+from ..config import Config
+
+try:
+    import orjson
+except ImportError:  # optional fast path
+    orjson = None
+
+# Result layouts
+RECORDS = "records"
+TABLE = "table"
+
+
+def tabulate(value: Any) -> Any:
+    """
+    Rewrite lists of same-shaped objects into column-oriented tables
+
+    A non-empty list whose items are all dictionaries with the same keys
+    becomes {"columns": [...], "rows": [[...], ...]}, so keys such as
+    name/id/version/source are written once instead of on every row.
+    Other lists and scalars are left alone; dictionaries are rewritten
+    recursively.
+
+    Args:
+        value: Tool result
+
+    Returns:
+        The rewritten result
+    """
+    if isinstance(value, dict):
+        return {key: tabulate(item) for key, item in value.items()}
+    if isinstance(value, list) and value and isinstance(value[0], dict) and len(value[0]) > 1:
+        keys = value[0].keys()
+        if all(type(item) is dict and item.keys() == keys for item in value):
+            # One C-level call per row, in the first row's key order
+            return {"columns": list(keys), "rows": list(map(itemgetter(*keys), value))}
+    return value
+
+
+def _json_backend(indent: Optional[int]) -> Callable[[Any], str]:
+    if indent:
+        return json.JSONEncoder(indent=indent, ensure_ascii=False).encode
+    return json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+
+def _orjson_backend(indent: Optional[int]) -> Optional[Callable[[Any], str]]:
+    # orjson only knows two-space indentation
+    if orjson is None or indent not in (None, 0, 2):
+        return None
+    option = orjson.OPT_INDENT_2 if indent else 0
+    dumps = orjson.dumps
+    return lambda value: dumps(value, option=option).decode('utf-8')
+
+
+class ResponseEncoder:
+    """
+    Turns tool results into response text
+
+    Output is compact JSON unless an indent is configured. The backend is
+    picked once: "auto" prefers orjson when it is installed and supports
+    the indent, falling back to the standard library. With the table
+    layout, lists of packages are written column-oriented (see tabulate).
+    """
+
+    def __init__(self, layout: str = RECORDS, indent: Optional[int] = None,
+                 backend: str = "auto"):
+        if layout not in (RECORDS, TABLE):
+            raise ValueError(f"Unknown response layout: {layout}")
+        self.layout = layout
+        self.indent = indent or None
+        if backend not in ("auto", "orjson", "json"):
+            raise ValueError(f"Unknown JSON backend: {backend}")
+        # orjson falls back to the standard library when it is missing or
+        # cannot produce the indent
+        dumps = _orjson_backend(self.indent) if backend != "json" else None
+        if dumps is None:
+            dumps = _json_backend(self.indent)
+            backend = "json"
+        else:
+            backend = "orjson"
+        self.backend = backend
+        self._dumps = dumps
+
+    def encode(self, value: Any) -> str:
+        """
+        Serialize a tool result
+
+        Args:
+            value: JSON-compatible result
+
+        Returns:
+            JSON text in the configured layout
+        """
+        if self.layout == TABLE:
+            value = tabulate(value)
+        return self._dumps(value)
+
+
+_encoder: Optional[ResponseEncoder] = None
+
+
+def get_encoder() -> ResponseEncoder:
+    """Return the process-wide response encoder built from Config"""
+    global _encoder
+    if _encoder is None:
+        _encoder = ResponseEncoder(Config.RESPONSE_LAYOUT, Config.RESPONSE_INDENT,
+                                   Config.JSON_BACKEND)
+    return _encoder
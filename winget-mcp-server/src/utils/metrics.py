@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""In-memory latency histograms per tool and phase, with optional OpenTelemetry export"""
+
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import Config
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # optional export
+    otel_metrics = None
+
+# Phases recorded on the hot path
+QUEUE = "queue"                # waiting for a scheduler slot
+SPAWN = "spawn"                # starting the winget process
+FIRST_OUTPUT = "first_output"  # spawn to first stdout line (source updates happen here)
+RUN = "run"                    # spawn to exit
+DECODE = "decode"              # bytes to text of buffered output
+PARSE = "parse"                # turning output into results; streamed output includes decoding
+CATALOG = "catalog"            # catalog index lookups
+ENCODE = "encode"              # serializing the response
+TOTAL = "total"                # the whole tool call
+
+# Tool label of work not started by a tool call, e.g. start-up refreshes
+BACKGROUND = "background"
+
+# Upper bucket bounds in seconds; a final +Inf bucket catches the rest
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Tool whose call the running code serves; asyncio tasks inherit it, so
+# background drains are attributed to the call that started them
+_current_tool: ContextVar[str] = ContextVar("winget_mcp_tool", default=BACKGROUND)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram"""
+
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by interpolating inside its bucket
+
+        Args:
+            q: Quantile between 0 and 1
+
+        Returns:
+            Seconds, never above the largest observation
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = BUCKETS[index] if index < len(BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (rank - seen) / bucket_count
+                return min(estimate, self.max)
+            seen += bucket_count
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum_ms": round(self.sum * 1000, 3),
+            "mean_ms": round(self.sum / self.count * 1000, 3) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50) * 1000, 3),
+            "p95_ms": round(self.quantile(0.95) * 1000, 3),
+            "p99_ms": round(self.quantile(0.99) * 1000, 3),
+            "max_ms": round(self.max * 1000, 3),
+        }
+
+
+class _Phase:
+    """Context manager timing one phase of the current tool"""
+
+    __slots__ = ("metrics", "name", "tool", "start")
+
+    def __init__(self, metrics: "Metrics", name: str, tool: Optional[str]):
+        self.metrics = metrics
+        self.name = name
+        self.tool = tool
+
+    def __enter__(self) -> "_Phase":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.metrics.observe(self.name, time.perf_counter() - self.start, self.tool)
+
+
+class _Call:
+    """Context manager around a tool call: sets the current tool, counts calls and errors"""
+
+    __slots__ = ("metrics", "tool", "failed", "start", "token")
+
+    def __init__(self, metrics: "Metrics", tool: str):
+        self.metrics = metrics
+        self.tool = tool
+        self.failed = False
+
+    def __enter__(self) -> "_Call":
+        self.token = _current_tool.set(self.tool)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        _current_tool.reset(self.token)
+        self.metrics.record_call(self.tool, time.perf_counter() - self.start,
+                                 self.failed or exc_type is not None)
+
+
+class _Disabled:
+    """Stand-in for _Phase and _Call when metrics are off"""
+
+    failed = False
+
+    def __enter__(self) -> "_Disabled":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_DISABLED = _Disabled()
+
+
+class Metrics:
+    """
+    Registry of per-tool, per-phase latency histograms and call counters
+
+    Phases are attributed to the tool whose call is running (see call()),
+    so low-level code such as the process launcher only names the phase.
+    When OpenTelemetry export is on and opentelemetry-api is installed,
+    every observation is also recorded on an OpenTelemetry histogram; the
+    host process configures the SDK and exporter.
+    """
+
+    def __init__(self, enabled: bool = True, otel: bool = False):
+        self.enabled = enabled
+        self.started_at = time.time()
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._calls: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+        self._otel_duration = self._otel_calls = None
+        if enabled and otel and otel_metrics is not None:
+            meter = otel_metrics.get_meter("winget-mcp-server")
+            self._otel_duration = meter.create_histogram(
+                "winget_mcp.phase.duration", unit="s",
+                description="Duration of a tool call phase")
+            self._otel_calls = meter.create_counter(
+                "winget_mcp.calls", description="Tool calls by outcome")
+
+    @property
+    def otel(self) -> bool:
+        """Whether observations are exported to OpenTelemetry"""
+        return self._otel_duration is not None
+
+    def call(self, tool: str):
+        """Time a tool call and attribute the phases inside it to tool"""
+        return _Call(self, tool) if self.enabled else _DISABLED
+
+    def phase(self, name: str, tool: Optional[str] = None):
+        """Time a phase of the current tool call"""
+        return _Phase(self, name, tool) if self.enabled else _DISABLED
+
+    def observe(self, phase: str, seconds: float, tool: Optional[str] = None) -> None:
+        """
+        Record the duration of a phase
+
+        Args:
+            phase: Phase name, e.g. SPAWN
+            seconds: Duration
+            tool: Tool label; defaults to the tool of the running call
+        """
+        if not self.enabled:
+            return
+        if tool is None:
+            tool = _current_tool.get()
+        key = (tool, phase)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram()
+        histogram.observe(seconds)
+        if self._otel_duration is not None:
+            self._otel_duration.record(seconds, {"tool": tool, "phase": phase})
+
+    def record_call(self, tool: str, seconds: float, failed: bool) -> None:
+        """Count a finished tool call and record its total duration"""
+        self._calls[tool] = self._calls.get(tool, 0) + 1
+        if failed:
+            self._errors[tool] = self._errors.get(tool, 0) + 1
+        self.observe(TOTAL, seconds, tool)
+        if self._otel_calls is not None:
+            self._otel_calls.add(1, {"tool": tool, "outcome": "error" if failed else "ok"})
+
+    def reset(self) -> None:
+        """Forget every observation"""
+        self._histograms.clear()
+        self._calls.clear()
+        self._errors.clear()
+        self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded metrics
+
+        Returns:
+            {"tools": {tool: {"calls", "errors", "error_rate",
+            "phases": {phase: histogram summary}}}} plus the collection start
+        """
+        tools: Dict[str, Dict[str, Any]] = {}
+        for tool in sorted({tool for tool, _ in self._histograms} | set(self._calls)):
+            calls = self._calls.get(tool, 0)
+            errors = self._errors.get(tool, 0)
+            tools[tool] = {
+                "calls": calls,
+                "errors": errors,
+                "error_rate": round(errors / calls, 4) if calls else 0.0,
+                "phases": {},
+            }
+        for (tool, phase), histogram in sorted(self._histograms.items()):
+            tools[tool]["phases"][phase] = histogram.as_dict()
+        return {"enabled": self.enabled, "otel": self.otel,
+                "since": self.started_at, "tools": tools}
+
+    def prometheus(self, gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Args:
+            gauges: Extra numeric stats by group, e.g. {"cache": cache.stats()};
+                    each number becomes winget_mcp_<group>_<name>
+
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = [
+            "# HELP winget_mcp_phase_seconds Duration of tool call phases",
+            "# TYPE winget_mcp_phase_seconds histogram",
+        ]
+        for (tool, phase), histogram in sorted(self._histograms.items()):
+            labels = f'tool="{tool}",phase="{phase}"'
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += bucket_count
+                lines.append(f'winget_mcp_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"winget_mcp_phase_seconds_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"winget_mcp_phase_seconds_count{{{labels}}} {histogram.count}")
+        for name, counter in (("calls", self._calls), ("errors", self._errors)):
+            lines.append(f"# TYPE winget_mcp_{name}_total counter")
+            for tool, value in sorted(counter.items()):
+                lines.append(f'winget_mcp_{name}_total{{tool="{tool}"}} {value}')
+        for group, stats in (gauges or {}).items():
+            for name, value in stats.items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f"# TYPE winget_mcp_{group}_{name} gauge")
+                    lines.append(f"winget_mcp_{group}_{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+_metrics: Optional[Metrics] = None
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics registry built from Config"""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics(Config.METRICS, Config.OTEL_METRICS)
+    return _metrics
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Opaque cursors into cached result sets"""
+
+import asyncio
+import base64
+import binascii
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import get_result_cache
+
+# Result sets still being filled by a background drain, by set id
+_filling: Dict[str, asyncio.Task] = {}
+
+
+class CursorError(ValueError):
+    """A cursor that is malformed, or whose result set is no longer cached"""
+
+    def __init__(self, message: str, expired: bool = False):
+        super().__init__(message)
+        self.expired = expired
+
+
+def new_result_set() -> str:
+    """Return a fresh result set id"""
+    return uuid.uuid4().hex[:12]
+
+
+def filling(set_id: str, task: asyncio.Task) -> None:
+    """
+    Register the task that stores a result set once it has read it all
+
+    Cursors into the set wait for the task instead of failing while the
+    rest of the output is still being parsed.
+    """
+    _filling[set_id] = task
+    task.add_done_callback(lambda _: _filling.pop(set_id, None))
+
+
+def _key(namespace: str, set_id: str) -> Tuple[str, str, str]:
+    # Same namespace as the tool's pages, so invalidating it expires cursors
+    return (namespace, "results", set_id)
+
+
+def store(namespace: str, set_id: str, rows: List[Any], ttl: float,
+          generation: Optional[int] = None, **fields: Any) -> None:
+    """
+    Cache a complete result set for cursor pages
+
+    Args:
+        namespace: Tool namespace, e.g. "list"
+        set_id: Id from new_result_set()
+        rows: Every row of the result, in order
+        ttl: Seconds the set stays fresh; cursors expire with it
+        generation: Cache generation read before the rows were fetched
+        **fields: Extra values returned with every page, e.g. the query
+    """
+    value = dict(fields, success=True, rows=rows)
+    get_result_cache().put(_key(namespace, set_id), value, ttl, generation)
+
+
+def encode_cursor(namespace: str, set_id: str, offset: int) -> str:
+    """Build the cursor for the page of set_id starting at offset"""
+    raw = f"{namespace}:{set_id}:{offset}".encode('ascii')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def next_cursor(namespace: str, set_id: str, offset: int, total: Optional[int]) -> Optional[str]:
+    """Cursor for the page after offset, or None when total says there is none"""
+    if total is not None and offset >= total:
+        return None
+    return encode_cursor(namespace, set_id, offset)
+
+
+def decode_cursor(namespace: str, cursor: str) -> Tuple[str, int]:
+    """
+    Split a cursor into its result set id and offset
+
+    Args:
+        namespace: Tool namespace the cursor must belong to
+        cursor: Cursor from a previous page
+
+    Returns:
+        (set_id, offset)
+
+    Raises:
+        CursorError: The cursor is malformed or belongs to another tool
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        owner, set_id, offset = base64.urlsafe_b64decode(padded).decode('ascii').split(':')
+        offset = int(offset)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise CursorError("Invalid cursor") from None
+    if owner != namespace or offset < 0:
+        raise CursorError("Cursor does not belong to this tool")
+    return set_id, offset
+
+
+def is_live(namespace: str, cursor: str) -> bool:
+    """Whether the result set behind cursor is still cached or being filled"""
+    try:
+        set_id, _ = decode_cursor(namespace, cursor)
+    except CursorError:
+        return False
+    return set_id in _filling or get_result_cache().peek(_key(namespace, set_id)) is not None
+
+
+async def open_cursor(namespace: str, cursor: str) -> Tuple[str, int, Dict[str, Any]]:
+    """
+    Resolve a cursor to its result set
+
+    Args:
+        namespace: Tool namespace the cursor must belong to
+        cursor: Cursor from a previous page
+
+    Returns:
+        (set_id, offset, result set) where the set holds "rows" and the
+        extra fields it was stored with
+
+    Raises:
+        CursorError: The cursor is invalid or its result set has expired
+    """
+    set_id, offset = decode_cursor(namespace, cursor)
+    task = _filling.get(set_id)
+    if task is not None:
+        await asyncio.wait([task])
+    result_set = get_result_cache().peek(_key(namespace, set_id))
+    if result_set is None:
+        raise CursorError("Cursor expired: its result set is no longer cached; "
+                          "repeat the request without a cursor", expired=True)
+    return set_id, offset, result_set
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""Central launcher for winget subprocesses
+
+Processes are started by the active executor (winget_manager), so the same
+code runs against the real winget or a recorded fake. Every process runs
+under a deadline (Config.OPERATION_TIMEOUTS) after which its process tree
+is killed, and only Config.MAX_OUTPUT_BYTES of its output is kept.
+"""
+
+import asyncio
+import codecs
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, List, NamedTuple, Optional, Tuple
+
+from ..config import Config
+from ..winget_manager import get_executor
+from .metrics import DECODE, FIRST_OUTPUT, PARSE, QUEUE, RUN, SPAWN, get_metrics
+from .scheduler import get_scheduler
+
+
+# Appended where output was cut off at the size cap
+TRUNCATED_MARKER = "\n[winget output truncated: {dropped} bytes dropped]\n"
+
+# Seconds to wait for the pipes of a killed process tree to close
+KILL_GRACE = 5.0
+
+_READ_CHUNK = 65536
+
+
+class WingetTimeout(asyncio.TimeoutError):
+    """A winget process ran past its deadline and its process tree was killed"""
+
+    def __init__(self, operation: str, timeout: float):
+        super().__init__(f"winget {operation} timed out after {timeout:g}s")
+        self.operation = operation
+        self.timeout = timeout
+
+
+class CommandResult(NamedTuple):
+    """Exit code and decoded output of a finished winget process"""
+    returncode: int
+    stdout: str
+    stderr: str
+    # Output went past its size cap; buffered text ends with TRUNCATED_MARKER
+    truncated: bool = False
+
+
+def command_timeout(args: List[str]) -> Optional[float]:
+    """
+    Deadline for a winget command from Config
+
+    Args:
+        args: winget arguments, starting with the subcommand
+
+    Returns:
+        Seconds, or None when the command may run indefinitely
+    """
+    operation = args[0] if args else ''
+    return Config.OPERATION_TIMEOUTS.get(operation, Config.COMMAND_TIMEOUT) or None
+
+
+async def run_winget(args: List[str], timeout: Optional[float] = None) -> CommandResult:
+    """
+    Run winget with the given arguments under the process scheduler
+
+    Args:
+        args: winget arguments, starting with the subcommand
+        timeout: Seconds the process may run once started (queueing for a
+                 scheduler slot does not count); None uses command_timeout()
+
+    Returns:
+        CommandResult with the exit code and decoded stdout/stderr, each
+        cut off at its size cap
+
+    Raises:
+        WingetTimeout: The process ran past timeout and was killed
+        SchedulerBusy: Too many commands of this kind are already queued
+    """
+    metrics = get_metrics()
+    if timeout is None:
+        timeout = command_timeout(args)
+    queued = time.perf_counter()
+    async with get_scheduler().slot(args[0]):
+        process, spawned = await _spawn(args, queued)
+        try:
+            (stdout_bytes, stdout_dropped), (stderr_bytes, stderr_dropped), _ = await asyncio.wait_for(
+                asyncio.gather(read_capped(process.stdout, Config.MAX_OUTPUT_BYTES),
+                               read_capped(process.stderr, Config.MAX_STDERR_BYTES),
+                               process.wait()),
+                timeout)
+            metrics.observe(RUN, time.perf_counter() - spawned)
+        except asyncio.TimeoutError:
+            await kill_and_reap(process)
+            raise WingetTimeout(args[0], timeout) from None
+        except BaseException:
+            # Cancelled: do not leave the child running
+            await kill_and_reap(process)
+            raise
+
+    # Decode bytes to string
+    with metrics.phase(DECODE):
+        return CommandResult(
+            process.returncode,
+            _decode(stdout_bytes, stdout_dropped),
+            _decode(stderr_bytes, stderr_dropped),
+            bool(stdout_dropped or stderr_dropped),
+        )
+
+
+async def read_capped(reader: asyncio.StreamReader, limit: int) -> Tuple[bytes, int]:
+    """
+    Read a pipe to EOF, keeping at most limit bytes
+
+    The rest is read and discarded rather than left in the pipe, so the
+    child never blocks on a full pipe; the deadline ends an endless flood.
+
+    Returns:
+        (kept bytes, number of bytes dropped)
+    """
+    limit = limit or sys.maxsize
+    chunks: List[bytes] = []
+    kept = dropped = 0
+    while chunk := await reader.read(_READ_CHUNK):
+        room = limit - kept
+        if len(chunk) <= room:
+            chunks.append(chunk)
+            kept += len(chunk)
+        else:
+            if room > 0:
+                chunks.append(chunk[:room])
+                kept = limit
+            dropped += len(chunk) - max(room, 0)
+    return b''.join(chunks), dropped
+
+
+def strip_truncation(text: str) -> str:
+    """Remove a trailing TRUNCATED_MARKER, leaving only winget's own output"""
+    marker = text.rfind(TRUNCATED_MARKER.partition('{')[0])
+    return text if marker < 0 else text[:marker]
+
+
+def _decode(data: bytes, dropped: int) -> str:
+    text = data.decode('utf-8', errors='ignore')
+    if dropped:
+        text += TRUNCATED_MARKER.format(dropped=dropped)
+    return text
+
+
+async def kill_and_reap(process: Any) -> None:
+    """Kill process and its children, then reap it once its pipes close"""
+    if process.returncode is None:
+        await kill_process_tree(process)
+    # asyncio only reports the exit once both pipes are closed; a
+    # descendant that escaped the kill may hold them open, so give up
+    # after KILL_GRACE rather than hang the caller
+    try:
+        await asyncio.wait_for(asyncio.gather(read_capped(process.stdout, 1),
+                                              read_capped(process.stderr, 1),
+                                              process.wait()),
+                               KILL_GRACE)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def _spawn(args: List[str], queued: Optional[float],
+                 new_group: bool = False) -> Tuple[Any, float]:
+    """Start winget, recording the queue and spawn phases; returns (process, spawn time)"""
+    metrics = get_metrics()
+    started = time.perf_counter()
+    if queued is not None:
+        metrics.observe(QUEUE, started - queued)
+    process = await get_executor().spawn(args, new_group)
+    spawned = time.perf_counter()
+    metrics.observe(SPAWN, spawned - started)
+    return process, spawned
+
+
+class WingetStream:
+    """
+    A running winget process whose stdout is read line by line
+
+    stderr is drained concurrently so a chatty child can never block on a
+    full pipe while stdout is being consumed. The stream notes when the
+    first line arrived and how long the consumer spent between lines,
+    which is the time it took to decode and parse them.
+
+    Lines longer than the reader's limit are skipped, and once
+    Config.MAX_OUTPUT_BYTES have been read the child is stopped; either
+    marks the stream truncated. stream_winget() kills the process tree
+    when its deadline passes, which makes wait() raise WingetTimeout.
+    """
+
+    def __init__(self, process: Any, spawned: Optional[float] = None, operation: str = 'command'):
+        self.process = process
+        self.operation = operation
+        self.stopped = False
+        self.truncated = False
+        self.timed_out: Optional[float] = None
+        self.spawned = time.perf_counter() if spawned is None else spawned
+        self.first_output: Optional[float] = None
+        self.consumer_seconds = 0.0
+        self._stderr_task = asyncio.ensure_future(read_capped(process.stderr, Config.MAX_STDERR_BYTES))
+        self._finished: Optional[asyncio.Future] = None
+        self._killer: Optional[asyncio.Future] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._lines()
+
+    async def _readline(self) -> bytes:
+        """Next stdout line, skipping lines longer than the reader's limit"""
+        stdout = self.process.stdout
+        skipping = False
+        while True:
+            try:
+                line = await stdout.readuntil(b'\n')
+            except asyncio.IncompleteReadError as e:
+                return b'' if skipping else e.partial
+            except asyncio.LimitOverrunError as e:
+                # Drop what is buffered and the rest of the line after it
+                self.truncated = skipping = True
+                await stdout.readexactly(e.consumed)
+                continue
+            if not skipping:
+                return line
+            skipping = False
+
+    async def _lines(self) -> AsyncIterator[str]:
+        readline = self._readline
+        clock = time.perf_counter
+        budget = Config.MAX_OUTPUT_BYTES or sys.maxsize
+        line = await readline()
+        if line:
+            self.first_output = clock() - self.spawned
+        while line:
+            budget -= len(line)
+            if budget < 0:
+                self.truncated = True
+                await self.stop()
+                return
+            yielded = clock()
+            yield line.decode('utf-8', errors='ignore')
+            self.consumer_seconds += clock() - yielded
+            line = await readline()
+
+    async def chunks(self) -> AsyncIterator[str]:
+        """
+        Decoded stdout in pieces as it arrives, for output that is not line based
+
+        Unlike line iteration this applies no size cap; the caller keeps
+        what it needs, e.g. through an OutputCondenser.
+        """
+        read = self.process.stdout.read
+        # Incremental so a multi-byte character split across reads survives
+        decode = codecs.getincrementaldecoder('utf-8')(errors='ignore').decode
+        clock = time.perf_counter
+        while chunk := await read(_READ_CHUNK):
+            if self.first_output is None:
+                self.first_output = clock() - self.spawned
+            yielded = clock()
+            yield decode(chunk)
+            self.consumer_seconds += clock() - yielded
+
+    async def stop(self) -> None:
+        """Terminate the child once the caller has read enough"""
+        if self.process.returncode is None:
+            self.stopped = True
+            try:
+                self.process.terminate()
+            except ProcessLookupError:
+                pass
+
+    def expire(self, timeout: float) -> None:
+        """Kill the process tree because the deadline of timeout seconds passed"""
+        if self.process.returncode is None and self.timed_out is None:
+            self.timed_out = timeout
+            self.stopped = True
+            self._killer = asyncio.ensure_future(kill_process_tree(self.process))
+
+    async def wait(self) -> CommandResult:
+        """
+        Wait for the child to exit
+
+        Returns:
+            CommandResult with the exit code, empty stdout (it was streamed)
+            and the decoded stderr
+
+        Raises:
+            WingetTimeout: The deadline passed and the process was killed
+        """
+        result = await self._finish()
+        if self.timed_out is not None:
+            raise WingetTimeout(self.operation, self.timed_out)
+        return result
+
+    def _finish(self) -> asyncio.Future:
+        """Reap the child once, however many times it is awaited"""
+        if self._finished is None:
+            self._finished = asyncio.ensure_future(self._reap())
+        return self._finished
+
+    async def _reap(self) -> CommandResult:
+        if self._killer is not None:
+            await self._killer
+        if self.stopped and not await self._settle():
+            # A descendant that escaped the kill holds the pipes; give up
+            # on them like kill_and_reap does, keeping no stderr
+            self._stderr_task.cancel()
+            return CommandResult(self.process.returncode, '', '', True)
+        returncode = await self.process.wait()
+        stderr_bytes, dropped = await self._stderr_task
+        return CommandResult(returncode, '', _decode(stderr_bytes, dropped),
+                             self.truncated or bool(dropped))
+
+    async def _settle(self) -> bool:
+        """
+        Let the stopped child exit and close its pipes
+
+        asyncio only reports the exit once every pipe is closed, so whatever
+        the child had already written is discarded. A child still running
+        after KILL_GRACE is killed with its tree and given another KILL_GRACE.
+
+        Returns:
+            Whether the pipes closed in time
+        """
+        settled = asyncio.ensure_future(asyncio.gather(read_capped(self.process.stdout, 1),
+                                                       self.process.wait()))
+        done, _ = await asyncio.wait([settled], timeout=KILL_GRACE)
+        if not done:
+            await kill_process_tree(self.process)
+            done, _ = await asyncio.wait([settled], timeout=KILL_GRACE)
+        if not done:
+            settled.cancel()
+        return bool(done)
+
+
+@asynccontextmanager
+async def stream_winget(args: List[str], timeout: Optional[float] = None) -> AsyncIterator[WingetStream]:
+    """
+    Start winget under the process scheduler and stream its stdout
+
+    The scheduler slot is held until the block exits. Leaving the block
+    before the output is exhausted terminates the child.
+
+    Args:
+        args: winget arguments, starting with the subcommand
+        timeout: Seconds the process may run once started; None uses
+                 command_timeout()
+
+    Yields:
+        WingetStream for the running process
+
+    Raises:
+        SchedulerBusy: Too many commands of this kind are already queued
+    """
+    if timeout is None:
+        timeout = command_timeout(args)
+    queued = time.perf_counter()
+    async with get_scheduler().slot(args[0]):
+        process, spawned = await _spawn(args, queued)
+        stream = WingetStream(process, spawned, args[0])
+        deadline = None
+        if timeout:
+            deadline = asyncio.get_running_loop().call_later(timeout, stream.expire, timeout)
+        try:
+            yield stream
+        finally:
+            if deadline is not None:
+                deadline.cancel()
+            if process.returncode is None and not process.stdout.at_eof():
+                await stream.stop()
+            await stream._finish()
+            metrics = get_metrics()
+            metrics.observe(RUN, time.perf_counter() - spawned)
+            if stream.first_output is not None:
+                metrics.observe(FIRST_OUTPUT, stream.first_output)
+            metrics.observe(PARSE, stream.consumer_seconds)
+
+
+async def spawn_winget_group(args: List[str]) -> Any:
+    """
+    Start winget as the leader of a new process group
+
+    The caller is responsible for holding a scheduler slot. Installers are
+    started by winget as child processes; putting them in their own group
+    lets kill_process_tree() stop all of them.
+
+    Args:
+        args: winget arguments, starting with the subcommand
+
+    Returns:
+        The started process with stdout and stderr piped
+    """
+    process, _ = await _spawn(args, None, new_group=True)
+    return process
+
+
+async def kill_process_tree(process: Any) -> None:
+    """
+    Kill a process started by spawn_winget_group and everything it spawned
+
+    Args:
+        process: Process group leader
+    """
+    await get_executor().kill_tree(process)
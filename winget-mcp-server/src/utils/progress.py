@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""Progress reporting for tools that work through several items"""
+
+from typing import Awaitable, Callable, Optional
+
+# Async callback receiving (completed items, total items, message)
+ProgressCallback = Callable[[int, int, str], Awaitable[None]]
+
+
+async def report_progress(progress: Optional[ProgressCallback], done: int, total: int,
+                          message: str) -> None:
+    """Call progress if one was given, ignoring its errors"""
+    if progress is None:
+        return
+    try:
+        await progress(done, total, message)
+    except Exception:
+        # Progress is best effort, e.g. no progress token outside a request
+        pass
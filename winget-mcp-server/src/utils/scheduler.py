@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""Bounded concurrency scheduler for winget process launches"""
+
+import asyncio
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from ..config import Config
+
+
+class SchedulerBusy(RuntimeError):
+    """A lane's queue is full; the request was rejected without waiting"""
+
+    def __init__(self, lane: str, queued: int):
+        super().__init__(f"winget is busy: {queued} {lane} requests are already queued; retry later")
+        self.lane = lane
+        self.queued = queued
+
+
+class _Waiter:
+    """A queued request for a process slot"""
+
+    __slots__ = ("priority", "seq", "lane", "future", "enqueued_at")
+
+    def __init__(self, priority: int, seq: int, lane: str, future: asyncio.Future):
+        self.priority = priority
+        self.seq = seq
+        self.lane = lane
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class LaneStats:
+    """Queue and wait-time counters for one lane"""
+
+    __slots__ = ("running", "queued", "max_queued", "admitted", "rejected", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.running = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_avg_ms": round(self.wait_total / self.admitted * 1000, 3) if self.admitted else 0.0,
+            "wait_max_ms": round(self.wait_max * 1000, 3),
+        }
+
+
+class ProcessScheduler:
+    """
+    Admit winget processes under a global limit and per-lane limits
+
+    Each winget subcommand maps to a lane (by default the subcommand itself;
+    install, upgrade and uninstall share the "install" lane). A slot is
+    granted when both the global limit and the lane limit have room.
+    Waiters are served by priority, then arrival order, and a waiter whose
+    lane is full never blocks waiters in other lanes, so reads keep flowing
+    while an install holds the install lane.
+
+    A lane queues at most max_queued waiters (queue_limits overrides it per
+    lane; 0 is unlimited). Further requests fail at once with
+    SchedulerBusy instead of piling up behind a stuck winget.
+    """
+
+    def __init__(self, max_concurrent: int = 4, lane_limits: Optional[Dict[str, int]] = None,
+                 lane_aliases: Optional[Dict[str, str]] = None,
+                 priorities: Optional[Dict[str, int]] = None,
+                 max_queued: int = 0, queue_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrent = max_concurrent
+        self.lane_limits = dict(lane_limits or {})
+        self.lane_aliases = dict(lane_aliases or {})
+        self.priorities = dict(priorities or {})
+        self.max_queued = max_queued
+        self.queue_limits = dict(queue_limits or {})
+
+        self._running = 0
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._lanes: Dict[str, LaneStats] = {}
+
+    def lane_for(self, operation: str) -> str:
+        """Return the lane an operation is scheduled in"""
+        return self.lane_aliases.get(operation, operation)
+
+    @asynccontextmanager
+    async def slot(self, operation: str) -> AsyncIterator[None]:
+        """
+        Hold a process slot for the duration of the block
+
+        Args:
+            operation: winget subcommand about to be launched
+
+        Raises:
+            SchedulerBusy: The operation's lane queue is full
+        """
+        lane = self.lane_for(operation)
+        await self._acquire(lane)
+        try:
+            yield
+        finally:
+            self._release(lane)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and wait-time metrics, overall and per lane"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._running,
+            "queued": len(self._waiters),
+            "rejected": sum(lane.rejected for lane in self._lanes.values()),
+            "lanes": {name: lane.as_dict() for name, lane in self._lanes.items()},
+        }
+
+    def _lane(self, lane: str) -> LaneStats:
+        stats = self._lanes.get(lane)
+        if stats is None:
+            stats = self._lanes[lane] = LaneStats()
+        return stats
+
+    def _has_room(self, lane: str) -> bool:
+        limit = self.lane_limits.get(lane, self.max_concurrent)
+        return self._running < self.max_concurrent and self._lane(lane).running < limit
+
+    async def _acquire(self, lane: str) -> None:
+        stats = self._lane(lane)
+        if not self._waiters and self._has_room(lane):
+            self._admit(stats, 0.0)
+            return
+
+        limit = self.queue_limits.get(lane, self.max_queued)
+        if limit and stats.queued >= limit:
+            stats.rejected += 1
+            raise SchedulerBusy(lane, stats.queued)
+
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(self.priorities.get(lane, 0), next(self._seq), lane, loop.create_future())
+        self._waiters.append(waiter)
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        self._dispatch()
+
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just before cancellation; hand the slot back
+                self._release(lane)
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+                stats.queued -= 1
+            raise
+
+    def _admit(self, stats: LaneStats, waited: float) -> None:
+        self._running += 1
+        stats.running += 1
+        stats.admitted += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+
+    def _release(self, lane: str) -> None:
+        self._running -= 1
+        self._lane(lane).running -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to the best waiters that fit"""
+        if not self._waiters or self._running >= self.max_concurrent:
+            return
+
+        now = time.monotonic()
+        for waiter in sorted(self._waiters, key=lambda w: (w.priority, w.seq)):
+            if self._running >= self.max_concurrent:
+                break
+            if waiter.future.done() or not self._has_room(waiter.lane):
+                continue
+            self._waiters.remove(waiter)
+            stats = self._lane(waiter.lane)
+            stats.queued -= 1
+            self._admit(stats, now - waiter.enqueued_at)
+            waiter.future.set_result(None)
+
+
+_scheduler: Optional[ProcessScheduler] = None
+
+
+def get_scheduler() -> ProcessScheduler:
+    """Return the process-wide scheduler, creating it on first use"""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = ProcessScheduler(
+            max_concurrent=Config.MAX_CONCURRENT_PROCESSES,
+            lane_limits=Config.OPERATION_LIMITS,
+            lane_aliases=Config.OPERATION_LANES,
+            priorities=Config.OPERATION_PRIORITY,
+            max_queued=Config.MAX_QUEUED,
+            queue_limits=Config.QUEUE_LIMITS,
+        )
+    return _scheduler
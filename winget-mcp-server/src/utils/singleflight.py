@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Single-flight coalescing of identical in-flight WinGet calls"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Share one in-flight call among all concurrent callers with the same key
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running await the same future and receive the same result (or
+    exception). Once the call finishes the key is released, so the next
+    caller starts fresh work.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run fn once per key among concurrent callers
+
+        Args:
+            key: Identity of the call, e.g. the normalized winget arguments
+            fn: Zero-argument coroutine factory performing the call
+
+        Returns:
+            The result of the shared call
+        """
+        future = self._inflight.get(key)
+        if future is not None:
+            self.shared += 1
+            # Shield so one cancelled waiter does not cancel the others
+            return await asyncio.shield(future)
+
+        self.calls += 1
+        future = asyncio.ensure_future(fn())
+        self._inflight[key] = future
+        future.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        """Forget a finished call so the next caller starts fresh work"""
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+
+    def in_flight(self) -> int:
+        """Number of calls currently running"""
+        return len(self._inflight)
+
+
+_flights = SingleFlight()
+
+
+async def coalesce(key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fn through the process-wide single-flight group"""
+    return await _flights.do(key, fn)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Machine-readable winget output, used when this winget supports it"""
+
+import json
+import os
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from ..config import Config
+from .metrics import PARSE, get_metrics
+from .process import run_winget
+from .singleflight import coalesce
+
+# Detected capabilities by name; probed once per process
+_capabilities: Dict[str, bool] = {}
+
+EXPORT = "export"
+
+
+async def supports(capability: str) -> bool:
+    """
+    Whether this winget offers a structured output path
+
+    The probe runs once; its answer is kept for the life of the process.
+    Config.STRUCTURED_OUTPUT turns every capability off.
+
+    Args:
+        capability: Capability name, e.g. EXPORT
+
+    Returns:
+        True when the structured path can be used
+    """
+    if not Config.STRUCTURED_OUTPUT:
+        return False
+    if capability not in _capabilities:
+        _capabilities[capability] = await coalesce(("capability", capability),
+                                                   lambda: _probe(capability))
+    return _capabilities[capability]
+
+
+def capabilities() -> Dict[str, bool]:
+    """Capabilities detected so far"""
+    return dict(_capabilities)
+
+
+async def _probe(capability: str) -> bool:
+    if capability == EXPORT:
+        try:
+            completed = await run_winget(['export', '--help'])
+        except OSError:
+            return False
+        return completed.returncode == 0
+    return False
+
+
+async def export_installed() -> Optional[List[Dict[str, Optional[str]]]]:
+    """
+    Read installed packages from `winget export` JSON
+
+    Only packages winget can match to a source are exported, and the
+    document carries no display names or available versions; callers
+    that need those read the `winget list` table (see
+    list_tool.read_installed).
+
+    Returns:
+        Package dicts shaped like parsed `winget list` rows (name is the
+        id, available is None), or None when the export failed
+    """
+    fd, path = tempfile.mkstemp(prefix='winget-export-', suffix='.json')
+    os.close(fd)
+    try:
+        completed = await run_winget(['export', '-o', path, '--include-versions',
+                                      '--accept-source-agreements'])
+        if completed.returncode != 0:
+            return None
+        with get_metrics().phase(PARSE), open(path, encoding='utf-8-sig') as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        document = None
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    try:
+        return parse_export(document)
+    except ValueError:
+        # winget accepted the command but wrote no usable document; stop
+        # asking it for one
+        _capabilities[EXPORT] = False
+        return None
+
+
+def parse_export(document: Dict[str, Any]) -> List[Dict[str, Optional[str]]]:
+    """
+    Convert a `winget export` document into package dicts
+
+    Sources and packages that are not JSON objects, and packages without
+    an identifier, are skipped.
+
+    Args:
+        document: Parsed export JSON
+
+    Returns:
+        Packages in export order, shaped like parsed `winget list` rows
+
+    Raises:
+        ValueError: The document is not an export
+    """
+    sources = document.get("Sources") if isinstance(document, dict) else None
+    if not isinstance(sources, list):
+        raise ValueError("Not a winget export document")
+    packages = []
+    for source in sources:
+        if not isinstance(source, dict):
+            continue
+        details = source.get("SourceDetails")
+        source_name = (details.get("Name") if isinstance(details, dict) else None) or "Unknown"
+        items = source.get("Packages")
+        for item in items if isinstance(items, list) else []:
+            package_id = item.get("PackageIdentifier") if isinstance(item, dict) else None
+            if not package_id or not isinstance(package_id, str):
+                continue
+            packages.append({
+                "name": package_id,
+                "id": package_id,
+                "version": item.get("Version") or "Unknown",
+                "available": None,
+                "source": source_name,
+            })
+    return packages
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Single-pass parser for winget's fixed-width tables"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from operator import itemgetter
+from typing import (Any, AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator, List,
+                    Optional, Sequence, Tuple)
+
+_TITLE_RE = re.compile(r'\S+')
+_DASH_RUN_RE = re.compile(r'-+')
+
+
+@lru_cache(maxsize=4096)
+def char_width(char: str) -> int:
+    """Terminal cell width of a single character"""
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ('W', 'F') else 1
+
+
+def display_width(text: str) -> int:
+    """Terminal cell width of a string"""
+    if text.isascii():
+        return len(text)
+    return sum(char_width(char) for char in text)
+
+
+def _clean(line: str) -> str:
+    """Drop spinner frames (everything before the last CR) and the line ending"""
+    if '\r' in line:
+        line = line.rstrip('\r\n')
+        line = line[line.rfind('\r') + 1:]
+    return line.rstrip()
+
+
+def _is_separator(line: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith('---') and set(stripped) <= {'-', ' '}
+
+
+class TableParser:
+    """
+    Incremental parser for the tables printed by winget search/list/upgrade
+
+    Lines are fed one at a time. Column spans are derived once, when the
+    dash separator is seen: the preceding line is the header, and each
+    column starts at its title's display column (or at each run of dashes
+    when the separator is split per column). Data rows are sliced by
+    display width, so wide (CJK) characters and names containing double
+    spaces keep their columns. A line is held back until the next one
+    arrives, because a separator retroactively turns it into a header
+    (``winget list`` can print a second table after the first).
+
+    Rows are tuples of stripped cells, in column order or, when fields
+    are given, in that order with '' for columns the table lacks.
+    """
+
+    def __init__(self, fields: Optional[Sequence[str]] = None):
+        self.fields = tuple(fields) if fields else None
+        self.columns: List[str] = []
+        self._starts: List[int] = []
+        self._order: List[int] = []
+        self._width = 0
+        self._cells: Optional[Callable[[str], Tuple[str, ...]]] = None
+        self._boundaries: Optional[Callable[[str], Tuple[str, ...]]] = None
+        self._pending: Optional[str] = None
+
+    def feed(self, line: str) -> Optional[Tuple[str, ...]]:
+        """
+        Consume one line of output
+
+        Args:
+            line: Raw output line, with or without line ending
+
+        Returns:
+            The row completed by this line, if any
+        """
+        line = _clean(line) if '\r' in line else line.rstrip()
+        if line and line[0] in '- ' and _is_separator(line):
+            if self._pending is not None:
+                self._set_header(self._pending, line)
+                self._pending = None
+            return None
+
+        pending, self._pending = self._pending, line or None
+        if pending is None or self._cells is None:
+            return None
+        return self._row(pending)
+
+    def close(self) -> Optional[Tuple[str, ...]]:
+        """Return the last held-back row at end of output"""
+        pending, self._pending = self._pending, None
+        if pending is None or self._cells is None:
+            return None
+        return self._row(pending)
+
+    def _set_header(self, header: str, separator: str) -> None:
+        titles = [(display_width(header[:m.start()]), m.group()) for m in _TITLE_RE.finditer(header)]
+        runs = [m.start() for m in _DASH_RUN_RE.finditer(separator)]
+        if len(runs) == len(titles) > 1:
+            # Per-column separator: trust the dash runs
+            titles = [(start, title) for start, (_, title) in zip(runs, titles)]
+        self.columns = columns = [title.lower() for _, title in titles]
+        self._starts = starts = [start for start, _ in titles]
+
+        # Output order: requested fields, with a past-the-end index (an
+        # empty cell) for fields this table does not have
+        if self.fields is None:
+            self._order = list(range(len(columns)))
+        else:
+            self._order = [columns.index(f) if f in columns else len(columns) for f in self.fields]
+
+        # ASCII rows are padded to the last column start and cut in field
+        # order with one C-level itemgetter call. The boundary getter reads
+        # the character before each column start, which winget always
+        # leaves blank; prose lines such as footers fail that check.
+        self._width = starts[-1] + 1
+        slices = [slice(a, b) for a, b in zip(starts, starts[1:] + [None])] + [slice(0, 0)]
+        self._cells = _tuple_getter([slices[i] for i in self._order])
+        self._boundaries = _tuple_getter([start - 1 for start in starts[1:]])
+        self._blank = (' ',) * (len(starts) - 1)
+
+    def _row(self, line: str) -> Optional[Tuple[str, ...]]:
+        """Slice a data line into a row, or None when it is not one"""
+        if line[0] == '<':
+            # "<additional entries truncated due to result limit>"
+            return None
+        if line.isascii():
+            padded = line.ljust(self._width)
+            if self._boundaries(padded) != self._blank:
+                return None
+            return tuple(map(str.strip, self._cells(padded)))
+
+        cells = self._slice_wide(line)
+        if cells is None:
+            return None
+        cells.append('')
+        return tuple(cells[i] for i in self._order)
+
+    def _slice_wide(self, line: str) -> Optional[List[str]]:
+        starts = self._starts
+        cells: List[List[str]] = [[] for _ in starts]
+        column = 0
+        col = 0
+        last = len(starts) - 1
+        previous = ' '
+        for char in line:
+            while column < last and col >= starts[column + 1]:
+                column += 1
+                if previous != ' ':
+                    return None
+            cells[column].append(char)
+            col += char_width(char)
+            previous = char
+        return [''.join(cell).strip() for cell in cells]
+
+
+def _tuple_getter(items: List[Any]) -> Callable[[str], Tuple[str, ...]]:
+    """itemgetter that always returns a tuple, even for zero or one item"""
+    if len(items) > 1:
+        return itemgetter(*items)
+    if len(items) == 1:
+        getter = itemgetter(items[0])
+        return lambda text: (getter(text),)
+    return lambda text: ()
+
+
+def iter_table_cells(lines: Iterable[str], fields: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+    """
+    Yield table rows as tuples of cells in the order of fields
+
+    Args:
+        lines: Output lines, e.g. a stream or the output split on newlines;
+               keep the CRs so spinner frames can be dropped
+        fields: Lowercased column titles to extract
+
+    Yields:
+        Tuples of stripped cells, '' where the table lacks a field
+    """
+    parser = TableParser(fields)
+    feed = parser.feed
+    for line in lines:
+        row = feed(line)
+        if row is not None:
+            yield row
+    row = parser.close()
+    if row is not None:
+        yield row
+
+
+async def aiter_table_cells(lines: AsyncIterable[str],
+                            fields: Sequence[str]) -> AsyncIterator[Tuple[str, ...]]:
+    """
+    Yield table rows from an async line stream as they are parsed
+
+    Args:
+        lines: Async iterable of output lines, e.g. a WingetStream
+        fields: Lowercased column titles to extract
+
+    Yields:
+        Tuples of stripped cells, '' where the table lacks a field
+    """
+    parser = TableParser(fields)
+    feed = parser.feed
+    async for line in lines:
+        row = feed(line)
+        if row is not None:
+            yield row
+    row = parser.close()
+    if row is not None:
+        yield row
+
+
+def iter_table_rows(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """
+    Yield table rows from winget output in a single pass
+
+    Args:
+        lines: Output lines, e.g. a stream or the output split on newlines;
+               keep the CRs so spinner frames can be dropped
+
+    Yields:
+        Dictionaries keyed by lowercased column title
+    """
+    parser = TableParser()
+    feed = parser.feed
+    for line in lines:
+        row = feed(line)
+        if row is not None:
+            yield dict(zip(parser.columns, row))
+    row = parser.close()
+    if row is not None:
+        yield dict(zip(parser.columns, row))
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""Parsing, ordering and range matching of winget version strings"""
+
+import re
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+# Version text winget prints when it does not know the version
+UNKNOWN = "Unknown"
+
+# Parsed keys kept in the memo table; the older half is dropped when full
+MEMO_SIZE = 1 << 16
+
+# Leading digits of a dot-separated part and the text after them
+_PART = re.compile(r'\s*(\d*)(.*?)\s*$')
+
+# Approximate versions in `winget list` ("< 2.3", "> 1.0") and a leading v
+_PREFIX = re.compile(r'^\s*(?:[<>]\s*)?[vV]?(?=\d)')
+
+# Date-style versions written with dashes, e.g. 2024-06-18
+_DATE = re.compile(r'^\d{4}-\d{1,2}-\d{1,2}$')
+
+# A part that counts like a missing one: 0 with no trailing text
+_PAD = (0, 1, '')
+
+# Ends every key; compares like the zero parts a shorter version is padded with
+_END = _PAD + (0,)
+
+_UNKNOWN_KEY = ((-1, 0, ''),)
+_LATEST_KEY = ((1 << 62, 1, ''),)
+
+VersionKey = Tuple[tuple, ...]
+
+T = TypeVar('T')
+
+# Version string -> key, and part text -> part tuple. Parts repeat across
+# versions ("0", "1", "2024"), so keys share their part tuples.
+_memo: Dict[Optional[str], VersionKey] = {}
+_parts: Dict[str, tuple] = {}
+
+
+def version_key(version: Optional[str]) -> VersionKey:
+    """
+    Sortable key of a winget version string
+
+    Follows winget's own ordering: parts split on dots compare by their
+    leading number, then a part without trailing text beats one with it
+    ("1.0" > "1.0-beta"), then trailing text compares case-insensitively.
+    Missing parts count as 0, so "1.2" == "1.2.0". This covers semver
+    pre-releases, 4-part versions and dotted dates; dashed dates such as
+    "2024-06-18" are read as "2024.6.18". Unknown versions sort before
+    everything and "latest" after everything.
+
+    Keys are memoized, so repeated versions cost one dict lookup.
+
+    Args:
+        version: Version string, e.g. "2.46.0.windows.1"
+
+    Returns:
+        Tuple that orders like the versions
+    """
+    key = _memo.get(version)
+    if key is None:
+        if len(_memo) >= MEMO_SIZE:
+            _evict()
+        key = _memo[version] = _parse(version)
+    return key
+
+
+def _evict() -> None:
+    """Drop the older half of the memo table, which keeps insertion order"""
+    for version in list(islice(_memo, len(_memo) // 2 or 1)):
+        del _memo[version]
+    if len(_parts) >= MEMO_SIZE:
+        _parts.clear()
+
+
+def _parse(version: Optional[str]) -> VersionKey:
+    if not version or version.strip() == UNKNOWN:
+        return _UNKNOWN_KEY
+    text = _PREFIX.sub('', version.strip(), count=1)
+    if text.lower() == 'latest':
+        return _LATEST_KEY
+    if _DATE.match(text):
+        text = text.replace('-', '.')
+    parts = [_parts.get(piece) or _part(piece) for piece in text.split('.')]
+    while parts and parts[-1] == _PAD:
+        parts.pop()
+    # A zero part compares against whatever the other version has in its
+    # place; it carries the direction of the next real part so that a
+    # shorter version, padded with zeros, orders correctly against it
+    key = []
+    direction = 0
+    for part in reversed(parts):
+        if part == _PAD:
+            key.append(_PAD + (direction,))
+        else:
+            key.append(part)
+            direction = 1 if part > _PAD else -1
+    key.reverse()
+    key.append(_END)
+    return tuple(key)
+
+
+def _part(piece: str) -> tuple:
+    digits, other = _PART.match(piece).groups()
+    part = _parts[piece] = (int(digits) if digits else 0, 0 if other else 1, other.lower())
+    return part
+
+
+def clear_memo() -> None:
+    """Forget all memoized keys"""
+    _memo.clear()
+    _parts.clear()
+
+
+def memo_stats() -> Dict[str, int]:
+    """Size of the memo table"""
+    return {"entries": len(_memo), "parts": len(_parts), "max_entries": MEMO_SIZE}
+
+
+def compare_versions(a: Optional[str], b: Optional[str]) -> int:
+    """
+    Compare two winget version strings
+
+    Returns:
+        -1, 0 or 1 as a is older than, equal to or newer than b
+    """
+    key_a, key_b = version_key(a), version_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def is_newer(candidate: Optional[str], current: Optional[str]) -> bool:
+    """Whether candidate is a known version newer than current"""
+    return version_key(candidate) > version_key(current)
+
+
+def sort_versions(items: Iterable[T], key: Optional[Callable[[T], Optional[str]]] = None,
+                  newest_first: bool = False) -> List[T]:
+    """
+    Sort versions, or items by the version key() returns
+
+    The sort is stable, so items with equal versions keep their order.
+
+    Args:
+        items: Version strings, or items to pass to key
+        key: Returns an item's version string
+        newest_first: Put the newest version first
+
+    Returns:
+        The sorted items
+    """
+    if key is None:
+        return sorted(items, key=version_key, reverse=newest_first)
+    return sorted(items, key=lambda item: version_key(key(item)), reverse=newest_first)
+
+
+# Version ranges: comma- or space-separated clauses, each an optional
+# operator and a version. A trailing .* (or .x) matches a prefix.
+_CLAUSE = re.compile(r'\s*(>=|<=|==|!=|>|<|=|~|\^)?\s*([^\s,<>=!~^]+)\s*,?')
+_RANGE_HINT = re.compile(r'[*<>=!~^,]|(?:^|\.)[xX](?:\.|$)')
+_WILDCARDS = ('*', 'x', 'X')
+
+_COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '>=': lambda key, bound: key >= bound,
+    '<=': lambda key, bound: key <= bound,
+    '>': lambda key, bound: key > bound,
+    '<': lambda key, bound: key < bound,
+    '==': lambda key, bound: key == bound,
+    '!=': lambda key, bound: key != bound,
+}
+
+
+def _part_at(key: VersionKey, index: int) -> tuple:
+    """Part index of a version key, without the padding direction"""
+    return key[index][:3] if index < len(key) - 1 else _PAD
+
+
+def _has_prefix(key: VersionKey, prefix: Tuple[tuple, ...]) -> bool:
+    if key[:len(prefix)] == prefix:
+        return True
+    return all(_part_at(key, index) == part for index, part in enumerate(prefix))
+
+
+class VersionRange:
+    """
+    A compiled version range; `version in range` tests a version
+
+    Built by parse_range. Unknown versions never match.
+    """
+
+    __slots__ = ('spec', '_checks')
+
+    def __init__(self, spec: str, checks: List[Callable[[VersionKey], bool]]):
+        self.spec = spec
+        self._checks = checks
+
+    def __contains__(self, version: Optional[str]) -> bool:
+        key = version_key(version)
+        if key == _UNKNOWN_KEY:
+            return False
+        for check in self._checks:
+            if not check(key):
+                return False
+        return True
+
+    def __repr__(self) -> str:
+        return f"VersionRange({self.spec!r})"
+
+
+def is_range(spec: Optional[str]) -> bool:
+    """Whether spec is a range such as "3.12.*" or ">=1.2, <2" rather than one version"""
+    return bool(spec) and _RANGE_HINT.search(spec) is not None
+
+
+@lru_cache(maxsize=256)
+def parse_range(spec: str) -> VersionRange:
+    """
+    Compile a version range
+
+    Clauses are separated by commas or spaces and must all hold:
+
+    - "3.12.*" or "3.12.x": the version starts with 3.12 ("!=3.12.*" excludes it)
+    - ">=1.2", ">1.2", "<=1.2", "<1.2", "==1.2", "!=1.2": compared in winget order
+    - "~1.2.3": at least 1.2.3 and starting with 1.2 ("~1.2": starting with 1.2)
+    - "^1.2.3": at least 1.2.3 and starting with 1 (0.2.3: with 0.2)
+    - "1.2.3" or "=1.2.3": exactly that version
+    - "*": any known version
+
+    Args:
+        spec: Range text
+
+    Returns:
+        The compiled range
+
+    Raises:
+        ValueError: When spec is not a valid range
+    """
+    checks: List[Callable[[VersionKey], bool]] = []
+    position = 0
+    text = spec.strip()
+    while position < len(text):
+        match = _CLAUSE.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid version range: {spec}")
+        position = match.end()
+        operator, operand = match.group(1) or '==', match.group(2)
+        if operator == '=':
+            operator = '=='
+        if operand[:1] in ('v', 'V') and operand[1:2].isdigit():
+            operand = operand[1:]
+        pieces = operand.split('.')
+        if pieces[-1] in _WILDCARDS:
+            if operator not in ('==', '!=') or any(piece in _WILDCARDS for piece in pieces[:-1]):
+                raise ValueError(f"Invalid version range: {spec}")
+            prefix = tuple(_parts.get(piece) or _part(piece) for piece in pieces[:-1])
+            negate = operator == '!='
+            checks.append(lambda key, prefix=prefix, negate=negate: _has_prefix(key, prefix) != negate)
+        elif any(piece in _WILDCARDS for piece in pieces):
+            raise ValueError(f"Invalid version range: {spec}")
+        elif operator in ('~', '^'):
+            bound = version_key(operand)
+            parts = [_parts.get(piece) or _part(piece) for piece in pieces]
+            if operator == '~':
+                prefix = tuple(parts[:-1] if len(parts) > 2 else parts)
+            else:
+                nonzero = next((index for index, part in enumerate(parts) if part != _PAD), len(parts) - 1)
+                prefix = tuple(parts[:nonzero + 1])
+            checks.append(lambda key, bound=bound, prefix=prefix: key >= bound and _has_prefix(key, prefix))
+        else:
+            bound = version_key(operand)
+            if bound == _UNKNOWN_KEY:
+                raise ValueError(f"Invalid version range: {spec}")
+            compare = _COMPARISONS[operator]
+            checks.append(lambda key, bound=bound, compare=compare: compare(key, bound))
+    if not checks:
+        raise ValueError(f"Invalid version range: {spec}")
+    return VersionRange(spec, checks)
+
+
+def matches(version: Optional[str], spec: str) -> bool:
+    """Whether version falls in the range spec (see parse_range)"""
+    return version in parse_range(spec)
+
+
+def latest_matching(versions: Iterable[Optional[str]], spec: str) -> Optional[str]:
+    """
+    Newest of versions in the range spec, e.g. "latest matching 3.12.*"
+
+    Args:
+        versions: Candidate version strings
+        spec: Range (see parse_range)
+
+    Returns:
+        The newest matching version, or None when none matches
+
+    Raises:
+        ValueError: When spec is not a valid range
+    """
+    allowed = parse_range(spec)
+    best, best_key = None, None
+    for version in versions:
+        if version in allowed:
+            key = version_key(version)
+            if best_key is None or key > best_key:
+                best, best_key = version, key
+    return best
@@ -1,2 +1,345 @@
+#!/usr/bin/env python3
+"""WinGet command interface: the backends that start winget processes"""
+
+import abc
+import asyncio
+import itertools
+import os
+import random
+import signal
+import subprocess
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from .config import Config
+
+WINGET = 'winget'
+
+# Exit code of an injected failure; winget's APPINSTALLER_CLI_ERROR_INTERNAL_ERROR
+INJECTED_EXIT = -1978335231
+
+SIGKILL = getattr(signal, 'SIGKILL', 9)
+
+
+class WingetExecutor(abc.ABC):
+    """
+    Starts winget processes
+
+    Every winget invocation of the server goes through the active executor
+    (see get_executor and utils.process). spawn() returns an object with
+    the parts of asyncio.subprocess.Process the server uses: stdout and
+    stderr stream readers, returncode, pid, wait(), communicate(),
+    terminate() and kill(). Backends implement _start(); the default
+    kill_tree() kills only the process itself.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.spawns = 0
+
+    async def spawn(self, args: List[str], new_group: bool = False) -> Any:
+        """
+        Start winget with stdout and stderr piped
+
+        Args:
+            args: winget arguments, starting with the subcommand
+            new_group: Start it as the leader of a new process group, so
+                       kill_tree() also stops the installers it starts
+
+        Returns:
+            The started process
+        """
+        self.spawns += 1
+        return await self._start(args, new_group)
+
+    @abc.abstractmethod
+    async def _start(self, args: List[str], new_group: bool) -> Any:
+        """Start the process for spawn(); backends implement this"""
+
+    async def kill_tree(self, process: Any) -> None:
+        """
+        Kill a process and everything it started
+
+        Args:
+            process: Process returned by spawn()
+        """
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Backend name and the number of processes started"""
+        return {"backend": self.name, "spawns": self.spawns}
+
+
+class SubprocessExecutor(WingetExecutor):
+    """
+    Runs the real winget executable
+
+    On POSIX every process leads its own session, so kill_tree() reaches
+    whatever it started even when new_group was not asked for.
+    """
+
+    name = "subprocess"
+
+    def __init__(self, executable: str = WINGET):
+        super().__init__()
+        self.executable = executable
+
+    async def _start(self, args: List[str], new_group: bool) -> asyncio.subprocess.Process:
+        group: Dict[str, Any] = {}
+        if os.name != 'nt':
+            group = {'start_new_session': True}
+        elif new_group:
+            group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+        return await asyncio.create_subprocess_exec(
+            self.executable, *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            **group
+        )
+
+    async def kill_tree(self, process: asyncio.subprocess.Process) -> None:
+        if process.returncode is not None:
+            return
+        try:
+            if os.name == 'nt':
+                killer = await asyncio.create_subprocess_exec(
+                    'taskkill', '/T', '/F', '/PID', str(process.pid),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.DEVNULL
+                )
+                await killer.wait()
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        await super().kill_tree(process)
+
+
+class FakeReply(NamedTuple):
+    """What a fake winget invocation prints and how it exits"""
+    stdout: str = ''
+    stderr: str = ''
+    exit: int = 0
+    # Seconds before the first output, on top of the executor latency
+    delay: float = 0.0
+    # Never exit on its own; only terminate() or kill() end it
+    hang: bool = False
+
+
+class FakeProcess:
+    """
+    In-process stand-in for a winget process, replaying one FakeReply
+
+    Output is fed to real asyncio stream readers from a task, so callers
+    read it exactly as they read a pipe. terminate() and kill() stop the
+    replay and report -SIGTERM / -SIGKILL like a signalled POSIX child.
+    """
+
+    _pids = itertools.count(100000)
+
+    def __init__(self, reply: FakeReply, latency: float = 0.0, line_latency: float = 0.0):
+        self.pid = next(self._pids)
+        self.returncode: Optional[int] = None
+        self.stdout = asyncio.StreamReader()
+        self.stderr = asyncio.StreamReader()
+        self._exited = asyncio.Event()
+        self._replay = asyncio.ensure_future(self._play(reply, latency, line_latency))
+
+    async def _play(self, reply: FakeReply, latency: float, line_latency: float) -> None:
+        try:
+            if latency + reply.delay:
+                await asyncio.sleep(latency + reply.delay)
+            if reply.hang:
+                await asyncio.Event().wait()
+            output = reply.stdout.encode('utf-8')
+            if line_latency:
+                for line in output.splitlines(keepends=True):
+                    self.stdout.feed_data(line)
+                    await asyncio.sleep(line_latency)
+            elif output:
+                self.stdout.feed_data(output)
+            if reply.stderr:
+                self.stderr.feed_data(reply.stderr.encode('utf-8'))
+            self._exit(reply.exit)
+        except asyncio.CancelledError:
+            pass
+
+    def _exit(self, returncode: int) -> None:
+        if self.returncode is None:
+            self.returncode = returncode
+            self.stdout.feed_eof()
+            self.stderr.feed_eof()
+            self._exited.set()
+
+    async def wait(self) -> int:
+        await self._exited.wait()
+        return self.returncode
+
+    async def communicate(self, input: Optional[bytes] = None):
+        stdout = await self.stdout.read()
+        stderr = await self.stderr.read()
+        await self.wait()
+        return stdout, stderr
+
+    def send_signal(self, signum: int) -> None:
+        if self.returncode is None:
+            self._replay.cancel()
+            self._exit(-signum)
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        self.send_signal(SIGKILL)
+
+
+class FakeExecutor(WingetExecutor):
+    """
+    Deterministic winget replacement replaying recorded output
+
+    A call is answered, in order of preference, by the reply registered
+    for "<subcommand> <package id>" (the id is the --id value or the first
+    argument), by the reply registered for the subcommand, or by the
+    recording <fixtures>/<subcommand>.txt. Anything else prints nothing
+    and exits 0. `winget export -o <file>` writes <fixtures>/export.json
+    when it exists.
+
+    Latency is added before every reply's output and line_latency after
+    each line. With failure_rate, that share of calls fails with
+    INJECTED_EXIT instead, drawn from a generator seeded with seed so a
+    run is repeatable; spawn_error makes every spawn raise it instead.
+    """
+
+    name = "fake"
+
+    def __init__(self, fixtures: Optional[str] = None,
+                 replies: Optional[Dict[str, Union[FakeReply, Dict[str, Any]]]] = None,
+                 latency: float = 0.0, line_latency: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0,
+                 spawn_error: Optional[OSError] = None):
+        super().__init__()
+        self.fixtures = fixtures
+        self.replies: Dict[str, FakeReply] = {}
+        for key, reply in (replies or {}).items():
+            self.reply(key, reply)
+        self.latency = latency
+        self.line_latency = line_latency
+        self.failure_rate = failure_rate
+        self.spawn_error = spawn_error
+        self.failures = 0
+        self.calls: List[List[str]] = []
+        self._random = random.Random(seed)
+        self._recordings: Dict[str, Optional[str]] = {}
+
+    def reply(self, key: str, reply: Union[FakeReply, Dict[str, Any]]) -> None:
+        """
+        Register the reply for "<subcommand>" or "<subcommand> <package id>"
+
+        Args:
+            key: Call to answer
+            reply: FakeReply, or a dict of its fields
+        """
+        self.replies[key] = reply if isinstance(reply, FakeReply) else FakeReply(**reply)
+
+    async def _start(self, args: List[str], new_group: bool) -> FakeProcess:
+        self.calls.append(list(args))
+        if self.spawn_error is not None:
+            raise self.spawn_error
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            self.failures += 1
+            reply = FakeReply(stderr="Injected failure\n", exit=INJECTED_EXIT)
+        else:
+            reply = self._reply(args)
+        return FakeProcess(reply, self.latency, self.line_latency)
+
+    def _reply(self, args: List[str]) -> FakeReply:
+        subcommand = args[0] if args else ''
+        if '--id' in args[:-1]:
+            package_id = args[args.index('--id') + 1]
+        else:
+            package_id = args[1] if len(args) > 1 else ''
+        reply = self.replies.get(f"{subcommand} {package_id}") or self.replies.get(subcommand)
+        if reply is not None:
+            return reply
+        if subcommand == 'export' and '-o' in args[:-1]:
+            self._export(args[args.index('-o') + 1])
+        recording = self._recording(subcommand)
+        return FakeReply(stdout=recording) if recording is not None else FakeReply()
+
+    def _recording(self, name: str) -> Optional[str]:
+        if name not in self._recordings:
+            text = None
+            if self.fixtures and name:
+                try:
+                    with open(os.path.join(self.fixtures, f'{name}.txt'), encoding='utf-8') as f:
+                        text = f.read()
+                except OSError:
+                    pass
+            self._recordings[name] = text
+        return self._recordings[name]
+
+    def _export(self, path: str) -> None:
+        if not self.fixtures:
+            return
+        try:
+            with open(os.path.join(self.fixtures, 'export.json'), 'rb') as src:
+                document = src.read()
+        except OSError:
+            return
+        with open(path, 'wb') as dst:
+            dst.write(document)
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(super().stats(), failures=self.failures)
+
+
 class WingetManager:
-    def __init__(self, config): self.config = config
+    """Builds the executor selected by the configuration"""
+
+    def __init__(self, config=Config):
+        self.config = config
+        self.executor = self._create_executor()
+
+    def _create_executor(self) -> WingetExecutor:
+        backend = self.config.EXECUTOR
+        if backend == "subprocess":
+            return SubprocessExecutor()
+        if backend == "fake":
+            return FakeExecutor(
+                fixtures=self.config.FAKE_FIXTURES or None,
+                latency=self.config.FAKE_LATENCY,
+                line_latency=self.config.FAKE_LINE_LATENCY,
+                failure_rate=self.config.FAKE_FAILURE_RATE,
+                seed=self.config.FAKE_SEED,
+            )
+        raise ValueError(f"Unknown executor: {backend}")
+
+
+_executor: Optional[WingetExecutor] = None
+
+
+def get_executor() -> WingetExecutor:
+    """Return the process-wide executor built from Config"""
+    global _executor
+    if _executor is None:
+        _executor = WingetManager(Config).executor
+    return _executor
+
+
+def set_executor(executor: Optional[WingetExecutor]) -> Optional[WingetExecutor]:
+    """
+    Replace the process-wide executor, e.g. with a FakeExecutor in tests
+
+    Args:
+        executor: New executor; None rebuilds it from Config on next use
+
+    Returns:
+        The executor that was active before
+    """
+    global _executor
+    previous, _executor = _executor, executor
+    return previous
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Fake winget executable for tests that spawn real subprocesses
+
+The script replays fixture output for the requested subcommand and is
+driven by environment variables:
+
+    FAKE_WINGET_LOG         file that gets one line appended per invocation
+    FAKE_WINGET_DELAY       seconds to sleep before writing output
+    FAKE_WINGET_EXIT        exit code to return (default 0)
+    FAKE_WINGET_FIXTURES    directory holding <subcommand>.txt outputs
+    FAKE_WINGET_LINE_DELAY  seconds to sleep after each output line
+    FAKE_WINGET_SCRIPT      JSON file mapping "<subcommand> <package id>" to
+                            {"exit": code, "delay": seconds} overrides;
+                            "child_pid_file" also starts a long-running child
+                            process (like an installer) and records its pid,
+                            and "escape" starts it in its own session so a
+                            process-group kill misses it while it keeps the
+                            output pipes open;
+                            "flood" writes that many bytes of filler lines
+                            to stdout (-1 never stops) and "line" sets their
+                            length (default 80); "stderr_flood" writes that
+                            many bytes to stderr
+    FAKE_WINGET_EXPORT      JSON document `winget export -o <file>` writes
+"""
+
+import json
+import os
+import stat
+import subprocess
+import sys
+import time
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def install_fake_winget(directory: str) -> str:
+    """
+    Write a ``winget`` shim into directory that runs this script
+
+    Args:
+        directory: Directory to place the shim in, to be prepended to PATH
+
+    Returns:
+        Path of the shim
+    """
+    script = os.path.abspath(__file__)
+    if os.name == 'nt':
+        shim = os.path.join(directory, 'winget.cmd')
+        with open(shim, 'w') as f:
+            f.write(f'@"{sys.executable}" "{script}" %*\r\n')
+    else:
+        shim = os.path.join(directory, 'winget')
+        with open(shim, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}" "$@"\n')
+        os.chmod(shim, os.stat(shim).st_mode | stat.S_IEXEC)
+    return shim
+
+
+def main(argv):
+    log_path = os.environ.get('FAKE_WINGET_LOG')
+    if log_path:
+        with open(log_path, 'a') as f:
+            f.write(' '.join(argv) + '\n')
+
+    subcommand = argv[0] if argv else ''
+    script = _scripted(subcommand, argv)
+    if 'child_pid_file' in script:
+        child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'],
+                                 start_new_session=bool(script.get('escape')))
+        with open(script['child_pid_file'], 'w') as f:
+            f.write(str(child.pid))
+
+    delay = float(script.get('delay', os.environ.get('FAKE_WINGET_DELAY', '0')))
+    if delay:
+        time.sleep(delay)
+
+    if 'flood' in script:
+        _flood(int(script['flood']), int(script.get('line', 80)))
+    if 'stderr_flood' in script:
+        sys.stderr.buffer.write(b'e' * int(script['stderr_flood']))
+        sys.stderr.flush()
+
+    export = os.environ.get('FAKE_WINGET_EXPORT')
+    if subcommand == 'export' and export and '-o' in argv:
+        with open(export, 'rb') as src, open(argv[argv.index('-o') + 1], 'wb') as dst:
+            dst.write(src.read())
+
+    fixtures = os.environ.get('FAKE_WINGET_FIXTURES', FIXTURES_DIR)
+    fixture = os.path.join(fixtures, f'{subcommand}.txt')
+    if os.path.exists(fixture):
+        line_delay = float(os.environ.get('FAKE_WINGET_LINE_DELAY', '0'))
+        with open(fixture, 'rb') as f:
+            if line_delay:
+                for line in f:
+                    sys.stdout.buffer.write(line)
+                    sys.stdout.flush()
+                    time.sleep(line_delay)
+            else:
+                sys.stdout.buffer.write(f.read())
+        sys.stdout.flush()
+
+    return int(script.get('exit', os.environ.get('FAKE_WINGET_EXIT', '0')))
+
+
+def _flood(size, line_length):
+    """Write filler lines to stdout; size < 0 writes until killed"""
+    line = b'x' * (line_length - 1) + b'\n'
+    written = 0
+    while size < 0 or written < size:
+        chunk = line * 64 if size < 0 else (line * 64)[:size - written]
+        sys.stdout.buffer.write(chunk)
+        written += len(chunk)
+    sys.stdout.flush()
+
+
+def _scripted(subcommand, argv):
+    """Per-package overrides from FAKE_WINGET_SCRIPT for this invocation"""
+    path = os.environ.get('FAKE_WINGET_SCRIPT')
+    if not path:
+        return {}
+    if '--id' in argv:
+        package_id = argv[argv.index('--id') + 1]
+    else:
+        package_id = argv[1] if len(argv) > 1 else ''
+    with open(path) as f:
+        return json.load(f).get(f'{subcommand} {package_id}', {})
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Test batch installs and batch info against a fake winget with scripted exit codes"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.tools import info_tool
+from src.tools.info_tool import get_package_info, get_package_info_batch
+from src.tools.install_tool import install_batch
+
+PACKAGES = [
+    {"package_id": "Git.Git"},
+    {"package_id": "Mozilla.Firefox", "version": "127.0"},
+    {"package_id": "VideoLAN.VLC"},
+]
+
+
+class TestInstallBatch(unittest.TestCase):
+    """Resolve in parallel, install in order, one result per package"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.script = os.path.join(self.tmp.name, 'script.json')
+        self.env = mock.patch.dict(os.environ, {
+            'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+            'FAKE_WINGET_LOG': self.log,
+            'FAKE_WINGET_SCRIPT': self.script,
+        })
+        self.env.start()
+        self.write_script({})
+
+    def tearDown(self):
+        self.env.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def write_script(self, script):
+        with open(self.script, 'w') as f:
+            json.dump(script, f)
+
+    def calls(self, subcommand):
+        with open(self.log) as f:
+            return [line.split() for line in f if line.startswith(subcommand + ' ')]
+
+    def test_all_installed_in_order(self):
+        """Every package resolves and installs, in list order"""
+        result = asyncio.run(install_batch(PACKAGES))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["summary"], {"installed": 3})
+        self.assertEqual([r["package_id"] for r in result["results"]], [p["package_id"] for p in PACKAGES])
+        self.assertEqual([c[1] for c in self.calls('install')], ["Git.Git", "Mozilla.Firefox", "VideoLAN.VLC"])
+        self.assertIn("--version", self.calls('install')[1])
+
+    def test_scripted_failure(self):
+        """A failing installer fails only its own item"""
+        self.write_script({"install Mozilla.Firefox": {"exit": 23}})
+        result = asyncio.run(install_batch(PACKAGES))
+        self.assertFalse(result["success"])
+        self.assertEqual(result["summary"], {"installed": 2, "failed": 1})
+        self.assertEqual(result["results"][1]["return_code"], 23)
+
+    def test_unknown_package_is_not_installed(self):
+        """A package that does not resolve never reaches the installer"""
+        self.write_script({"show VideoLAN.VLC": {"exit": 1}})
+        result = asyncio.run(install_batch(PACKAGES))
+        self.assertEqual(result["results"][2]["status"], "not_found")
+        self.assertNotIn("VideoLAN.VLC", [c[1] for c in self.calls('install')])
+
+    def test_per_item_timeout(self):
+        """A hanging installer is killed after its timeout and the batch moves on"""
+        self.write_script({"install Git.Git": {"delay": 30}})
+        start = time.perf_counter()
+        result = asyncio.run(install_batch(PACKAGES, timeout=0.5))
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(result["results"][0]["status"], "timed_out")
+        self.assertEqual(result["summary"], {"timed_out": 1, "installed": 2})
+
+    def test_resolve_uses_show_deadline(self):
+        """A hung resolve is cut off at the show deadline, not the install timeout"""
+        self.write_script({"show Git.Git": {"delay": 30}})
+        start = time.perf_counter()
+        with mock.patch.dict(Config.OPERATION_TIMEOUTS, {"show": 0.5}):
+            result = asyncio.run(install_batch(PACKAGES, timeout=600))
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(result["results"][0]["status"], "not_found")
+        self.assertIn("timed out after 0.5s", result["results"][0]["error"])
+        self.assertEqual(result["summary"], {"not_found": 1, "installed": 2})
+
+    def test_progress_reported_per_item(self):
+        """The progress callback sees each completed item"""
+        reports = []
+
+        async def progress(done, total, message):
+            reports.append((done, total, message))
+
+        asyncio.run(install_batch(PACKAGES, progress=progress))
+        self.assertEqual([(d, t) for d, t, _ in reports], [(1, 3), (2, 3), (3, 3)])
+        self.assertEqual(reports[0][2], "Git.Git: installed")
+
+
+
+class TestInfoBatch(unittest.TestCase):
+    """Fan out `winget show` with cache hits, per-id errors and a deadline"""
+
+    IDS = ["Git.Git", "Mozilla.Firefox", "VideoLAN.VLC", "7zip.7zip"]
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.script = os.path.join(self.tmp.name, 'script.json')
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_LOG': self.log,
+                'FAKE_WINGET_SCRIPT': self.script,
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.write_script({})
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def write_script(self, script):
+        with open(self.script, 'w') as f:
+            json.dump(script, f)
+
+    def shows(self):
+        with open(self.log) as f:
+            return [line.split()[1] for line in f if line.startswith('show ')]
+
+    def test_cached_failed_and_found(self):
+        """Cached ids skip winget, failures stay per id, order and dedupe hold"""
+        self.write_script({"show VideoLAN.VLC": {"exit": 1}})
+        reports = []
+
+        async def progress(done, total, message):
+            reports.append((done, total))
+
+        async def run():
+            await get_package_info("Git.Git")
+            return await get_package_info_batch(self.IDS + ["git.git"], progress=progress)
+
+        result = asyncio.run(run())
+        self.assertTrue(result["success"])
+        self.assertEqual([r["package_id"] for r in result["results"]], self.IDS)
+        self.assertEqual(result["summary"], {"found": 3, "failed": 1})
+        self.assertTrue(result["results"][0]["cached"])
+        self.assertEqual(result["results"][1]["info"]["id"], "Microsoft.PowerShell")
+        self.assertIn("error", result["results"][2])
+        self.assertEqual(sorted(self.shows()), sorted(self.IDS))
+        self.assertEqual(reports[-1], (4, 4))
+        self.assertEqual(len(reports), 4)
+
+    def test_parallelism_limit(self):
+        """No more than parallelism shows run at once"""
+        self.write_script({f"show {package_id}": {"delay": 0.4} for package_id in self.IDS})
+        start = time.perf_counter()
+        result = asyncio.run(get_package_info_batch(self.IDS, parallelism=2))
+        elapsed = time.perf_counter() - start
+        self.assertEqual(result["summary"], {"found": 4})
+        self.assertGreaterEqual(elapsed, 0.8)
+
+    def test_deadline_returns_pending(self):
+        """Unfinished ids are pending at the deadline and cached for the next call"""
+        self.write_script({"show Mozilla.Firefox": {"delay": 1.0}})
+
+        async def run():
+            first = await get_package_info_batch(self.IDS[:2], timeout=0.5)
+            await asyncio.gather(*info_tool._background)
+            second = await get_package_info_batch(self.IDS[:2], timeout=0.5)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first["summary"], {"found": 1, "pending": 1})
+        self.assertEqual(first["results"][1], {"package_id": "Mozilla.Firefox", "status": "pending"})
+        self.assertEqual(second["summary"], {"found": 2})
+        self.assertTrue(all(r["cached"] for r in second["results"]))
+        self.assertEqual(self.shows().count("Mozilla.Firefox"), 1)
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
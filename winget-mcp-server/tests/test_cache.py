@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test the shared result cache"""
+
+import asyncio
+import os
+import sys
+import time
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.cache import ResultCache
+
+
+class CountingFetcher:
+    """Fetcher that returns a new successful result on every call"""
+
+    def __init__(self, payload: str = "x"):
+        self.calls = 0
+        self.payload = payload
+
+    async def __call__(self):
+        self.calls += 1
+        return {"success": True, "call": self.calls, "payload": self.payload}
+
+
+class TestResultCache(unittest.TestCase):
+    """Test TTL, LRU, stale-while-revalidate and invalidation"""
+
+    def test_hit_after_miss(self):
+        """Second lookup within the TTL is served from the cache"""
+        cache = ResultCache()
+        fetch = CountingFetcher()
+
+        async def run():
+            first = await cache.get_or_fetch(("search", "python", 5), fetch, ttl=60)
+            second = await cache.get_or_fetch(("search", "python", 5), fetch, ttl=60)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertEqual(fetch.calls, 1)
+        self.assertIs(first, second)
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_failures_are_not_cached(self):
+        """Unsuccessful results are returned but never stored"""
+        cache = ResultCache()
+        calls = []
+
+        async def failing():
+            calls.append(1)
+            return {"success": False, "error": "boom"}
+
+        async def run():
+            await cache.get_or_fetch(("info", "x"), failing, ttl=60)
+            await cache.get_or_fetch(("info", "x"), failing, ttl=60)
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(cache.stats()["entries"], 0)
+
+    def test_stale_while_revalidate(self):
+        """Expired entries are served stale and refreshed in the background"""
+        cache = ResultCache(stale_ttl=60)
+        fetch = CountingFetcher()
+
+        async def run():
+            await cache.get_or_fetch(("list", 20), fetch, ttl=0.01)
+            time.sleep(0.02)
+            stale = await cache.get_or_fetch(("list", 20), fetch, ttl=0.01)
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+            fresh = await cache.get_or_fetch(("list", 20), fetch, ttl=60)
+            return stale, fresh
+
+        stale, fresh = asyncio.run(run())
+        self.assertEqual(stale["call"], 1)
+        self.assertEqual(fresh["call"], 2)
+        self.assertEqual(cache.stats()["stale_hits"], 1)
+        self.assertEqual(cache.stats()["refreshes"], 1)
+
+    def test_lru_eviction_by_entries(self):
+        """The least recently used entry is evicted first"""
+        cache = ResultCache(max_entries=2)
+        fetch = CountingFetcher()
+
+        async def run():
+            await cache.get_or_fetch(("info", "a"), fetch, ttl=60)
+            await cache.get_or_fetch(("info", "b"), fetch, ttl=60)
+            await cache.get_or_fetch(("info", "a"), fetch, ttl=60)
+            await cache.get_or_fetch(("info", "c"), fetch, ttl=60)
+            await cache.get_or_fetch(("info", "a"), fetch, ttl=60)
+            await cache.get_or_fetch(("info", "b"), fetch, ttl=60)
+
+        asyncio.run(run())
+        # a, b, c, then b again after it was evicted
+        self.assertEqual(fetch.calls, 4)
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_memory_bound(self):
+        """Entries are evicted to keep the approximate size under max_bytes"""
+        cache = ResultCache(max_bytes=200)
+        fetch = CountingFetcher(payload="y" * 80)
+
+        async def run():
+            for name in ("a", "b", "c"):
+                await cache.get_or_fetch(("info", name), fetch, ttl=60)
+
+        asyncio.run(run())
+        stats = cache.stats()
+        self.assertLessEqual(stats["bytes"], 200)
+        self.assertGreater(stats["evictions"], 0)
+
+    def test_invalidate_namespace(self):
+        """Invalidating one namespace leaves the others intact"""
+        cache = ResultCache()
+        fetch = CountingFetcher()
+
+        async def run():
+            await cache.get_or_fetch(("list", 20), fetch, ttl=60)
+            await cache.get_or_fetch(("search", "git", 10), fetch, ttl=60)
+            removed = cache.invalidate("list")
+            await cache.get_or_fetch(("list", 20), fetch, ttl=60)
+            await cache.get_or_fetch(("search", "git", 10), fetch, ttl=60)
+            return removed
+
+        removed = asyncio.run(run())
+        self.assertEqual(removed, 1)
+        self.assertEqual(fetch.calls, 3)
+
+    def test_invalidate_discards_in_flight_result(self):
+        """A fetch that started before invalidation is not stored"""
+        cache = ResultCache()
+
+        async def slow():
+            await asyncio.sleep(0.01)
+            return {"success": True}
+
+        async def run():
+            task = asyncio.create_task(cache.get_or_fetch(("list", 20), slow, ttl=60))
+            await asyncio.sleep(0)
+            cache.invalidate("list")
+            await task
+
+        asyncio.run(run())
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
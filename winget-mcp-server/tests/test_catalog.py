@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Test the persistent package catalog index"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.catalog import CatalogIndex, get_catalog
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.tools import search_tool
+from src.tools.search_tool import search_packages
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'catalog.json')
+
+
+class TestCatalogIndex(unittest.TestCase):
+    """Test search, ranking and incremental refresh against a fixture catalog"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.catalog = CatalogIndex(os.path.join(self.tmp.name, 'catalog.db'))
+        self.catalog.import_file(FIXTURE)
+
+    def tearDown(self):
+        self.catalog.close()
+        self.tmp.cleanup()
+
+    def test_import_fixture(self):
+        """All fixture packages are indexed"""
+        self.assertEqual(len(self.catalog), 15)
+
+    def test_prefix_search(self):
+        """Query tokens match as prefixes of name and id tokens"""
+        ids = [p["id"] for p in self.catalog.search("pyth", 10, fuzzy=False)]
+        self.assertIn("Python.Python.3.12", ids)
+        self.assertIn("Python.Launcher", ids)
+
+    def test_exact_match_ranks_first(self):
+        """An exact id or name match is ranked above other hits"""
+        results = self.catalog.search("git", 5)
+        self.assertEqual(results[0]["id"], "Git.Git")
+
+    def test_multi_token_query(self):
+        """All tokens must match"""
+        results = self.catalog.search("visual studio", 5, fuzzy=False)
+        self.assertEqual([p["id"] for p in results], ["Microsoft.VisualStudioCode"])
+
+    def test_tag_and_publisher_search(self):
+        """Tags and publisher are searchable"""
+        self.assertIn("VideoLAN.VLC", [p["id"] for p in self.catalog.search("media", 5)])
+        self.assertIn("Mozilla.Firefox", [p["id"] for p in self.catalog.search("mozilla", 5)])
+
+    def test_fuzzy_search(self):
+        """Misspelled queries still find close names"""
+        results = self.catalog.search("firefx", 3)
+        self.assertEqual(results[0]["id"], "Mozilla.Firefox")
+
+    def test_lookup_hit_and_miss(self):
+        """lookup answers when enough matches exist and misses otherwise"""
+        self.assertEqual(len(self.catalog.lookup("python", 3)), 3)
+        self.assertIsNone(self.catalog.lookup("python", 20))
+
+    def test_lookup_ignores_fuzzy_matches(self):
+        """A typo is not answered from approximate matches alone"""
+        self.assertEqual(self.catalog.search("firefx", 1)[0]["id"], "Mozilla.Firefox")
+        self.assertIsNone(self.catalog.lookup("firefx", 1))
+
+    def test_lookup_fills_up_to_limit(self):
+        """A hit returns up to limit results in one query"""
+        results = self.catalog.lookup("python", 3, 10)
+        self.assertGreater(len(results), 3)
+        self.assertEqual(results, self.catalog.search("python", 10))
+
+    def test_lookup_uses_recorded_queries(self):
+        """A query winget answered completely is a hit even with few rows"""
+        self.assertIsNone(self.catalog.lookup("obscure", 10))
+        self.catalog.add_search_results("obscure", 10, [
+            {"name": "Obscure Tool", "id": "Some.ObscureTool", "version": "1.0", "source": "winget"},
+        ])
+        results = self.catalog.lookup("Obscure", 10)
+        self.assertEqual([p["id"] for p in results], ["Some.ObscureTool"])
+
+    def test_incremental_upsert(self):
+        """Only new or changed rows are written"""
+        unchanged = {"id": "Git.Git", "name": "Git", "version": "2.46.0", "source": "winget"}
+        upgraded = {"id": "GitHub.cli", "name": "GitHub CLI", "version": "2.54.0", "source": "winget"}
+        self.assertEqual(self.catalog.upsert([unchanged, upgraded]), 1)
+        self.assertEqual(self.catalog.search("GitHub.cli", 1)[0]["version"], "2.54.0")
+
+    def test_placeholders_do_not_overwrite(self):
+        """Unknown versions and id-only names keep the indexed values"""
+        self.catalog.upsert([{"id": "Git.Git", "name": "Git.Git", "version": "Unknown"}])
+        package = self.catalog.search("Git.Git", 1)[0]
+        self.assertEqual(package["name"], "Git")
+        self.assertEqual(package["version"], "2.46.0")
+
+    def test_reimport_unchanged_file_is_skipped(self):
+        """Importing the same file again does no work"""
+        self.assertTrue(self.catalog.import_file(FIXTURE)["skipped"])
+
+    def test_import_winget_export(self):
+        """winget export documents are accepted for ids, without their versions"""
+        path = os.path.join(self.tmp.name, 'export.json')
+        with open(path, 'w') as f:
+            json.dump({"Sources": [{
+                "SourceDetails": {"Name": "winget"},
+                "Packages": [{"PackageIdentifier": "Microsoft.Edge", "Version": "126.0"}],
+            }]}, f)
+        result = self.catalog.import_file(path)
+        self.assertEqual(result["changed"], 1)
+        self.assertEqual(self.catalog.search("edge", 1)[0]["id"], "Microsoft.Edge")
+        # Export versions are installed ones, not the latest available
+        self.assertEqual(self.catalog.versions(["Microsoft.Edge"]), {})
+
+    def test_persistence(self):
+        """The index survives reopening"""
+        path = self.catalog.path
+        self.catalog.close()
+        self.catalog = CatalogIndex(path)
+        self.assertEqual(len(self.catalog), 15)
+
+
+class TestSearchFromCatalog(unittest.TestCase):
+    """search_packages answers from the index and falls back to winget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_LOG': self.log,
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', os.path.join(self.tmp.name, 'catalog.db')),
+            mock.patch.object(Config, 'CATALOG_SOURCE', FIXTURE),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        get_catalog().close()
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def spawns(self):
+        if not os.path.exists(self.log):
+            return 0
+        with open(self.log) as f:
+            return sum(1 for line in f if line.strip())
+
+    def test_hit_does_not_spawn(self):
+        """A query the index can answer never starts winget"""
+        result = asyncio.run(search_packages("python", 3))
+        self.assertTrue(result["success"])
+        self.assertTrue(result["from_catalog"])
+        self.assertEqual(result["count_returned"], 3)
+        self.assertEqual(self.spawns(), 0)
+
+    def test_miss_spawns_and_populates(self):
+        """A miss runs winget once and records the answer for next time"""
+        async def run():
+            first = await search_packages("thonny", 10)
+            # The index is fed once the background read finishes
+            await asyncio.gather(*search_tool._drains)
+            get_result_cache().invalidate()
+            second = await search_packages("thonny", 10)
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertNotIn("from_catalog", first)
+        self.assertTrue(second["from_catalog"])
+        self.assertEqual(self.spawns(), 1)
+        self.assertIn("AivarAnnamaa.Thonny", [p["id"] for p in get_catalog().search("thonny", 5)])
+
+    def test_index_runs_off_the_event_loop(self):
+        """Index lookups and updates run on worker threads, not the loop's"""
+        threads = []
+        lookup, add = CatalogIndex.lookup, CatalogIndex.add_search_results
+
+        def record(method):
+            def wrapper(*args, **kwargs):
+                threads.append(threading.get_ident())
+                return method(*args, **kwargs)
+            return wrapper
+
+        async def run():
+            await search_packages("python", 3)
+            await search_packages("thonny", 10)
+            await asyncio.gather(*search_tool._drains)
+            return threading.get_ident()
+
+        with mock.patch.object(CatalogIndex, 'lookup', record(lookup)), \
+                mock.patch.object(CatalogIndex, 'add_search_results', record(add)):
+            loop_thread = asyncio.run(run())
+        self.assertEqual(len(threads), 3)
+        self.assertNotIn(loop_thread, threads)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
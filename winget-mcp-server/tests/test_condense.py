@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Test condensing of streamed install output"""
+
+import asyncio
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import Config
+from src.jobs import JobStore
+from src.tools.install_tool import install_package
+from src.utils.cache import get_result_cache
+from src.utils.condense import MAX_LINE, OutputCondenser
+from src.winget_manager import FakeExecutor, set_executor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SPINNER = ''.join(f'\r   {frame} ' for frame in '-\\|/' * 3) + '\r    \r'
+
+
+def download(total_mb=58.3, steps=20):
+    """A download bar redrawn steps times, the way winget draws it"""
+    frames = []
+    for step in range(1, steps + 1):
+        filled = 30 * step // steps
+        frames.append(f"\r  {'█' * filled}{'▒' * (30 - filled)}  "
+                      f"{total_mb * step / steps:.1f} MB / {total_mb} MB")
+    return ''.join(frames) + '\n'
+
+
+def install_output(steps=20, failed=False):
+    with open(os.path.join(FIXTURES, 'install.txt'), encoding='utf-8') as f:
+        lines = f.read().splitlines(keepends=True)
+    body = SPINNER + ''.join(lines[:4]) + download(steps=steps) + SPINNER + ''.join(lines[4:6])
+    if failed:
+        return body + "Installer failed with exit code: 1603\n"
+    return body + lines[6]
+
+
+class TestOutputCondenser(unittest.TestCase):
+    """Progress frames collapse; the tail and facts stay small"""
+
+    def test_progress_collapsed(self):
+        condenser = OutputCondenser()
+        condenser.feed(install_output())
+        condenser.close(0)
+        with open(os.path.join(FIXTURES, 'install.txt'), encoding='utf-8') as f:
+            self.assertEqual(condenser.text(), f.read())
+        self.assertEqual(condenser.facts, {
+            "package_name": "Git", "package_id": "Git.Git", "package_version": "2.46.0",
+            "download_url": "https://github.com/git-for-windows/git/releases/download/"
+                            "v2.46.0.windows.1/Git-2.46.0-64-bit.exe",
+            "downloaded": "58.3 MB / 58.3 MB",
+            "hash_verified": True, "installer_started": True, "installed": True,
+            "exit_code": 0,
+        })
+        self.assertGreater(condenser.frames, 40)
+
+    def test_chunk_boundaries(self):
+        """Feeding one character at a time condenses exactly like one chunk"""
+        output = install_output(failed=True).replace('\n', '\r\n')
+        whole, pieces = OutputCondenser(), OutputCondenser()
+        whole.feed(output)
+        for char in output:
+            pieces.feed(char)
+        for condenser in (whole, pieces):
+            condenser.close(1)
+        self.assertEqual(pieces.text(), whole.text())
+        self.assertEqual(pieces.facts, whole.facts)
+        self.assertEqual(whole.facts["installer_exit_code"], 1603)
+        self.assertEqual(whole.last_line, "Installer failed with exit code: 1603")
+
+    def test_bounded(self):
+        """A long install keeps tail_lines lines and one partial frame"""
+        condenser = OutputCondenser(tail_lines=10)
+        for index in range(2000):
+            condenser.feed(f"step {index}\n" + download(steps=50))
+        condenser.feed('\r' + 'x' * 10 * MAX_LINE)
+        self.assertEqual(condenser.lines, 2000)
+        self.assertEqual(condenser.omitted, 1990)
+        self.assertEqual(condenser.text().splitlines()[0], "step 1990")
+        self.assertLessEqual(len(condenser._partial), MAX_LINE)
+
+    def test_offsets(self):
+        """Readers continue from length; lines that fell out are skipped"""
+        condenser = OutputCondenser(tail_lines=2)
+        condenser.feed("one\ntwo\n")
+        offset = condenser.length
+        condenser.feed("three\nfour\nfive\n")
+        self.assertEqual(condenser.text(offset), "four\nfive\n")
+        self.assertEqual(condenser.start - offset, len("three\n"))
+        self.assertEqual(condenser.text(condenser.length), '')
+
+
+class TestInstallOutput(unittest.TestCase):
+    """Installs report the condensed tail and facts"""
+
+    def setUp(self):
+        self.executor = FakeExecutor(FIXTURES, replies={
+            "install Git.Git": {"stdout": install_output(steps=2000)},
+            "install Bad.App": {"stdout": install_output(failed=True), "exit": -1978335216},
+        })
+        self.previous = set_executor(self.executor)
+        self.patch = mock.patch.object(Config, 'CATALOG_PATH', '')
+        self.patch.start()
+
+    def tearDown(self):
+        self.patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+
+    def test_install_package(self):
+        result = asyncio.run(install_package('Git.Git'))
+        self.assertTrue(result["success"])
+        self.assertNotIn('█', result["stdout"])
+        self.assertTrue(result["stdout"].endswith("Successfully installed"))
+        self.assertTrue(result["facts"]["hash_verified"])
+        self.assertEqual(result["facts"]["downloaded"], "58.3 MB / 58.3 MB")
+        self.assertLess(len(result["stdout"]), 1000)
+
+    def test_install_failure(self):
+        result = asyncio.run(install_package('Bad.App'))
+        self.assertFalse(result["success"])
+        self.assertEqual(result["error"], "Installation failed: Installer failed with exit code: 1603")
+        self.assertEqual(result["facts"]["installer_exit_code"], 1603)
+        self.assertEqual(result["facts"]["exit_code"], -1978335216)
+
+    def test_job_output(self):
+        async def run():
+            store = JobStore()
+            job = store.submit("install", ['install', '--id', 'Git.Git'])
+            await store.wait(job.id, 5)
+            return job
+
+        job = asyncio.run(run())
+        self.assertNotIn('█', job.output())
+        status = job.as_dict()
+        self.assertEqual(status["output_length"], len(job.output()))
+        self.assertTrue(status["facts"]["installed"])
+        self.assertEqual(status["facts"]["exit_code"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Test response serialization"""
+
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils import encoding
+from src.utils.encoding import ResponseEncoder, tabulate
+
+RESULT = {
+    "success": True,
+    "count_returned": 2,
+    "packages": [
+        {"name": "Python 3.12", "id": "Python.Python.3.12", "version": "3.12.4", "source": "winget"},
+        {"name": "日本語 ツール", "id": "Example.Tool", "version": "1.0", "source": "winget"},
+    ],
+}
+
+
+class TestResponseEncoder(unittest.TestCase):
+    """Compact, indented and table layouts over both backends"""
+
+    def test_compact_by_default(self):
+        """Default output has no whitespace between tokens and keeps non-ASCII text"""
+        text = ResponseEncoder().encode(RESULT)
+        self.assertNotIn('\n', text)
+        self.assertNotIn('": ', text)
+        self.assertIn("日本語", text)
+        self.assertEqual(json.loads(text), RESULT)
+
+    def test_indent(self):
+        """An indent gives pretty-printed output with the same content"""
+        text = ResponseEncoder(indent=2, backend="json").encode(RESULT)
+        self.assertIn('\n  "success": true', text)
+        self.assertEqual(json.loads(text), RESULT)
+
+    def test_table_layout(self):
+        """Package lists are written as columns plus rows"""
+        decoded = json.loads(ResponseEncoder("table").encode(RESULT))
+        self.assertEqual(decoded["success"], True)
+        self.assertEqual(decoded["packages"]["columns"], ["name", "id", "version", "source"])
+        self.assertEqual(decoded["packages"]["rows"][0],
+                         ["Python 3.12", "Python.Python.3.12", "3.12.4", "winget"])
+
+    def test_tabulate_leaves_mixed_lists(self):
+        """Lists of differently shaped objects, scalars and empty lists stay as they are"""
+        value = {"items": [{"a": 1}, {"b": 2}], "tags": ["x", "y"], "empty": []}
+        self.assertEqual(tabulate(value), value)
+
+    def test_orjson_matches_json(self):
+        """The orjson backend, when installed, decodes to the same result"""
+        if encoding.orjson is None:
+            self.skipTest("orjson is not installed")
+        encoder = ResponseEncoder(backend="orjson")
+        self.assertEqual(encoder.backend, "orjson")
+        self.assertEqual(json.loads(encoder.encode(RESULT)), RESULT)
+
+    def test_falls_back_without_orjson(self):
+        """Requesting orjson without it installed uses the standard library"""
+        with mock.patch.object(encoding, 'orjson', None):
+            encoder = ResponseEncoder(backend="orjson")
+        self.assertEqual(encoder.backend, "json")
+        self.assertEqual(json.loads(encoder.encode(RESULT)), RESULT)
+
+    def test_unknown_options(self):
+        """Unknown layouts and backends are rejected"""
+        with self.assertRaises(ValueError):
+            ResponseEncoder("csv")
+        with self.assertRaises(ValueError):
+            ResponseEncoder(backend="ujson")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test search results enriched with winget show details"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.tools import info_tool
+from src.tools.search_tool import search_packages
+
+
+class TestSearchEnrich(unittest.TestCase):
+    """Top-K search results get show details within a latency budget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.script = os.path.join(self.tmp.name, 'script.json')
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_SCRIPT': self.script,
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        self.write_script({})
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def write_script(self, script):
+        with open(self.script, 'w') as f:
+            json.dump(script, f)
+
+    def test_top_k_enriched(self):
+        """Only the first enrich packages get details; the cached result stays plain"""
+        async def run():
+            enriched = await search_packages("python", 3, enrich=2)
+            plain = await search_packages("python", 3)
+            return enriched, plain
+
+        enriched, plain = asyncio.run(run())
+        first, second, third = enriched["packages"]
+        self.assertEqual(first["details"], "found")
+        self.assertEqual(first["publisher"], "Microsoft Corporation")
+        self.assertEqual(first["homepage"], "https://microsoft.com/PowerShell")
+        self.assertEqual(second["details"], "found")
+        self.assertNotIn("details", third)
+        self.assertEqual(enriched["enriched"], 2)
+        self.assertNotIn("details", plain["packages"][0])
+
+    def test_budget_marks_pending(self):
+        """Details not ready by the budget are pending and cached afterwards"""
+        self.write_script({"show Python.Python.3.11": {"delay": 1.0}})
+
+        async def run():
+            start = time.perf_counter()
+            first = await search_packages("python", 2, enrich=2, enrich_budget=0.4)
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*info_tool._background)
+            second = await search_packages("python", 2, enrich=2, enrich_budget=0.4)
+            return first, elapsed, second
+
+        first, elapsed, second = asyncio.run(run())
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual([p["details"] for p in first["packages"]], ["found", "pending"])
+        self.assertNotIn("publisher", first["packages"][1])
+        self.assertEqual([p["details"] for p in second["packages"]], ["found", "found"])
+
+    def test_failed_show(self):
+        """A failing show marks only its package"""
+        self.write_script({"show Python.Python.3.12": {"exit": 1}})
+        result = asyncio.run(search_packages("python", 2, enrich=2))
+        self.assertTrue(result["success"])
+        self.assertEqual([p["details"] for p in result["packages"]], ["failed", "found"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
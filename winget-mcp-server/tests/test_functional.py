@@ -5,15 +5,36 @@ import asyncio
 import json
 import sys
 import os
+import tempfile
 import unittest
+from unittest import mock
 
 # Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from server import mcp
+from src import catalog
+from src.config import Config
+from src.server import mcp
 
 class TestWinGetMCPFunctional(unittest.TestCase):
     """Functional tests for WinGet MCP Server tools"""
+
+    def setUp(self):
+        # Keep the catalog index out of the home directory
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(Config, 'CATALOG_PATH', os.path.join(self.tmp.name, 'catalog.db')),
+            mock.patch.object(catalog, '_catalog', None),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        if catalog._catalog is not None:
+            catalog._catalog.close()
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmp.cleanup()
     
     async def async_test_search_tool(self):
         """Test winget_search tool functionality"""
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the winget show parser"""
+
+import json
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.tools.info_tool import parse_info_output
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8', newline='') as f:
+        return f.read()
+
+
+class TestParseInfoOutput(unittest.TestCase):
+    """Fields, multi-line values and nested sections of `winget show`"""
+
+    def test_full_fixture(self):
+        """A show output with every kind of field parses to the recorded result"""
+        expected = json.loads(fixture('show_full.json'))
+        self.assertEqual(parse_info_output(fixture('show_full.txt')), expected)
+
+    def test_fields_are_not_overwritten(self):
+        """Labels containing another label's name keep their own keys"""
+        info = parse_info_output(fixture('show.txt'))
+        self.assertEqual(info["name"], "PowerShell")
+        self.assertEqual(info["id"], "Microsoft.PowerShell")
+        self.assertEqual(info["publisher"], "Microsoft Corporation")
+        self.assertEqual(info["publisher_support_url"], "https://github.com/PowerShell/PowerShell/issues")
+        self.assertEqual(info["license"], "MIT")
+        self.assertEqual(info["version"], "7.4.3.0")
+        self.assertEqual(info["tags"], ["command-line", "powershell", "pwsh", "shell"])
+        self.assertEqual(info["installer"]["release_date"], "2024-06-18")
+        self.assertEqual(info["installer_type"], "wix")
+
+    def test_unknown_fields(self):
+        """Unknown labels are snake_cased and typed by their first line"""
+        info = parse_info_output(
+            "Version: 2.0\n"
+            "Minimum OS Version: 10.0.17763.0\n"
+            "Platform:\n"
+            "  Windows.Desktop\n"
+            "Store Details:\n"
+            "  Product Id: 9N0DX20HK701\n"
+            "  Rating: 4.7\n"
+        )
+        self.assertEqual(info["version"], "2.0")
+        self.assertEqual(info["minimum_os_version"], "10.0.17763.0")
+        self.assertEqual(info["platform"], "Windows.Desktop")
+        self.assertEqual(info["store_details"], {"product_id": "9N0DX20HK701", "rating": "4.7"})
+
+    def test_inline_value_continues(self):
+        """A value started on the label line continues on indented lines"""
+        info = parse_info_output("Description: First line\n  second line\nHomepage: https://example.com\n")
+        self.assertEqual(info["description"], "First line\nsecond line")
+        self.assertEqual(info["homepage"], "https://example.com")
+
+    def test_empty_output(self):
+        """No output gives no fields"""
+        self.assertEqual(parse_info_output(""), {})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Test background install jobs against a fake winget"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src import jobs
+from fake_winget import install_fake_winget
+from src.jobs import JobStore
+from src.utils.cache import get_result_cache
+from src.tools.install_tool import start_install
+from src.tools.job_tool import cancel_job, get_job_output, get_job_status
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestInstallJobs(unittest.TestCase):
+    """winget_install returns a job that can be polled and cancelled"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.script = os.path.join(self.tmp.name, 'script.json')
+        self.write_script({})
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_SCRIPT': self.script,
+            }),
+            mock.patch.object(jobs, '_store', None),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def write_script(self, script):
+        with open(self.script, 'w') as f:
+            json.dump(script, f)
+
+    def test_returns_job_at_once(self):
+        """start_install returns before the installer finishes"""
+        self.write_script({"install Git.Git": {"delay": 1}})
+
+        async def run():
+            start = time.perf_counter()
+            started = start_install("Git.Git")
+            elapsed = time.perf_counter() - start
+            finished = await get_job_status(started["job_id"], wait_seconds=10)
+            output = await get_job_output(started["job_id"])
+            return started, elapsed, finished, output
+
+        started, elapsed, finished, output = asyncio.run(run())
+        self.assertTrue(started["success"])
+        self.assertEqual(started["status"], "queued")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(finished["status"], "succeeded")
+        self.assertEqual(finished["return_code"], 0)
+        self.assertIn("Successfully installed", output["output"])
+
+    def test_incremental_output(self):
+        """Output can be read in pieces while the job runs"""
+        async def run():
+            with mock.patch.dict(os.environ, {'FAKE_WINGET_LINE_DELAY': '0.2'}):
+                job_id = start_install("Git.Git")["job_id"]
+                pieces = []
+                offset = 0
+                while True:
+                    chunk = await get_job_output(job_id, offset)
+                    pieces.append(chunk)
+                    offset = chunk["next_offset"]
+                    if chunk["done"]:
+                        break
+                    await asyncio.sleep(0.1)
+            return pieces
+
+        pieces = asyncio.run(run())
+        with open(os.path.join(FIXTURES, 'install.txt'), encoding='utf-8') as f:
+            self.assertEqual(''.join(p["output"] for p in pieces), f.read())
+        self.assertTrue(any(p["output"] and not p["done"] for p in pieces))
+
+    @unittest.skipIf(os.name == 'nt', "checks POSIX process groups")
+    def test_cancel_kills_process_tree(self):
+        """Cancelling a running job kills winget and the installer it started"""
+        pid_file = os.path.join(self.tmp.name, 'child.pid')
+        self.write_script({"install Git.Git": {"delay": 30, "child_pid_file": pid_file}})
+
+        async def run():
+            job_id = start_install("Git.Git")["job_id"]
+            for _ in range(100):
+                if os.path.exists(pid_file) and os.path.getsize(pid_file):
+                    break
+                await asyncio.sleep(0.05)
+            return await cancel_job(job_id)
+
+        start = time.perf_counter()
+        result = asyncio.run(run())
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual(result["status"], "cancelled")
+
+        with open(pid_file) as f:
+            child = int(f.read())
+        for _ in range(50):
+            try:
+                os.kill(child, 0)
+            except ProcessLookupError:
+                break
+            time.sleep(0.05)
+        else:
+            self.fail("installer child process survived cancellation")
+
+    def test_timeout(self):
+        """A job running past the install timeout is killed"""
+        self.write_script({"install Git.Git": {"delay": 30}})
+
+        async def run():
+            job_id = start_install("Git.Git", timeout=0.5)["job_id"]
+            return await get_job_status(job_id, wait_seconds=10)
+
+        result = asyncio.run(run())
+        self.assertEqual(result["status"], "timed_out")
+
+    def test_success_invalidates_listings(self):
+        """A finished install drops cached list results"""
+        async def run():
+            cache = get_result_cache()
+            cache.put(("list", "total"), {"success": True, "total_installed": 3}, 60)
+            job_id = start_install("Git.Git")["job_id"]
+            await get_job_status(job_id, wait_seconds=10)
+            return cache.peek(("list", "total"))
+
+        self.assertIsNone(asyncio.run(run()))
+
+    def test_unknown_job(self):
+        """Unknown job IDs are reported as errors"""
+        result = asyncio.run(get_job_status("nope"))
+        self.assertFalse(result["success"])
+        self.assertIn("Unknown job", result["error"])
+
+
+class TestJobStore(unittest.TestCase):
+    """Finished jobs are evicted oldest first, active ones never"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.env = mock.patch.dict(os.environ, {
+            'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+        })
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_bounded_store(self):
+        async def run():
+            store = JobStore(max_jobs=2)
+            first = store.submit("install", ['install', 'A.A'])
+            second = store.submit("install", ['install', 'B.B'])
+            third = store.submit("install", ['install', 'C.C'])
+            # All three are active, so none can be evicted yet
+            self.assertEqual(len(store.jobs()), 3)
+            for job in (first, second, third):
+                await store.wait(job.id)
+            return store, first
+
+        store, first = asyncio.run(run())
+        self.assertEqual(len(store.jobs()), 2)
+        self.assertIsNone(store.get(first.id))
+        self.assertEqual(store.evictions, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""Test process deadlines, output caps and admission control"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.jobs import CANCELLED, FAILED, JobStore
+from src.tools.info_tool import get_package_info
+from src.tools.search_tool import search_packages
+from src.utils import scheduler as scheduler_module
+from src.utils import process as process_module
+from src.utils.cache import get_result_cache
+from src.utils.process import WingetTimeout, run_winget, stream_winget
+from src.utils.scheduler import ProcessScheduler
+from src.winget_manager import FakeExecutor, SubprocessExecutor, set_executor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def recording(name):
+    with open(os.path.join(FIXTURES, f'{name}.txt'), encoding='utf-8') as f:
+        return f.read()
+
+
+def process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except OSError:
+        return False
+    return True
+
+
+class TestLimits(unittest.TestCase):
+    """Hanging and flooding fake winget executables are contained"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.script = os.path.join(self.tmp.name, 'script.json')
+        self.write_script({})
+        self.previous = set_executor(SubprocessExecutor())
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_SCRIPT': self.script,
+            }),
+            mock.patch.dict(Config.OPERATION_TIMEOUTS, {"show": 1.0, "search": 1.0}),
+            mock.patch.object(Config, 'MAX_OUTPUT_BYTES', 64 * 1024),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def write_script(self, script):
+        with open(self.script, 'w') as f:
+            json.dump(script, f)
+
+    async def stream(self, args):
+        lines = 0
+        async with stream_winget(args) as stream:
+            async for _ in stream:
+                lines += 1
+            completed = await stream.wait()
+        return lines, completed
+
+    def test_hang_kills_process_tree(self):
+        """A hung show is killed with the child it started at its deadline"""
+        child_pid_file = os.path.join(self.tmp.name, 'child.pid')
+        self.write_script({"show Hung.App": {"delay": 30, "child_pid_file": child_pid_file}})
+
+        async def run():
+            start = time.perf_counter()
+            with self.assertRaises(WingetTimeout) as caught:
+                await run_winget(['show', 'Hung.App'])
+            return time.perf_counter() - start, caught.exception
+
+        elapsed, error = asyncio.run(run())
+        self.assertLess(elapsed, 5)
+        self.assertEqual(str(error), "winget show timed out after 1s")
+        with open(child_pid_file) as f:
+            child = int(f.read())
+        deadline = time.monotonic() + 5
+        while process_alive(child) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(process_alive(child))
+
+    def test_hang_reported_by_tool(self):
+        self.write_script({"show Hung.App": {"delay": 30}})
+        result = asyncio.run(get_package_info('Hung.App'))
+        self.assertFalse(result["success"])
+        self.assertIn("timed out after 1s", result["error"])
+
+    def test_flood_truncated(self):
+        """Output past the cap is dropped and marked; the exit code survives"""
+        self.write_script({"show Big.App": {"flood": 1024 * 1024}})
+        result = asyncio.run(run_winget(['show', 'Big.App']))
+        self.assertEqual(result.returncode, 0)
+        self.assertTrue(result.truncated)
+        self.assertLess(len(result.stdout), 65 * 1024)
+        self.assertRegex(result.stdout, r"\n\[winget output truncated: \d+ bytes dropped\]\n$")
+
+    @unittest.skipIf(os.name == 'nt', "escaping the process group needs POSIX sessions")
+    def test_job_cancel_with_escaped_child(self):
+        """A job whose installer escaped the kill and holds the pipes still cancels"""
+        child_pid_file = os.path.join(self.tmp.name, 'child.pid')
+        self.write_script({"install Stuck.App": {"delay": 30, "escape": True,
+                                                 "child_pid_file": child_pid_file}})
+
+        async def run():
+            store = JobStore()
+            job = store.submit("install", ['install', '--id', 'Stuck.App'], {})
+            while not os.path.exists(child_pid_file):
+                await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            try:
+                await asyncio.wait_for(store.cancel(job.id), 10)
+                return job, time.perf_counter() - start
+            finally:
+                with open(child_pid_file) as f:
+                    os.kill(int(f.read()), 9)
+                # The pipes close with the escaped child; read them to EOF
+                # so asyncio can close the transport before the loop ends
+                await asyncio.wait_for(asyncio.gather(job.process.stdout.read(),
+                                                      job.process.stderr.read()), 5)
+
+        with mock.patch.object(process_module, 'KILL_GRACE', 0.5):
+            job, elapsed = asyncio.run(run())
+        self.assertEqual(job.status, CANCELLED)
+        self.assertLess(elapsed, 5)
+
+    @unittest.skipIf(os.name == 'nt', "escaping the process group needs POSIX sessions")
+    def test_stopped_stream_with_escaped_child(self):
+        """A stream stopped at the output cap returns while an escaped child holds stdout"""
+        child_pid_file = os.path.join(self.tmp.name, 'child.pid')
+        self.write_script({"search leak": {"flood": 1024 * 1024, "escape": True,
+                                           "child_pid_file": child_pid_file}})
+
+        async def run():
+            start = time.perf_counter()
+            try:
+                async with stream_winget(['search', 'leak'], timeout=30) as stream:
+                    async for _ in stream:
+                        pass
+                    completed = await asyncio.wait_for(stream.wait(), 10)
+                return stream, completed, time.perf_counter() - start
+            finally:
+                with open(child_pid_file) as f:
+                    os.kill(int(f.read()), 9)
+                await asyncio.wait_for(asyncio.gather(stream.process.stdout.read(),
+                                                      stream.process.stderr.read()), 5)
+
+        with mock.patch.object(process_module, 'KILL_GRACE', 0.5):
+            stream, completed, elapsed = asyncio.run(run())
+        self.assertTrue(stream.stopped)
+        self.assertTrue(completed.truncated)
+        self.assertLess(elapsed, 5)
+
+    def test_job_stderr_capped(self):
+        """A job's stderr is held to MAX_STDERR_BYTES"""
+        self.write_script({"install Noisy.App": {"stderr_flood": 256 * 1024, "exit": 1}})
+
+        async def run():
+            store = JobStore()
+            job = store.submit("install", ['install', '--id', 'Noisy.App'], {})
+            return await store.wait(job.id, 10)
+
+        with mock.patch.object(Config, 'MAX_STDERR_BYTES', 1024):
+            job = asyncio.run(run())
+        self.assertEqual(job.status, FAILED)
+        self.assertLess(len(job.stderr), 2048)
+        self.assertRegex(job.stderr, r"\[winget output truncated: 261120 bytes dropped\]\n$")
+
+    def test_endless_flood_times_out(self):
+        self.write_script({"show Big.App": {"flood": -1}})
+        with self.assertRaises(WingetTimeout):
+            asyncio.run(run_winget(['show', 'Big.App']))
+
+    def test_stream_deadline(self):
+        """A search that keeps streaming past its deadline fails the tool call"""
+        self.write_script({"search slow": {"delay": 30}})
+        result = asyncio.run(search_packages('slow'))
+        self.assertFalse(result["success"])
+        self.assertIn("winget search timed out after 1s", result["error"])
+
+    def test_stream_long_lines_skipped(self):
+        """Lines longer than the reader's limit are dropped, later lines still parse"""
+        self.write_script({"search long": {"flood": 300 * 1024, "line": 100 * 1024}})
+        lines, completed = asyncio.run(self.stream(['search', 'long']))
+        self.assertEqual(lines, len(recording('search').splitlines()))
+        self.assertTrue(completed.truncated)
+        self.assertEqual(completed.returncode, 0)
+
+    def test_stream_stopped_at_cap(self):
+        """An endless stream is stopped once the cap has been read"""
+        self.write_script({"search big": {"flood": -1}})
+        start = time.perf_counter()
+        lines, completed = asyncio.run(self.stream(['search', 'big']))
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertEqual(lines, 64 * 1024 // 80)
+        self.assertTrue(completed.truncated)
+
+
+class TestAdmission(unittest.TestCase):
+    """A saturated lane turns new work away at once"""
+
+    def setUp(self):
+        self.previous = set_executor(FakeExecutor(FIXTURES, replies={"show Hung.App": {"hang": True}}))
+        self.patches = [
+            mock.patch.object(scheduler_module, '_scheduler',
+                              ProcessScheduler(max_concurrent=1, max_queued=1)),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+
+    def test_rejects_quickly(self):
+        async def run():
+            running = asyncio.ensure_future(run_winget(['show', 'Hung.App'], timeout=30))
+            queued = asyncio.ensure_future(run_winget(['show', 'Git.Git']))
+            await asyncio.sleep(0.05)
+            start = time.perf_counter()
+            result = await get_package_info('Other.App')
+            elapsed = time.perf_counter() - start
+            running.cancel()
+            await asyncio.gather(running, return_exceptions=True)
+            return result, elapsed, await queued
+
+        result, elapsed, queued = asyncio.run(run())
+        self.assertLess(elapsed, 0.1)
+        self.assertFalse(result["success"])
+        self.assertIn("winget is busy", result["error"])
+        self.assertEqual(queued.returncode, 0)
+        self.assertEqual(scheduler_module.get_scheduler().stats()["rejected"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
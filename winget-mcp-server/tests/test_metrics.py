@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Test the per-tool, per-phase latency metrics"""
+
+import asyncio
+import json
+import os
+import sys
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import Config
+from src.server import mcp
+from src.utils import metrics as metrics_module
+from src.utils.cache import get_result_cache
+from src.utils.metrics import BACKGROUND, Histogram, Metrics, get_metrics
+from src.winget_manager import FakeExecutor, set_executor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestHistogram(unittest.TestCase):
+    """Bucketed quantiles stay close to the observations"""
+
+    def test_quantiles(self):
+        histogram = Histogram()
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+        summary = histogram.as_dict()
+        self.assertEqual(summary["count"], 100)
+        self.assertAlmostEqual(summary["mean_ms"], 50.5)
+        self.assertAlmostEqual(summary["p50_ms"], 50, delta=5)
+        self.assertAlmostEqual(summary["p95_ms"], 95, delta=10)
+        self.assertLessEqual(summary["p99_ms"], summary["max_ms"])
+        self.assertEqual(summary["max_ms"], 100)
+
+    def test_empty(self):
+        self.assertEqual(Histogram().quantile(0.5), 0.0)
+
+
+class TestMetrics(unittest.TestCase):
+    """Phases are attributed to the running tool call"""
+
+    def test_phase_attribution(self):
+        """Tasks started inside a call report under its tool"""
+        metrics = Metrics()
+
+        async def background():
+            with metrics.phase("parse"):
+                await asyncio.sleep(0)
+
+        async def run():
+            with metrics.call("winget_search") as call:
+                with metrics.phase("spawn"):
+                    pass
+                await asyncio.create_task(background())
+                call.failed = True
+            with metrics.phase("spawn"):
+                pass
+
+        asyncio.run(run())
+        tools = metrics.snapshot()["tools"]
+        self.assertEqual(set(tools["winget_search"]["phases"]), {"spawn", "parse", "total"})
+        self.assertEqual(tools["winget_search"]["error_rate"], 1.0)
+        self.assertEqual(tools[BACKGROUND]["phases"]["spawn"]["count"], 1)
+
+    def test_disabled(self):
+        metrics = Metrics(enabled=False)
+        with metrics.call("winget_list"):
+            with metrics.phase("parse"):
+                pass
+        self.assertEqual(metrics.snapshot()["tools"], {})
+
+    def test_prometheus(self):
+        metrics = Metrics()
+        metrics.observe("run", 0.2, "winget_info")
+        metrics.record_call("winget_info", 0.3, True)
+        text = metrics.prometheus({"cache": {"hits": 3, "backend": "memory"}})
+        self.assertIn('winget_mcp_phase_seconds_bucket{tool="winget_info",phase="run",le="0.25"} 1', text)
+        self.assertIn('winget_mcp_phase_seconds_bucket{tool="winget_info",phase="run",le="+Inf"} 1', text)
+        self.assertIn('winget_mcp_phase_seconds_count{tool="winget_info",phase="total"} 1', text)
+        self.assertIn('winget_mcp_errors_total{tool="winget_info"} 1', text)
+        self.assertIn('winget_mcp_cache_hits 3', text)
+        self.assertNotIn('backend', text)
+
+    def test_otel_export(self):
+        """Observations go to an OpenTelemetry histogram when the API is present"""
+        meter = mock.Mock()
+        otel = mock.Mock(get_meter=mock.Mock(return_value=meter))
+        with mock.patch.object(metrics_module, 'otel_metrics', otel):
+            metrics = Metrics(otel=True)
+        metrics.observe("spawn", 0.01, "winget_list")
+        meter.create_histogram.return_value.record.assert_called_once_with(
+            0.01, {"tool": "winget_list", "phase": "spawn"})
+        self.assertTrue(metrics.snapshot()["otel"])
+
+
+class TestMetricsTool(unittest.TestCase):
+    """winget_metrics reports the phases of calls made through the server"""
+
+    def setUp(self):
+        self.previous = set_executor(FakeExecutor(FIXTURES, replies={"show Missing.App": {"exit": 1}}))
+        self.patch = mock.patch.object(Config, 'CATALOG_PATH', '')
+        self.patch.start()
+        get_result_cache().invalidate()
+        get_metrics().reset()
+
+    def tearDown(self):
+        self.patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+        get_metrics().reset()
+
+    def test_tool_phases(self):
+        async def run():
+            await mcp.call_tool("winget_search", {"query": "python", "count": 3})
+            await mcp.call_tool("winget_info", {"package_id": "Git.Git"})
+            await mcp.call_tool("winget_info", {"package_id": "Missing.App"})
+            content = await mcp.call_tool("winget_metrics", {})
+            return json.loads(content[0].text)
+
+        result = asyncio.run(run())
+        self.assertTrue(result["success"])
+        search = result["tools"]["winget_search"]
+        self.assertLessEqual({"queue", "spawn", "first_output", "run", "parse", "encode", "total"},
+                             set(search["phases"]))
+        info = result["tools"]["winget_info"]
+        self.assertEqual((info["calls"], info["errors"], info["error_rate"]), (2, 1, 0.5))
+        self.assertLessEqual({"spawn", "run", "decode", "parse", "total"}, set(info["phases"]))
+        self.assertEqual(result["executor"]["spawns"], 3)
+        self.assertIn("hit_ratio", result["cache"])
+
+    def test_prometheus_resource(self):
+        async def run():
+            await mcp.call_tool("winget_info", {"package_id": "Git.Git"})
+            contents = await mcp.read_resource("winget://metrics")
+            return contents[0]
+
+        contents = asyncio.run(run())
+        self.assertEqual(contents.mime_type, "text/plain")
+        self.assertIn('winget_mcp_calls_total{tool="winget_info"} 1', contents.content)
+        self.assertIn('winget_mcp_executor_spawns 1', contents.content)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""Test cursor pagination of winget_list and winget_search"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.utils.pagination import CursorError, decode_cursor, encode_cursor
+from src.tools.list_tool import list_installed, parse_list_output
+from src.tools.search_tool import parse_search_output, search_packages
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture_packages(name, parse):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return parse(f.read())
+
+
+class TestPagination(unittest.TestCase):
+    """Later pages come from the cached result set, not from winget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_LOG': self.log,
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def calls(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    async def pages(self, first, follow):
+        """Collect every page, starting with first() and following next_cursor"""
+        page = await first()
+        pages = [page]
+        while page.get("next_cursor"):
+            page = await follow(page["next_cursor"])
+            pages.append(page)
+        return pages
+
+    def test_list_pages(self):
+        """Pages of a listing cover every package once, from one winget run"""
+        pages = asyncio.run(self.pages(
+            lambda: list_installed(4),
+            lambda cursor: list_installed(4, cursor=cursor),
+        ))
+        packages = [package for page in pages for package in page["packages"]]
+        self.assertEqual(packages, fixture_packages('list.txt', parse_list_output))
+        self.assertEqual([page["count_returned"] for page in pages[:2]], [4, 4])
+        self.assertEqual(pages[1]["offset"], 4)
+        self.assertEqual(pages[-1]["total_installed"], len(packages))
+        self.assertEqual(len(self.calls()), 1)
+
+    def test_search_pages(self):
+        """Pages of a search cover every match once, from one winget run"""
+        pages = asyncio.run(self.pages(
+            lambda: search_packages("python", 3),
+            lambda cursor: search_packages("python", 3, cursor=cursor),
+        ))
+        packages = [package for page in pages for package in page["packages"]]
+        self.assertEqual(packages, fixture_packages('search.txt', parse_search_output))
+        self.assertEqual(pages[1]["query"], "python")
+        self.assertEqual(len(self.calls()), 1)
+        self.assertIn(str(Config.SEARCH_RESULT_LIMIT), self.calls()[0].split())
+
+    def test_search_exact_page_has_no_cursor(self):
+        """A search with exactly count matches issues no cursor to an empty page"""
+        expected = fixture_packages('search.txt', parse_search_output)
+        page = asyncio.run(search_packages("python", len(expected)))
+        self.assertEqual(page["packages"], expected)
+        self.assertIsNone(page["next_cursor"])
+
+    def test_cursor_waits_for_drain(self):
+        """A cursor issued before the output is fully read waits for the rest"""
+        async def run():
+            first = await list_installed(2)
+            second = await list_installed(2, cursor=first["next_cursor"])
+            return first, second
+
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_LINE_DELAY': '0.05'}):
+            first, second = asyncio.run(run())
+        self.assertIsNone(first["total_installed"])
+        self.assertEqual(second["offset"], 2)
+        self.assertEqual(second["count_returned"], 2)
+        self.assertEqual(second["total_installed"], 11)
+
+    def test_invalidated_cursor_expires(self):
+        """Invalidating the namespace, as installs do, expires its cursors"""
+        async def run():
+            first = await list_installed(4, include_total=True)
+            get_result_cache().invalidate("list")
+            stale = await list_installed(4, cursor=first["next_cursor"])
+            again = await list_installed(4)
+            return first, stale, again
+
+        first, stale, again = asyncio.run(run())
+        self.assertFalse(stale["success"])
+        self.assertTrue(stale["cursor_expired"])
+        self.assertIn("expired", stale["error"])
+        self.assertNotEqual(again["next_cursor"], first["next_cursor"])
+
+    def test_invalid_cursor(self):
+        """Malformed cursors and cursors of another tool are rejected"""
+        async def run():
+            garbage = await list_installed(4, cursor="not a cursor")
+            foreign = await list_installed(4, cursor=encode_cursor("search", "abc", 3))
+            return garbage, foreign
+
+        garbage, foreign = asyncio.run(run())
+        self.assertFalse(garbage["success"])
+        self.assertFalse(garbage["cursor_expired"])
+        self.assertFalse(foreign["success"])
+        self.assertEqual(self.calls(), [])
+
+    def test_cursor_round_trip(self):
+        """Cursors are opaque strings that decode to the set and offset"""
+        cursor = encode_cursor("list", "0123abcd", 40)
+        self.assertNotIn(":", cursor)
+        self.assertEqual(decode_cursor("list", cursor), ("0123abcd", 40))
+        with self.assertRaises(CursorError):
+            decode_cursor("search", cursor)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Test the winget process scheduler"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.scheduler import ProcessScheduler, SchedulerBusy
+
+
+def make_scheduler(max_concurrent=4):
+    return ProcessScheduler(
+        max_concurrent=max_concurrent,
+        lane_limits={"install": 1, "list": 2},
+        lane_aliases={"upgrade": "install", "uninstall": "install"},
+        priorities={"install": 10},
+    )
+
+
+class TestProcessScheduler(unittest.TestCase):
+    """Test limits, lanes, priorities and metrics"""
+
+    def test_global_limit(self):
+        """No more than max_concurrent slots are held at once"""
+        scheduler = make_scheduler(max_concurrent=3)
+        peak = 0
+        running = 0
+
+        async def job():
+            nonlocal peak, running
+            async with scheduler.slot("search"):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        async def run():
+            await asyncio.gather(*(job() for _ in range(10)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 3)
+        self.assertEqual(scheduler.stats()["running"], 0)
+        self.assertEqual(scheduler.stats()["lanes"]["search"]["admitted"], 10)
+
+    def test_installs_are_serialized(self):
+        """install, upgrade and uninstall share one serialized lane"""
+        scheduler = make_scheduler()
+        peak = 0
+        running = 0
+
+        async def job(operation):
+            nonlocal peak, running
+            async with scheduler.slot(operation):
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        async def run():
+            await asyncio.gather(job("install"), job("upgrade"), job("uninstall"), job("install"))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 1)
+        stats = scheduler.stats()["lanes"]["install"]
+        self.assertEqual(stats["admitted"], 4)
+        self.assertEqual(stats["max_queued"], 3)
+        self.assertGreater(stats["wait_max_ms"], 0)
+
+    def test_reads_not_blocked_by_queued_installs(self):
+        """Reads run while installs wait for the install lane"""
+        scheduler = make_scheduler()
+        order = []
+
+        async def install(name):
+            async with scheduler.slot("install"):
+                order.append(name)
+                await asyncio.sleep(0.05)
+
+        async def read(name):
+            async with scheduler.slot("search"):
+                order.append(name)
+
+        async def run():
+            first = asyncio.create_task(install("install-1"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(install("install-2"))
+            await asyncio.sleep(0)
+            await read("read")
+            await asyncio.gather(first, second)
+
+        asyncio.run(run())
+        self.assertEqual(order, ["install-1", "read", "install-2"])
+
+    def test_priority_when_saturated(self):
+        """Queued reads are admitted ahead of queued installs"""
+        scheduler = make_scheduler(max_concurrent=1)
+        order = []
+
+        async def job(operation, name, hold=0.0):
+            async with scheduler.slot(operation):
+                order.append(name)
+                await asyncio.sleep(hold)
+
+        async def run():
+            first = asyncio.create_task(job("search", "search-1", hold=0.02))
+            await asyncio.sleep(0)
+            queued = [asyncio.create_task(job("install", "install")),
+                      asyncio.create_task(job("show", "show"))]
+            await asyncio.gather(first, *queued)
+
+        asyncio.run(run())
+        self.assertEqual(order, ["search-1", "show", "install"])
+
+    def test_cancelled_waiter_releases_queue(self):
+        """A cancelled waiter leaves the queue without leaking a slot"""
+        scheduler = make_scheduler(max_concurrent=1)
+
+        async def hold():
+            async with scheduler.slot("list"):
+                await asyncio.sleep(0.02)
+
+        async def wait():
+            async with scheduler.slot("list"):
+                pass
+
+        async def run():
+            holder = asyncio.create_task(hold())
+            await asyncio.sleep(0)
+            waiter = asyncio.create_task(wait())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.gather(holder, waiter, return_exceptions=True)
+            await wait()
+
+        asyncio.run(run())
+        stats = scheduler.stats()
+        self.assertEqual(stats["running"], 0)
+        self.assertEqual(stats["queued"], 0)
+        self.assertEqual(stats["lanes"]["list"]["queued"], 0)
+
+    def test_rejects_when_queue_full(self):
+        """Past max_queued waiters a lane fails at once; other lanes still queue"""
+        scheduler = ProcessScheduler(max_concurrent=1, max_queued=2, queue_limits={"install": 5})
+
+        async def run():
+            gate = asyncio.Event()
+
+            async def hold(operation):
+                async with scheduler.slot(operation):
+                    await gate.wait()
+
+            tasks = [asyncio.ensure_future(hold("search")) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            with self.assertRaises(SchedulerBusy) as caught:
+                async with scheduler.slot("search"):
+                    pass
+            tasks += [asyncio.ensure_future(hold("install")) for _ in range(5)]
+            await asyncio.sleep(0.01)
+            gate.set()
+            await asyncio.gather(*tasks)
+            return caught.exception
+
+        error = asyncio.run(run())
+        self.assertIn("2 search requests are already queued", str(error))
+        stats = scheduler.stats()
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["lanes"]["search"]["rejected"], 1)
+        self.assertEqual(stats["lanes"]["install"]["admitted"], 5)
+
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -6,14 +6,36 @@ import sys
 import os
 import asyncio
 import json
+import subprocess
+import tempfile
+from unittest import mock
 
 # Add src to path for imports
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from server import mcp
+from src import catalog
+from src.config import Config
+from src.server import IMPLEMENTATIONS, TOOLS, _call, _implementation, _resolved, mcp
 
 class TestFastMCPServer(unittest.TestCase):
     """Test the FastMCP server implementation"""
+
+    def setUp(self):
+        # Keep the catalog index out of the home directory
+        self.tmp = tempfile.TemporaryDirectory()
+        self.patches = [
+            mock.patch.object(Config, 'CATALOG_PATH', os.path.join(self.tmp.name, 'catalog.db')),
+            mock.patch.object(catalog, '_catalog', None),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        if catalog._catalog is not None:
+            catalog._catalog.close()
+        for patch in reversed(self.patches):
+            patch.stop()
+        self.tmp.cleanup()
     
     def test_server_creation(self):
         """Test that FastMCP server instance exists"""
@@ -27,15 +49,19 @@ class TestFastMCPServer(unittest.TestCase):
         self.assertTrue(hasattr(mcp, 'run'))
     
     async def async_test_tools_registration(self):
-        """Test that all 4 WinGet tools are registered"""
+        """Test that all 13 WinGet tools are registered"""
         tools = await mcp.list_tools()
         
-        # Should have exactly 4 tools
-        self.assertEqual(len(tools), 4)
+        # Should have exactly 13 tools
+        self.assertEqual(len(tools), 13)
         
         # Check tool names
         tool_names = [tool.name for tool in tools]
-        expected_tools = ['winget_search', 'winget_list', 'winget_info', 'winget_install']
+        expected_tools = [
+            'winget_search', 'winget_list', 'winget_info', 'winget_info_batch', 'winget_install',
+            'winget_list_changes', 'winget_install_batch', 'winget_upgrades', 'winget_upgrade_batch',
+            'winget_job_status', 'winget_job_output', 'winget_job_cancel', 'winget_metrics',
+        ]
         
         for expected_tool in expected_tools:
             self.assertIn(expected_tool, tool_names, f"Tool {expected_tool} not found")
@@ -89,6 +115,50 @@ class TestFastMCPServer(unittest.TestCase):
         finally:
             loop.close()
 
+class TestToolTable(unittest.TestCase):
+    """Test the tool registration table and lazy implementation imports"""
+    
+    def test_every_tool_has_an_implementation(self):
+        """Each registered handler maps to a resolvable function"""
+        for handler in TOOLS:
+            self.assertIn(handler.__name__, IMPLEMENTATIONS)
+        for name in IMPLEMENTATIONS:
+            self.assertTrue(callable(_implementation(name)), name)
+    
+    def test_import_does_not_load_tool_modules(self):
+        """Importing the server leaves tool modules for the first call"""
+        root = os.path.join(os.path.dirname(__file__), '..')
+        probe = ("import sys; import src.server; "
+                 "print(sorted(m for m in sys.modules if m.startswith('src.tools.') "
+                 "or m in ('src.catalog', 'sqlite3')))")
+        output = subprocess.run(
+            [sys.executable, '-c', probe], cwd=root, capture_output=True, text=True, check=True
+        ).stdout
+        self.assertEqual(output.strip(), '[]')
+
+    def test_console_script_import(self):
+        """src.server, as the winget-mcp-server script imports it, can run a tool"""
+        root = os.path.join(os.path.dirname(__file__), '..')
+        probe = ("import asyncio, json, sys; path = list(sys.path); import src.server; "
+                 "print(json.loads(asyncio.run(src.server.winget_search('python', 2)))['count_returned'], "
+                 "sys.path == path, 'config' in sys.modules)")
+        env = dict(os.environ, WINGET_MCP_EXECUTOR='fake', WINGET_MCP_CATALOG='',
+                   WINGET_MCP_FAKE_FIXTURES=os.path.join(os.path.dirname(__file__), 'fixtures'))
+        env.pop('PYTHONPATH', None)
+        completed = subprocess.run(
+            [sys.executable, '-c', probe], cwd=root, env=env, capture_output=True, text=True
+        )
+        self.assertEqual(completed.returncode, 0, completed.stderr)
+        # Imported without touching sys.path or adding top-level modules
+        self.assertEqual(completed.stdout.strip(), '2 True False')
+    
+    def test_call_reports_import_errors(self):
+        """A tool whose modules cannot be imported returns an error instead of raising"""
+        with mock.patch.dict(IMPLEMENTATIONS, {"metrics": "no_such_module:get_metrics"}), \
+                mock.patch.dict(_resolved, clear=True):
+            result = json.loads(asyncio.run(_call("winget_search", "Search", "python")))
+        self.assertIn("Search failed", result["error"])
+
 class TestWinGetAvailability(unittest.TestCase):
     """Test WinGet availability and functionality"""
     
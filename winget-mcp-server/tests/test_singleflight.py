@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test single-flight coalescing of concurrent winget calls"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.utils.singleflight import SingleFlight
+from src.tools.list_tool import list_installed
+from src.tools.search_tool import search_packages
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test the SingleFlight primitive"""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Callers with the same key get the result of one call"""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": 42}
+
+        async def run():
+            return await asyncio.gather(*(group.do("k", work) for _ in range(10)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(group.shared, 9)
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_exception_reaches_every_waiter(self):
+        """A failing call raises in all waiters and releases the key"""
+        group = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        async def run():
+            return await asyncio.gather(*(group.do("k", work) for _ in range(3)),
+                                        return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(group.in_flight(), 0)
+
+    def test_different_keys_run_separately(self):
+        """Different keys are not coalesced"""
+        group = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return len(calls)
+
+        async def run():
+            await asyncio.gather(group.do("a", work), group.do("b", work))
+
+        asyncio.run(run())
+        self.assertEqual(len(calls), 2)
+
+
+class TestToolCoalescing(unittest.TestCase):
+    """Concurrent tool calls spawn one fake winget process"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.env = mock.patch.dict(os.environ, {
+            'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+            'FAKE_WINGET_LOG': self.log,
+            'FAKE_WINGET_DELAY': '0.3',
+        })
+        self.env.start()
+        self.no_catalog = mock.patch.object(Config, 'CATALOG_PATH', '')
+        self.no_catalog.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        self.no_catalog.stop()
+        self.env.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def spawns(self):
+        with open(self.log) as f:
+            return [line.split() for line in f if line.strip()]
+
+    def test_concurrent_list_spawns_once(self):
+        """N concurrent winget_list calls share one process"""
+        async def run():
+            return await asyncio.gather(*(list_installed(5) for _ in range(8)))
+
+        results = asyncio.run(run())
+        self.assertEqual(len(self.spawns()), 1)
+        self.assertTrue(all(r["success"] for r in results))
+        self.assertTrue(all(r["packages"] == results[0]["packages"] for r in results))
+        self.assertEqual(len(results[0]["packages"]), 5)
+
+    def test_concurrent_search_spawns_once(self):
+        """Identical concurrent searches share one process, others do not"""
+        async def run():
+            same = [search_packages("python", 5) for _ in range(6)]
+            return await asyncio.gather(*same, search_packages("git", 5))
+
+        results = asyncio.run(run())
+        spawns = self.spawns()
+        self.assertEqual(len(spawns), 2)
+        self.assertEqual(sorted(s[1] for s in spawns), ["git", "python"])
+        self.assertTrue(all(r["success"] for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Test the installed-packages snapshot and the changes tool"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src import snapshot
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.snapshot import InstalledSnapshot
+from src.tools.changes_tool import list_changes
+from src.utils.cache import get_result_cache
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def pkg(package_id, version, available=None):
+    return {"name": package_id.split('.')[-1], "id": package_id, "version": version,
+            "available": available, "source": "winget"}
+
+
+class TestInstalledSnapshot(unittest.TestCase):
+    """Test diffing, versioning and lookups without winget"""
+
+    def setUp(self):
+        self.snapshot = InstalledSnapshot(history=3)
+        self.snapshot.apply([pkg("Git.Git", "2.45.0"), pkg("Mozilla.Firefox", "127.0")])
+        self.token = self.snapshot.token
+
+    def test_lookup(self):
+        """Lookups are by case-insensitive id"""
+        self.assertEqual(self.snapshot.installed_version("git.git"), "2.45.0")
+        self.assertIsNone(self.snapshot.get("Python.Python.3.12"))
+
+    def test_delta(self):
+        """Added, removed and upgraded packages are reported since a token"""
+        self.snapshot.apply([pkg("Git.Git", "2.46.0"), pkg("Python.Python.3.12", "3.12.4")])
+        delta = self.snapshot.changes_since(self.token)
+        self.assertFalse(delta["full"])
+        self.assertEqual([p["id"] for p in delta["added"]], ["Python.Python.3.12"])
+        self.assertEqual([p["id"] for p in delta["removed"]], ["Mozilla.Firefox"])
+        self.assertEqual(delta["upgraded"], [{
+            "id": "Git.Git", "name": "Git", "from_version": "2.45.0", "to_version": "2.46.0",
+        }])
+        self.assertEqual(self.snapshot.changes_since(delta["version"])["added"], [])
+
+    def test_unchanged_refresh_keeps_version(self):
+        """A refresh that changes nothing does not bump the version"""
+        self.snapshot.apply([pkg("Git.Git", "2.45.0"), pkg("Mozilla.Firefox", "127.0")])
+        self.assertEqual(self.snapshot.token, self.token)
+
+    def test_changes_compose_across_versions(self):
+        """Intermediate states collapse into one net delta"""
+        self.snapshot.apply([pkg("Git.Git", "2.46.0"), pkg("Mozilla.Firefox", "127.0"), pkg("A.B", "1")])
+        self.snapshot.apply([pkg("Git.Git", "2.47.0"), pkg("Mozilla.Firefox", "127.0")])
+        delta = self.snapshot.changes_since(self.token)
+        self.assertEqual(delta["added"], [])
+        self.assertEqual(delta["upgraded"][0]["from_version"], "2.45.0")
+        self.assertEqual(delta["upgraded"][0]["to_version"], "2.47.0")
+
+    def test_other_field_changes(self):
+        """A new available version is a change, not an upgrade"""
+        self.snapshot.apply([pkg("Git.Git", "2.45.0", "2.46.0"), pkg("Mozilla.Firefox", "127.0")])
+        delta = self.snapshot.changes_since(self.token)
+        self.assertEqual(delta["upgraded"], [])
+        self.assertEqual(delta["changed"][0]["available"], "2.46.0")
+
+    def test_unknown_or_expired_token_is_full(self):
+        """Foreign, future and expired tokens get a full listing"""
+        for token in (None, "", "deadbeef.1", self.token.split('.')[0] + ".99"):
+            delta = self.snapshot.changes_since(token)
+            self.assertTrue(delta["full"])
+            self.assertEqual(len(delta["added"]), 2)
+
+        for version in range(4):
+            self.snapshot.apply([pkg("Git.Git", f"3.{version}")])
+        self.assertTrue(self.snapshot.changes_since(self.token)["full"])
+
+
+class TestChangesTool(unittest.TestCase):
+    """winget_list_changes against a fake winget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        shutil.copy(os.path.join(FIXTURES, 'list.txt'), self.tmp.name)
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_FIXTURES': self.tmp.name,
+            }),
+            mock.patch.object(snapshot, '_snapshot', None),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def test_full_then_delta(self):
+        """The first call lists everything, later calls only what changed"""
+        path = os.path.join(self.tmp.name, 'list.txt')
+
+        async def run():
+            first = await list_changes()
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().split('\n')
+            # Drop the Git row and refresh
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(line for line in lines if 'Git.Git' not in line))
+            snapshot.get_snapshot().invalidate()
+            second = await list_changes(first["version"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        self.assertTrue(first["success"])
+        self.assertTrue(first["full"])
+        self.assertEqual(len(first["added"]), 11)
+        self.assertFalse(second["full"])
+        self.assertEqual([p["id"] for p in second["removed"]], ["Git.Git"])
+        self.assertEqual(second["total_installed"], 10)
+        self.assertTrue(snapshot.get_snapshot().get("Microsoft.Edge"))
+
+    def test_failure_before_first_load(self):
+        """A failing winget with no snapshot yet is an error"""
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_EXIT': '1'}):
+            os.remove(os.path.join(self.tmp.name, 'list.txt'))
+            result = asyncio.run(list_changes())
+        self.assertFalse(result["success"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test streaming winget output into the incremental table parser"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.utils.cache import get_result_cache
+from src.utils.process import stream_winget
+from src.tools import list_tool
+from src.tools.list_tool import list_installed, parse_list_output
+from src.tools.search_tool import search_packages
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+class TestStreaming(unittest.TestCase):
+    """Tools read winget stdout line by line from a fake winget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def slow_output(self, seconds_per_line):
+        patch = mock.patch.dict(os.environ, {'FAKE_WINGET_LINE_DELAY': str(seconds_per_line)})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def test_stream_yields_lines(self):
+        """stream_winget yields decoded lines and the exit code"""
+        async def run():
+            async with stream_winget(['list']) as stream:
+                lines = [line async for line in stream]
+                completed = await stream.wait()
+            return lines, completed
+
+        lines, completed = asyncio.run(run())
+        with open(os.path.join(FIXTURES, 'list.txt'), encoding='utf-8') as f:
+            self.assertEqual(''.join(lines), f.read())
+        self.assertEqual(completed.returncode, 0)
+
+    def test_list_matches_buffered_parse(self):
+        """Streaming list parses the same packages as the buffered parser"""
+        with open(os.path.join(FIXTURES, 'list.txt'), encoding='utf-8') as f:
+            expected = parse_list_output(f.read())
+
+        result = asyncio.run(list_installed(5, include_total=True))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["packages"], expected[:5])
+        self.assertEqual(result["total_installed"], len(expected))
+
+    def test_list_returns_before_drain(self):
+        """list returns at count and the background drain caches the total"""
+        self.slow_output(0.2)
+
+        async def run():
+            start = time.perf_counter()
+            first = await list_installed(2)
+            elapsed = time.perf_counter() - start
+            await asyncio.gather(*list_tool._drains)
+            second = await list_installed(3)
+            return first, elapsed, second
+
+        first, elapsed, second = asyncio.run(run())
+        self.assertEqual(first["count_returned"], 2)
+        self.assertIsNone(first["total_installed"])
+        self.assertLess(elapsed, 2.0)
+        self.assertEqual(second["total_installed"], 11)
+
+    def test_list_stop_at_count(self):
+        """With stop-at-count the child is stopped once count rows are parsed"""
+        self.slow_output(0.2)
+        async def run():
+            start = time.perf_counter()
+            result = await list_installed(2)
+            elapsed = time.perf_counter() - start
+            # Let the stopped child be reaped before the loop closes
+            await asyncio.gather(*list_tool._drains)
+            return result, elapsed
+
+        with mock.patch.object(Config, 'LIST_STOP_AT_COUNT', True):
+            result, elapsed = asyncio.run(run())
+
+        self.assertTrue(result["success"])
+        self.assertEqual(result["count_returned"], 2)
+        self.assertIsNone(result["total_installed"])
+        # The fixture has 13 lines, so reading it all would take ~2.6s
+        self.assertLess(elapsed, 2.0)
+
+    def test_search_stops_at_count(self):
+        """search returns as soon as count packages are parsed"""
+        self.slow_output(0.2)
+        start = time.perf_counter()
+        result = asyncio.run(search_packages("python", 2))
+        elapsed = time.perf_counter() - start
+
+        self.assertTrue(result["success"])
+        self.assertEqual([p["id"] for p in result["packages"]],
+                         ["Python.Python.3.12", "Python.Python.3.11"])
+        self.assertLess(elapsed, 1.5)
+
+    def test_failure_exit_code(self):
+        """A non-zero exit that was not caused by stopping is an error"""
+        # A failing winget prints no table, so nothing resolves the call early
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_EXIT': '1', 'FAKE_WINGET_FIXTURES': self.tmp.name}):
+            result = asyncio.run(list_installed(5))
+        self.assertFalse(result["success"])
+        self.assertIn("WinGet list failed", result["error"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""Test the structured `winget export` path and its text fallback"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.config import Config
+from fake_winget import install_fake_winget
+from src.snapshot import InstalledSnapshot
+from src.tools.list_tool import merge_export, parse_list_output, read_installed
+from src.utils import structured
+from src.utils.cache import get_result_cache
+from src.utils.structured import parse_export
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+EXPORT = os.path.join(FIXTURES, 'export.json')
+
+
+def text_packages():
+    with open(os.path.join(FIXTURES, 'list.txt'), encoding='utf-8') as f:
+        return parse_list_output(f.read())
+
+
+class TestParseExport(unittest.TestCase):
+    """Export documents convert to list-shaped packages"""
+
+    def test_recorded_export(self):
+        """The recorded export holds every sourced package of the recorded list"""
+        with open(EXPORT, encoding='utf-8') as f:
+            packages = parse_export(json.load(f))
+        sourced = [p for p in text_packages() if not p["id"].startswith("ARP\\")]
+        self.assertEqual([(p["id"], p["version"]) for p in packages],
+                         [(p["id"], p["version"]) for p in sourced])
+        self.assertEqual(packages[0], {"name": "7zip.7zip", "id": "7zip.7zip", "version": "23.01",
+                                       "available": None, "source": "winget"})
+
+    def test_merge_keeps_table_rows(self):
+        """The export corrects truncated ids and versions without dropping rows or columns"""
+        rows = text_packages()
+        rows[1] = dict(rows[1], id="Git.G\u2026", version="2.45\u2026")
+        with open(EXPORT, encoding='utf-8') as f:
+            exported = parse_export(json.load(f))
+        merged = merge_export(rows, exported)
+        self.assertEqual(merged, text_packages())
+        self.assertEqual(merged[-1]["id"], "ARP\\Machine\\X64\\SomeLocalTool")
+        self.assertEqual(merged[1]["available"], "2.46.0")
+
+    def test_merge_appends_unmatched_exports(self):
+        """An exported package missing from the table is still reported"""
+        extra = {"name": "Some.Extra", "id": "Some.Extra", "version": "1.0", "available": None, "source": "winget"}
+        merged = merge_export(text_packages(), [extra])
+        self.assertEqual(len(merged), len(text_packages()) + 1)
+        self.assertEqual(merged[-1], extra)
+
+    def test_not_an_export(self):
+        """Other JSON is rejected"""
+        with self.assertRaises(ValueError):
+            parse_export({"packages": []})
+        with self.assertRaises(ValueError):
+            parse_export(None)
+
+    def test_malformed_entries_skipped(self):
+        """Sources and packages that are not objects are skipped, not fatal"""
+        document = {"Sources": [
+            "winget",
+            None,
+            {"SourceDetails": "winget", "Packages": {"PackageIdentifier": "Not.A.List"}},
+            {"SourceDetails": {"Name": "winget"},
+             "Packages": [7, None, {"PackageIdentifier": ["Git.Git"]},
+                          {"PackageIdentifier": "Git.Git", "Version": "2.45.1"}]},
+        ]}
+        self.assertEqual(parse_export(document), [
+            {"name": "Git.Git", "id": "Git.Git", "version": "2.45.1", "available": None, "source": "winget"},
+        ])
+
+
+class TestStructuredMode(unittest.TestCase):
+    """read_installed uses the export alone, or the table when it has to"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        install_fake_winget(self.tmp.name)
+        self.log = os.path.join(self.tmp.name, 'calls.log')
+        self.patches = [
+            mock.patch.dict(os.environ, {
+                'PATH': self.tmp.name + os.pathsep + os.environ.get('PATH', ''),
+                'FAKE_WINGET_LOG': self.log,
+                'FAKE_WINGET_EXPORT': EXPORT,
+            }),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+            mock.patch.object(Config, 'STRUCTURED_OUTPUT', True),
+            mock.patch.dict(structured._capabilities, clear=True),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def subcommands(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as f:
+            return [' '.join(line.split()[:2]) for line in f]
+
+    def read_twice(self):
+        async def run():
+            return await read_installed(), await read_installed()
+        return asyncio.run(run())
+
+    def test_export_mode(self):
+        """A supporting winget is probed once and then only exports"""
+        first, second = self.read_twice()
+        self.assertTrue(first["structured"])
+        self.assertFalse(first["available"])
+        with open(EXPORT, encoding='utf-8') as f:
+            self.assertEqual(first["packages"], parse_export(json.load(f)))
+        self.assertEqual(second["packages"], first["packages"])
+        self.assertEqual(self.subcommands(), ["export --help", "export -o", "export -o"])
+        self.assertEqual(structured.capabilities(), {"export": True})
+
+    def test_available_reads_table(self):
+        """Available versions come from the table; a table without cut cells needs no export"""
+        result = asyncio.run(read_installed(include_available=True))
+        self.assertFalse(result["structured"])
+        self.assertTrue(result["available"])
+        self.assertEqual(result["packages"], text_packages())
+        self.assertEqual(self.subcommands(), ["export --help", "list --accept-source-agreements"])
+
+    def test_truncated_table_merges_export(self):
+        """A table that cut an id or version short is corrected from the export"""
+        fixtures = os.path.join(self.tmp.name, 'fixtures')
+        os.mkdir(fixtures)
+        with open(os.path.join(FIXTURES, 'list.txt'), encoding='utf-8') as f:
+            table = f.read()
+        table = table.replace("Git.Git  ", "Git.G\u2026   ").replace("2.45.1 ", "2.45\u2026  ")
+        with open(os.path.join(fixtures, 'list.txt'), 'w', encoding='utf-8') as f:
+            f.write(table)
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_FIXTURES': fixtures}):
+            result = asyncio.run(read_installed(include_available=True))
+        self.assertTrue(result["structured"])
+        self.assertTrue(result["available"])
+        self.assertEqual(result["packages"], text_packages())
+        self.assertEqual(self.subcommands(), ["export --help", "list --accept-source-agreements",
+                                              "export -o"])
+
+    def test_unsupported_falls_back(self):
+        """When the probe fails the table is parsed and the probe is not repeated"""
+        script = os.path.join(self.tmp.name, 'script.json')
+        with open(script, 'w') as f:
+            json.dump({"export --help": {"exit": 1}}, f)
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_SCRIPT': script}):
+            first, second = self.read_twice()
+        self.assertFalse(first["structured"])
+        self.assertTrue(first["available"])
+        self.assertEqual(first["packages"], text_packages())
+        self.assertEqual(self.subcommands(), ["export --help", "list --accept-source-agreements",
+                                              "list --accept-source-agreements"])
+
+    def test_unusable_document_disables_export(self):
+        """An export that writes no document is given up after one try"""
+        with mock.patch.dict(os.environ, {'FAKE_WINGET_EXPORT': ''}):
+            first, second = self.read_twice()
+        self.assertFalse(first["structured"])
+        self.assertFalse(second["structured"])
+        self.assertEqual(self.subcommands().count("export -o"), 1)
+        self.assertEqual(structured.capabilities(), {"export": False})
+
+    def test_disabled(self):
+        """With structured output off winget export is never run"""
+        with mock.patch.object(Config, 'STRUCTURED_OUTPUT', False):
+            result = asyncio.run(read_installed())
+        self.assertFalse(result["structured"])
+        self.assertEqual(self.subcommands(), ["list --accept-source-agreements"])
+
+    def test_snapshot_same_in_both_modes(self):
+        """An export-only refresh after a table read changes no names, versions or entries"""
+        snapshot = InstalledSnapshot()
+
+        async def run():
+            with mock.patch.object(Config, 'STRUCTURED_OUTPUT', False):
+                await snapshot.refresh()
+            token = snapshot.token
+            await snapshot.refresh()
+            return token
+
+        token = asyncio.run(run())
+        self.assertEqual(snapshot.get("Git.Git")["name"], "Git")
+        self.assertEqual(snapshot.get("Git.Git")["available"], "2.46.0")
+        self.assertIsNotNone(snapshot.get("ARP\\Machine\\X64\\SomeLocalTool"))
+        self.assertEqual(snapshot.token, token)
+        self.assertEqual(self.subcommands()[-1], "export -o")
+
+    def test_snapshot_reads_table_for_available(self):
+        """The table is read once a caller needs available versions, and not again while fresh"""
+        snapshot = InstalledSnapshot()
+
+        async def run():
+            await snapshot.ensure_fresh()
+            exported = len(snapshot)
+            await snapshot.ensure_fresh(include_available=True)
+            await snapshot.ensure_fresh(include_available=True)
+            return exported
+
+        exported = asyncio.run(run())
+        self.assertEqual(exported, len(text_packages()) - 1)
+        self.assertEqual(self.subcommands(), ["export --help", "export -o",
+                                              "list --accept-source-agreements"])
+        self.assertEqual(snapshot.get("Git.Git")["available"], "2.46.0")
+        self.assertEqual(snapshot.packages(), text_packages())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
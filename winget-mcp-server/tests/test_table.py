@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Test the unified winget table parser and the tool parsers built on it"""
+
+import os
+import sys
+import unittest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.utils.table import TableParser, display_width, iter_table_cells, iter_table_rows
+from src.tools.list_tool import iter_list_packages, parse_list_output
+from src.tools.search_tool import parse_search_output
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def pad(text, width):
+    """Left-justify text to a display width, like winget does"""
+    return text + ' ' * (width - display_width(text))
+
+
+class TestTableParser(unittest.TestCase):
+    """Test column derivation and row slicing"""
+
+    def test_list_fixture(self):
+        """Empty Available cells do not shift the Source column"""
+        packages = parse_list_output(fixture('list.txt'))
+        self.assertEqual(len(packages), 11)
+        edge = next(p for p in packages if p["id"] == "Microsoft.Edge")
+        self.assertIsNone(edge["available"])
+        self.assertEqual(edge["source"], "winget")
+        git = next(p for p in packages if p["id"] == "Git.Git")
+        self.assertEqual(git["available"], "2.46.0")
+
+    def test_list_row_without_source(self):
+        """Short rows fill missing trailing cells with defaults"""
+        packages = parse_list_output(fixture('list.txt'))
+        local = packages[-1]
+        self.assertEqual(local["id"], "ARP\\Machine\\X64\\SomeLocalTool")
+        self.assertEqual(local["source"], "Unknown")
+
+    def test_search_fixture_ignores_match_column(self):
+        """The Match column is not folded into Version"""
+        packages = parse_search_output(fixture('search.txt'))
+        self.assertEqual(len(packages), 8)
+        self.assertEqual(packages[0], {
+            "name": "Python 3.12", "id": "Python.Python.3.12", "version": "3.12.4", "source": "winget",
+        })
+
+    def test_double_spaces_in_name(self):
+        """A name containing double spaces stays in the Name column"""
+        output = "\n".join([
+            "Name               Id          Version",
+            "--------------------------------------",
+            "Foo  Bar  Tool     Foo.Bar     1.0",
+        ])
+        rows = list(iter_table_rows(output.split("\n")))
+        self.assertEqual(rows, [{"name": "Foo  Bar  Tool", "id": "Foo.Bar", "version": "1.0"}])
+
+    def test_wide_characters(self):
+        """Columns are sliced by display width, not code points"""
+        name = "微信 WeChat"
+        output = "\n".join([
+            pad("Name", 16) + pad("Id", 16) + "Version",
+            "-" * 40,
+            pad(name, 16) + pad("Tencent.WeChat", 16) + "3.9.11",
+            pad("ASCII App", 16) + pad("Some.App", 16) + "1.0",
+        ])
+        packages = parse_search_output(output)
+        self.assertEqual(packages[0]["name"], name)
+        self.assertEqual(packages[0]["id"], "Tencent.WeChat")
+        self.assertEqual(packages[0]["version"], "3.9.11")
+        self.assertEqual(packages[1]["id"], "Some.App")
+
+    def test_spinner_frames_before_header(self):
+        """Carriage-return spinner frames are dropped"""
+        output = "\r   - \r   \\ \r   | \rName   Id     Version\r\n---------------------\r\nApp    A.B    1.0\r\n"
+        rows = list(iter_table_rows(output.split("\n")))
+        self.assertEqual(rows, [{"name": "App", "id": "A.B", "version": "1.0"}])
+
+    def test_footer_prose_skipped(self):
+        """Lines that do not line up with the columns are not rows"""
+        output = "\n".join([
+            "Name   Id     Version",
+            "---------------------",
+            "App    A.B    1.0",
+            "2 upgrades available.",
+        ])
+        self.assertEqual(len(parse_list_output(output)), 1)
+
+    def test_truncation_marker_skipped(self):
+        """winget's truncation notice is not a row"""
+        output = "\n".join([
+            "Name   Id     Version",
+            "---------------------",
+            "App    A.B    1.0",
+            "<additional entries truncated due to result limit>",
+        ])
+        self.assertEqual(len(parse_search_output(output)), 1)
+
+    def test_second_table_rederives_columns(self):
+        """A later header/separator pair switches to the new column layout"""
+        output = "\n".join([
+            "Name   Id     Version",
+            "---------------------",
+            "App    A.B    1.0",
+            "",
+            "The following packages have an upgrade available, but require explicit targeting:",
+            "Name        Id          Version   Available",
+            "-------------------------------------------",
+            "Other App   Other.App   2.0       2.1",
+        ])
+        rows = list(iter_table_rows(output.split("\n")))
+        self.assertEqual(rows, [
+            {"name": "App", "id": "A.B", "version": "1.0"},
+            {"name": "Other App", "id": "Other.App", "version": "2.0", "available": "2.1"},
+        ])
+
+    def test_per_column_separator(self):
+        """A separator split per column defines the spans"""
+        output = "\n".join([
+            "Name     Id       Version",
+            "-------- -------- -------",
+            "App      A.B      1.0",
+        ])
+        rows = list(iter_table_rows(output.split("\n")))
+        self.assertEqual(rows, [{"name": "App", "id": "A.B", "version": "1.0"}])
+
+    def test_no_table(self):
+        """Output without a table yields nothing"""
+        self.assertEqual(parse_search_output("No package found matching input criteria."), [])
+        self.assertEqual(parse_list_output(""), [])
+
+    def test_incremental_feed(self):
+        """Rows are produced as lines arrive, one line behind"""
+        parser = TableParser()
+        self.assertIsNone(parser.feed("Name   Id     Version\n"))
+        self.assertIsNone(parser.feed("---------------------\n"))
+        self.assertEqual(parser.columns, ["name", "id", "version"])
+        self.assertIsNone(parser.feed("App    A.B    1.0\n"))
+        self.assertEqual(parser.feed("Two    C.D    2.0\n"), ("App", "A.B", "1.0"))
+        self.assertEqual(parser.close(), ("Two", "C.D", "2.0"))
+
+    def test_field_projection(self):
+        """Requested fields come back in order, empty when missing"""
+        output = ["Name   Id     Version", "---------------------", "App    A.B    1.0"]
+        rows = list(iter_table_cells(output, ("id", "available", "name")))
+        self.assertEqual(rows, [("A.B", "", "App")])
+
+    def test_limit_stops_reading(self):
+        """A row limit stops consuming lines once it is reached"""
+        lines = fixture('list.txt').split('\n')
+        consumed = []
+
+        def source():
+            for line in lines:
+                consumed.append(line)
+                yield line
+
+        packages = list(iter_list_packages(source(), 2))
+        self.assertEqual([p["id"] for p in packages], [p["id"] for p in parse_list_output(fixture('list.txt'))[:2]])
+        # Header, separator, two rows and the line that completes the second row
+        self.assertEqual(len(consumed), 5)
+        self.assertEqual(len(parse_search_output(fixture('search.txt'), limit=3)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Test version ordering, upgrade detection and batch upgrades"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import jobs
+from src import snapshot
+from src.catalog import get_catalog
+from src.config import Config
+from src.jobs import JobStore
+from src.snapshot import InstalledSnapshot
+from src.tools.upgrade_tool import detect_upgrades, find_upgrades, upgrade_batch
+from src.utils import structured
+from src.utils.cache import get_result_cache
+from src.utils.versions import compare_versions, is_newer
+from src.winget_manager import FakeExecutor, set_executor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def pkg(package_id, version, available=None):
+    return {"name": package_id, "id": package_id, "version": version,
+            "available": available, "source": "winget"}
+
+
+class TestVersionOrder(unittest.TestCase):
+    """winget's version ordering"""
+
+    def test_order(self):
+        ordered = ["Unknown", "0.9", "1.0-beta", "1.0", "1.0.1", "1.2a", "1.2b", "1.10",
+                   "2.45.1", "2.46.0.windows.1", "2.46.0.windows.2", "10", "latest"]
+        for older, newer in zip(ordered, ordered[1:]):
+            self.assertEqual(compare_versions(older, newer), -1, f"{older} < {newer}")
+            self.assertEqual(compare_versions(newer, older), 1, f"{newer} > {older}")
+
+    def test_equal(self):
+        for a, b in [("1.2", "1.2.0"), ("1.2.0.0", "1.2"), ("v2.3", "2.3"),
+                     ("< 2.3", "2.3"), ("1.0-Beta", "1.0-beta"), ("", "Unknown")]:
+            self.assertEqual(compare_versions(a, b), 0, f"{a} == {b}")
+
+    def test_unknown_is_never_newer(self):
+        self.assertFalse(is_newer("Unknown", "1.0"))
+        self.assertFalse(is_newer(None, "1.0"))
+        self.assertTrue(is_newer("1.0", "Unknown"))
+
+
+class TestDetectUpgrades(unittest.TestCase):
+    """Upgrades come from the Available column and the catalog"""
+
+    def test_sources(self):
+        packages = [
+            pkg("Git.Git", "2.45.1", "2.46.0"),
+            pkg("Python.Python.3.11", "3.11.4"),
+            pkg("Microsoft.VisualStudioCode", "1.90.2", "1.91.0"),
+            pkg("Mozilla.Firefox", "127.0.2"),
+            pkg("Some.Tool", "Unknown", "2.0"),
+        ]
+        catalog = {"python.python.3.11": "3.11.9", "microsoft.visualstudiocode": "1.91.1",
+                   "mozilla.firefox": "127.0.2", "git.git": "2.45.2"}
+        upgrades = detect_upgrades(packages, catalog)
+        self.assertEqual([(u["id"], u["available_version"], u["source_of_version"]) for u in upgrades], [
+            ("Git.Git", "2.46.0", "list"),
+            ("Python.Python.3.11", "3.11.9", "catalog"),
+            ("Microsoft.VisualStudioCode", "1.91.1", "catalog"),
+        ])
+        with_unknown = detect_upgrades(packages, catalog, include_unknown=True)
+        self.assertEqual(with_unknown[-1]["id"], "Some.Tool")
+
+    def test_many_packages_fast(self):
+        """Thousands of installed packages are checked in milliseconds"""
+        packages = [pkg(f"Vendor.App{i}", f"1.{i % 50}.{i % 7}", f"1.{i % 50}.{i % 7 + i % 2}")
+                    for i in range(2000)]
+        catalog = {f"vendor.app{i}": f"1.{i % 50}.{i % 5}" for i in range(2000)}
+        detect_upgrades(packages[:10], catalog)
+        start = time.perf_counter()
+        upgrades = detect_upgrades(packages, catalog)
+        elapsed = time.perf_counter() - start
+        self.assertGreater(len(upgrades), 1000)
+        self.assertLess(elapsed, 0.25)
+
+
+class TestUpgradeTools(unittest.TestCase):
+    """The tools answer from the snapshot and queue upgrade jobs"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        installed = InstalledSnapshot()
+        installed.apply([pkg("Git.Git", "2.45.1", "2.46.0"), pkg("Python.Python.3.11", "3.11.4"),
+                         pkg("Python.Python.3.12", "3.12.4")])
+        self.executor = FakeExecutor(FIXTURES)
+        self.previous = set_executor(self.executor)
+        self.patches = [
+            mock.patch.object(snapshot, '_snapshot', installed),
+            mock.patch.object(jobs, '_store', JobStore()),
+            mock.patch.object(Config, 'CATALOG_PATH', os.path.join(self.tmp.name, 'catalog.db')),
+            mock.patch.object(Config, 'CATALOG_SOURCE', os.path.join(FIXTURES, 'catalog.json')),
+        ]
+        for patch in self.patches:
+            patch.start()
+
+    def tearDown(self):
+        get_catalog().close()
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def test_find_upgrades(self):
+        result = asyncio.run(find_upgrades())
+        self.assertTrue(result["success"])
+        self.assertEqual(result["total_installed"], 3)
+        self.assertEqual([u["id"] for u in result["upgrades"]], ["Git.Git", "Python.Python.3.11"])
+        self.assertEqual(self.executor.calls, [])
+
+    def test_upgrade_batch(self):
+        async def run():
+            result = await upgrade_batch()
+            await asyncio.gather(*(job.task for job in jobs.get_job_store().jobs()))
+            return result
+
+        result = asyncio.run(run())
+        self.assertTrue(result["success"])
+        self.assertEqual(result["queued"], 2)
+        self.assertEqual(result["results"][1]["to_version"], "3.11.9")
+        self.assertEqual([call[:3] for call in self.executor.calls],
+                         [['upgrade', '--id', 'Git.Git'], ['upgrade', '--id', 'Python.Python.3.11']])
+        self.assertTrue(snapshot.get_snapshot().is_stale())
+
+    def test_upgrade_batch_not_installed(self):
+        async def run():
+            result = await upgrade_batch(["Not.Installed", "python.python.3.12"])
+            await asyncio.gather(*(job.task for job in jobs.get_job_store().jobs()))
+            return result
+
+        result = asyncio.run(run())
+        self.assertEqual(result["results"][0]["status"], "not_installed")
+        self.assertEqual(result["results"][1]["package_id"], "Python.Python.3.12")
+        self.assertEqual(result["results"][1]["status"], "skipped")
+        self.assertEqual(result["results"][1]["reason"], "No upgrade available")
+        self.assertNotIn("job_id", result["results"][1])
+        self.assertEqual(result["queued"], 0)
+        self.assertEqual(self.executor.calls, [])
+
+
+class TestUpgradesFromRecordings(unittest.TestCase):
+    """A snapshot read through read_installed keeps the Available column in both modes"""
+
+    def setUp(self):
+        self.executor = FakeExecutor(FIXTURES)
+        self.previous = set_executor(self.executor)
+        self.patches = [
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+            mock.patch.dict(structured._capabilities, clear=True),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+
+    def find(self, structured_output):
+        get_result_cache().invalidate()
+        with mock.patch.object(snapshot, '_snapshot', None), \
+                mock.patch.object(Config, 'STRUCTURED_OUTPUT', structured_output):
+            return asyncio.run(find_upgrades())
+
+    def test_structured_output(self):
+        result = self.find(True)
+        self.assertTrue(result["success"])
+        self.assertIn('export', [call[0] for call in self.executor.calls])
+        self.assertEqual(result["total_installed"], 11)
+        self.assertEqual([(u["id"], u["available_version"]) for u in result["upgrades"]], [
+            ("7zip.7zip", "24.07"), ("Git.Git", "2.46.0"), ("Microsoft.VisualStudioCode", "1.91.1"),
+            ("Microsoft.PowerShell", "7.4.4.0"), ("Microsoft.VCRedist.2015+.x64", "14.40.33810.0"),
+        ])
+
+    def test_same_without_structured_output(self):
+        self.assertEqual(self.find(False)["upgrades"], self.find(True)["upgrades"])
+
+
+if __name__ == '__main__':
+    unittest.main()
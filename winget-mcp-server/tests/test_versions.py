@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Property tests for version parsing and ranges, and their use by install and search"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import unittest
+from functools import cmp_to_key
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src import jobs
+from src.config import Config
+from src.jobs import JobStore
+from src.tools.install_tool import install_batch, install_package, start_install
+from src.tools.search_tool import search_packages
+from src.utils import versions
+from src.utils.cache import get_result_cache
+from src.utils.versions import (compare_versions, is_range, latest_matching, matches,
+                            parse_range, sort_versions, version_key)
+from src.winget_manager import FakeExecutor, set_executor
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+SUFFIXES = ['', '', '', '', 'a', 'b', '-beta', '-rc1', 'RC1', '_x']
+
+
+def random_version(rng):
+    parts = []
+    for _ in range(rng.randint(1, 5)):
+        number = str(rng.choice([0, 0, 1, 2, 3, 10, 12])) if rng.random() < 0.9 else ''
+        parts.append(number + rng.choice(SUFFIXES) if number else rng.choice(SUFFIXES[4:]))
+    return ('v' if rng.random() < 0.1 else '') + '.'.join(parts)
+
+
+def reference_compare(a, b):
+    """winget's version comparison written out directly: pad, then compare part by part"""
+    def parts(version):
+        version = version.strip()
+        if version[:1] in 'vV' and version[1:2].isdigit():
+            version = version[1:]
+        result = []
+        for piece in version.split('.'):
+            digits, other = re.match(r'\s*(\d*)(.*?)\s*$', piece).groups()
+            result.append((int(digits or 0), other.lower()))
+        return result
+
+    left, right = parts(a), parts(b)
+    width = max(len(left), len(right))
+    left += [(0, '')] * (width - len(left))
+    right += [(0, '')] * (width - len(right))
+    for (number_a, other_a), (number_b, other_b) in zip(left, right):
+        if number_a != number_b:
+            return -1 if number_a < number_b else 1
+        if other_a != other_b:
+            if not other_a or not other_b:
+                return 1 if not other_a else -1
+            return -1 if other_a < other_b else 1
+    return 0
+
+
+class TestVersionProperties(unittest.TestCase):
+    """Randomized properties of the comparator, checked over seeded samples"""
+
+    def setUp(self):
+        self.rng = random.Random(20241017)
+
+    def test_matches_reference(self):
+        for _ in range(20000):
+            a, b = random_version(self.rng), random_version(self.rng)
+            self.assertEqual(compare_versions(a, b), reference_compare(a, b), f"{a} vs {b}")
+
+    def test_antisymmetric_and_reflexive(self):
+        for _ in range(5000):
+            a, b = random_version(self.rng), random_version(self.rng)
+            self.assertEqual(compare_versions(a, b), -compare_versions(b, a))
+            self.assertEqual(compare_versions(a, a), 0)
+
+    def test_transitive(self):
+        for _ in range(5000):
+            a, b, c = sorted((random_version(self.rng) for _ in range(3)), key=version_key)
+            self.assertLessEqual(compare_versions(a, b), 0)
+            self.assertLessEqual(compare_versions(b, c), 0)
+            self.assertLessEqual(compare_versions(a, c), 0, f"{a} {b} {c}")
+
+    def test_equal_versions_have_equal_keys(self):
+        """Trailing zero parts and a v prefix do not change the key"""
+        for _ in range(2000):
+            version = random_version(self.rng).lstrip('v')
+            for same in (version + '.0', version + '.0.0', 'v' + version if version[:1].isdigit() else version):
+                self.assertEqual(version_key(same), version_key(version), f"{same} vs {version}")
+
+    def test_sort_agrees_with_reference(self):
+        sample = [random_version(self.rng) for _ in range(500)]
+        self.assertEqual([version_key(v) for v in sort_versions(sample)],
+                         [version_key(v) for v in sorted(sample, key=cmp_to_key(reference_compare))])
+
+    def test_sort_is_stable(self):
+        items = [{"id": str(i), "version": random_version(self.rng)} for i in range(300)]
+        ordered = sort_versions(items, key=lambda item: item["version"], newest_first=True)
+        for first, second in zip(ordered, ordered[1:]):
+            order = compare_versions(first["version"], second["version"])
+            self.assertGreaterEqual(order, 0)
+            if order == 0:
+                self.assertLess(int(first["id"]), int(second["id"]))
+
+    def test_wildcard_latest_matches_brute_force(self):
+        for _ in range(300):
+            sample = [f"{self.rng.randint(1, 3)}.{self.rng.randint(0, 3)}.{self.rng.randint(0, 20)}"
+                      + self.rng.choice(['', '', '-rc1']) for _ in range(30)]
+            major, minor = self.rng.randint(1, 3), self.rng.randint(0, 3)
+            candidates = [v for v in sample if v.split('.')[:2] == [str(major), str(minor)]]
+            expected = max(candidates, key=cmp_to_key(reference_compare)) if candidates else None
+            found = latest_matching(sample, f"{major}.{minor}.*")
+            self.assertEqual(found is None, expected is None)
+            if found is not None:
+                self.assertEqual(compare_versions(found, expected), 0)
+
+    def test_bounds_match_brute_force(self):
+        for _ in range(300):
+            sample = [random_version(self.rng) for _ in range(30)]
+            low, high = sorted((random_version(self.rng) for _ in range(2)), key=version_key)
+            spec = f">={low}, <{high}"
+            expected = [v for v in sample
+                        if reference_compare(v, low) >= 0 and reference_compare(v, high) < 0]
+            self.assertEqual([v for v in sample if matches(v, spec)], expected, spec)
+
+
+class TestVersionForms(unittest.TestCase):
+    """Semver, 4-part, date-style and unknown versions"""
+
+    def test_forms(self):
+        self.assertEqual(sort_versions(["1.0.0", "1.0.0-rc.1", "1.0.0-alpha", "1.0.0-beta.2", "1.0.0-beta.10"]),
+                         ["1.0.0-alpha", "1.0.0-beta.2", "1.0.0-beta.10", "1.0.0-rc.1", "1.0.0"])
+        self.assertEqual(sort_versions(["7.4.10.0", "7.4.3.0", "7.4.4"]), ["7.4.3.0", "7.4.4", "7.4.10.0"])
+        self.assertEqual(compare_versions("2024-06-18", "2024.6.18"), 0)
+        self.assertEqual(sort_versions(["2024-10-01", "2024-06-18", "2023-12-31"]),
+                         ["2023-12-31", "2024-06-18", "2024-10-01"])
+        self.assertEqual(sort_versions(["1.0", "Unknown", "latest", "", None]), ["Unknown", "", None, "1.0", "latest"])
+
+    def test_memo(self):
+        versions.clear_memo()
+        key = version_key("3.12.4")
+        self.assertIs(version_key("3.12.4"), key)
+        self.assertIs(version_key("3.12.4")[0], version_key("3.11.9")[0])
+        with mock.patch.object(versions, 'MEMO_SIZE', 10):
+            for index in range(25):
+                version_key(f"1.{index}")
+            self.assertLessEqual(versions.memo_stats()["entries"], 10)
+        versions.clear_memo()
+        self.assertEqual(version_key("3.12.4"), key)
+
+
+class TestRanges(unittest.TestCase):
+    """Range syntax"""
+
+    VERSIONS = ["3.11.9", "3.12.0", "3.12.4", "3.12.10", "3.12.11-rc1", "3.13.0b1", "3.13.0", "Unknown"]
+
+    def test_latest_matching(self):
+        for spec, expected in [
+            ("3.12.*", "3.12.11-rc1"), ("3.12.x", "3.12.11-rc1"), (">=3.12, <3.12.10", "3.12.4"),
+            (">=3.12 <3.13", "3.13.0b1"), ("~3.12.1", "3.12.11-rc1"), ("^3.11", "3.13.0"),
+            ("!=3.13.*", "3.12.11-rc1"), ("3.12.4", "3.12.4"), ("=v3.12.0", "3.12.0"),
+            ("*", "3.13.0"), ("4.*", None),
+        ]:
+            self.assertEqual(latest_matching(self.VERSIONS, spec), expected, spec)
+
+    def test_unknown_never_matches(self):
+        self.assertFalse(matches("Unknown", "*"))
+        self.assertFalse(matches(None, "<1"))
+
+    def test_is_range(self):
+        for spec in ("3.12.*", "3.x", ">=1", "<2", "~1.2", "^1.2", "1,2", "!=1"):
+            self.assertTrue(is_range(spec), spec)
+        for spec in ("3.12.4", "1.0-beta", "2.46.0.windows.1", "xyz", "", None):
+            self.assertFalse(is_range(spec), spec)
+
+    def test_invalid(self):
+        for spec in (">=3.*", "3.*.1", ">=", "", ">=Unknown"):
+            with self.assertRaises(ValueError, msg=spec):
+                parse_range(spec)
+
+
+SHOW_VERSIONS = """Found Python 3.12 [Python.Python.3.12]
+Version
+-------
+3.12.4
+3.12.3
+3.12.10
+3.12.9
+3.11.9
+"""
+
+
+class TestVersionResolution(unittest.TestCase):
+    """Installs resolve ranges; search sorts by version"""
+
+    def setUp(self):
+        self.executor = FakeExecutor(FIXTURES, replies={"show Python.Python.3.12": {"stdout": SHOW_VERSIONS}})
+        self.previous = set_executor(self.executor)
+        self.patches = [
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+            mock.patch.object(jobs, '_store', JobStore()),
+        ]
+        for patch in self.patches:
+            patch.start()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        get_result_cache().invalidate()
+
+    def installs(self):
+        return [call for call in self.executor.calls if call[0] == 'install']
+
+    def test_install_range(self):
+        result = asyncio.run(install_package('Python.Python.3.12', '3.12.*'))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["version"], "3.12.10")
+        self.assertEqual(result["requested_version"], "3.12.*")
+        install = self.installs()[0]
+        self.assertEqual(install[install.index('--version') + 1], "3.12.10")
+        self.assertIn('--versions', self.executor.calls[0])
+
+    def test_install_exact_version_skips_lookup(self):
+        result = asyncio.run(install_package('Python.Python.3.12', '3.12.4'))
+        self.assertTrue(result["success"])
+        self.assertNotIn("requested_version", result)
+        self.assertEqual([call[0] for call in self.executor.calls], ['install'])
+
+    def test_install_range_without_match(self):
+        result = asyncio.run(install_package('Python.Python.3.12', '3.13.*'))
+        self.assertFalse(result["success"])
+        self.assertIn("no version of Python.Python.3.12 matches 3.13.*", result["error"])
+        self.assertEqual(self.installs(), [])
+
+    def test_job_resolves_range(self):
+        async def run():
+            started = start_install('Python.Python.3.12', '<3.12.10')
+            job = await jobs.get_job_store().wait(started["job_id"], 5)
+            return job.as_dict()
+
+        status = asyncio.run(run())
+        self.assertEqual(status["status"], "succeeded")
+        self.assertEqual(status["resolved_version"], "3.12.9")
+        self.assertIn('3.12.9', self.installs()[0])
+
+    def test_batch_resolves_range(self):
+        result = asyncio.run(install_batch([{"package_id": "Python.Python.3.12", "version": "~3.12.3"}]))
+        self.assertTrue(result["success"])
+        self.assertEqual(result["results"][0]["resolved_version"], "3.12.10")
+
+    def test_batch_invalid_range(self):
+        """A range that does not parse is told apart from a missing package"""
+        result = asyncio.run(install_batch([
+            {"package_id": "Python.Python.3.12", "version": ">=3.*"},
+            {"package_id": "Python.Python.3.12", "version": "3.13.*"},
+        ]))
+        invalid, unmatched = result["results"]
+        self.assertEqual(invalid["status"], "invalid_version")
+        self.assertTrue(invalid["error"].startswith("Invalid version range: "))
+        self.assertEqual(unmatched["status"], "not_found")
+        self.assertEqual(result["summary"], {"invalid_version": 1, "not_found": 1})
+        # Only the valid range listed versions; nothing was installed
+        self.assertEqual(len(self.executor.calls), 1)
+
+    def test_search_sorted_by_version(self):
+        async def run():
+            first = await search_packages("python", 3, sort="version")
+            second = await search_packages("python", 10, cursor=first["next_cursor"])
+            return first, second
+
+        first, second = asyncio.run(run())
+        ids = [p["id"] for p in first["packages"] + second["packages"]]
+        self.assertEqual(ids, ["Anaconda.Anaconda3", "JetBrains.PyCharm.Community", "AivarAnnamaa.Thonny",
+                               "Python.Python.3.13", "Python.Launcher", "Python.Python.3.12",
+                               "Python.Python.3.11", "Anaconda.Miniconda3"])
+        relevance = asyncio.run(search_packages("python", 3))
+        self.assertEqual(relevance["packages"][0]["id"], "Python.Python.3.12")
+        self.assertFalse(asyncio.run(search_packages("python", 3, sort="name"))["success"])
+
+
+if __name__ == '__main__':
+    unittest.main()
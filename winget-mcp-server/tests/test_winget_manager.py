@@ -1 +1,233 @@
+#!/usr/bin/env python3
+"""Test the winget executors and the tools running on the fake one"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
 import unittest
+from unittest import mock
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.config import Config
+from src.jobs import CANCELLED, SUCCEEDED, JobStore
+from src.tools.info_tool import get_package_info
+from src.tools.list_tool import list_installed, parse_list_output, read_installed
+from src.tools.search_tool import search_packages
+from src.utils import structured
+from src.utils.cache import get_result_cache
+from src.utils.process import run_winget, stream_winget
+from src.winget_manager import (INJECTED_EXIT, FakeExecutor, FakeReply, SubprocessExecutor,
+                            WingetExecutor, WingetManager, get_executor, set_executor)
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def recording(name):
+    with open(os.path.join(FIXTURES, f'{name}.txt'), encoding='utf-8') as f:
+        return f.read()
+
+
+class TestFakeExecutor(unittest.TestCase):
+    """The fake replays recordings with configured latency and failures"""
+
+    def setUp(self):
+        self.previous = set_executor(None)
+
+    def tearDown(self):
+        set_executor(self.previous)
+
+    def use(self, **kwargs):
+        executor = FakeExecutor(FIXTURES, **kwargs)
+        set_executor(executor)
+        return executor
+
+    def test_replays_recording(self):
+        """A subcommand prints its recording and exits 0"""
+        executor = self.use()
+        result = asyncio.run(run_winget(['search', 'python']))
+        self.assertEqual(result.returncode, 0)
+        self.assertEqual(result.stdout, recording('search'))
+        self.assertEqual(executor.calls, [['search', 'python']])
+        self.assertEqual(executor.stats(), {"backend": "fake", "spawns": 1, "failures": 0})
+
+    def test_scripted_replies(self):
+        """Per-package replies win over subcommand replies and recordings"""
+        executor = self.use(replies={
+            "show Broken.App": {"stderr": "No package found", "exit": 3},
+            "upgrade": FakeReply(stdout="done\n"),
+        })
+
+        async def run():
+            return (await run_winget(['show', '--id', 'Broken.App', '--exact']),
+                    await run_winget(['show', '--id', 'Git.Git']),
+                    await run_winget(['upgrade', '--all']),
+                    await run_winget(['pin', 'list']))
+
+        broken, show, upgrade, unknown = asyncio.run(run())
+        self.assertEqual((broken.returncode, broken.stderr), (3, "No package found"))
+        self.assertEqual(show.stdout, recording('show'))
+        self.assertEqual(upgrade.stdout, "done\n")
+        self.assertEqual((unknown.returncode, unknown.stdout), (0, ''))
+        self.assertEqual(len(executor.calls), 4)
+
+    def test_latency(self):
+        """Latency delays every reply; line latency paces the lines"""
+        self.use(latency=0.2, line_latency=0.05)
+
+        async def run():
+            start = time.perf_counter()
+            stamps = []
+            async with stream_winget(['search', 'python']) as stream:
+                async for _ in stream:
+                    stamps.append(time.perf_counter() - start)
+            return stamps
+
+        stamps = asyncio.run(run())
+        self.assertEqual(len(stamps), len(recording('search').splitlines()))
+        self.assertGreaterEqual(stamps[0], 0.2)
+        self.assertGreaterEqual(stamps[-1] - stamps[0], 0.04 * (len(stamps) - 1))
+
+    def test_failure_injection_is_deterministic(self):
+        """The same seed fails the same calls"""
+        def codes(seed):
+            executor = self.use(failure_rate=0.3, seed=seed)
+
+            async def run():
+                return [(await run_winget(['show', str(i)])).returncode for i in range(50)]
+
+            return asyncio.run(run()), executor.failures
+
+        first, failures = codes(7)
+        self.assertEqual(codes(7), (first, failures))
+        self.assertNotEqual(codes(8)[0], first)
+        self.assertEqual(first.count(INJECTED_EXIT), failures)
+        self.assertTrue(5 <= failures <= 25)
+
+    def test_spawn_error(self):
+        """A spawn error surfaces like a missing executable"""
+        self.use(spawn_error=FileNotFoundError("winget"))
+        with self.assertRaises(FileNotFoundError):
+            asyncio.run(run_winget(['list']))
+
+    def test_timeout_kills_hanging_call(self):
+        """A hanging reply is killed when run_winget times out"""
+        self.use(replies={"show": {"hang": True}})
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(run_winget(['show', 'Git.Git'], timeout=0.2))
+
+    def test_job_cancel_kills_tree(self):
+        """A job on a hanging fake is cancelled like a real process group"""
+        self.use(replies={"install Slow.App": {"stdout": "Downloading\n", "hang": True}})
+
+        async def run():
+            store = JobStore()
+            slow = store.submit("install", ['install', '--id', 'Slow.App'])
+            quick = store.submit("install", ['install', '--id', 'Git.Git'])
+            await asyncio.sleep(0.1)
+            await store.cancel(slow.id)
+            await store.wait(quick.id, 5)
+            return slow, quick
+
+        slow, quick = asyncio.run(run())
+        self.assertEqual(slow.status, CANCELLED)
+        self.assertLess(slow.return_code, 0)
+        self.assertEqual(quick.status, SUCCEEDED)
+        self.assertEqual(quick.output(), recording('install'))
+
+
+class TestToolsOnFake(unittest.TestCase):
+    """Tools produce the same results on the fake without spawning winget"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.executor = FakeExecutor(FIXTURES)
+        self.previous = set_executor(self.executor)
+        self.patches = [
+            # No winget on PATH: every call has to go through the executor
+            mock.patch.dict(os.environ, {'PATH': self.tmp.name}),
+            mock.patch.object(Config, 'CATALOG_PATH', ''),
+        ]
+        for patch in self.patches:
+            patch.start()
+        structured._capabilities.clear()
+        get_result_cache().invalidate()
+
+    def tearDown(self):
+        for patch in reversed(self.patches):
+            patch.stop()
+        set_executor(self.previous)
+        structured._capabilities.clear()
+        get_result_cache().invalidate()
+        self.tmp.cleanup()
+
+    def test_search(self):
+        result = asyncio.run(search_packages("python", 3))
+        self.assertTrue(result["success"])
+        self.assertEqual([p["id"] for p in result["packages"]],
+                         ["Python.Python.3.12", "Python.Python.3.11", "Python.Python.3.13"])
+
+    def test_info(self):
+        result = asyncio.run(get_package_info("Microsoft.PowerShell"))
+        self.assertTrue(result["success"])
+        self.assertEqual(self.executor.calls[0][0], 'show')
+
+    def test_list_table(self):
+        with mock.patch.object(Config, 'STRUCTURED_OUTPUT', False):
+            result = asyncio.run(list_installed(100, True))
+        expected = parse_list_output(recording('list'))
+        self.assertEqual(result["packages"], expected)
+        self.assertEqual(self.executor.spawns, 1)
+
+    def test_list_structured(self):
+        """The recorded export.json is written for `winget export -o`"""
+        result = asyncio.run(read_installed())
+        self.assertTrue(result["success"])
+        self.assertTrue(result["structured"])
+        sourced = [p for p in parse_list_output(recording('list')) if p["source"] != "Unknown"]
+        self.assertEqual([(p["id"], p["version"]) for p in result["packages"]],
+                         [(p["id"], p["version"]) for p in sourced])
+        self.assertEqual([call[0] for call in self.executor.calls], ['export', 'export'])
+
+
+class TestWingetManager(unittest.TestCase):
+    """The configured executor is built once"""
+
+    def tearDown(self):
+        set_executor(None)
+
+    def test_default_is_subprocess(self):
+        with mock.patch.object(Config, 'EXECUTOR', 'subprocess'):
+            set_executor(None)
+            self.assertIsInstance(get_executor(), SubprocessExecutor)
+            self.assertIs(get_executor(), get_executor())
+
+    def test_fake_from_config(self):
+        with mock.patch.multiple(Config, EXECUTOR='fake', FAKE_FIXTURES=FIXTURES,
+                                 FAKE_LATENCY=0.5, FAKE_FAILURE_RATE=0.1):
+            executor = WingetManager(Config).executor
+        self.assertIsInstance(executor, FakeExecutor)
+        self.assertEqual((executor.fixtures, executor.latency, executor.failure_rate),
+                         (FIXTURES, 0.5, 0.1))
+
+    def test_backend_must_start_processes(self):
+        """A backend without _start cannot be built"""
+        class Incomplete(WingetExecutor):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+        with self.assertRaises(TypeError):
+            WingetExecutor()
+
+    def test_unknown_backend(self):
+        with mock.patch.object(Config, 'EXECUTOR', 'ssh'):
+            with self.assertRaises(ValueError):
+                WingetManager(Config)
+
+
+if __name__ == '__main__':
+    unittest.main()